@@ -8,14 +8,13 @@ import asyncio
 import hashlib
 import json
 import os
-import tempfile
 import time
 from decimal import Decimal, ROUND_HALF_UP
 from typing import Dict, List, Tuple, Optional, Any
 from functools import wraps
 
 import httpx
-from playwright.async_api import async_playwright, Page, BrowserContext
+from playwright.async_api import async_playwright, Browser, Page, BrowserContext
 
 from utils.config import AccountConfig, ProviderConfig, AuthConfig
 from utils.auth import get_authenticator
@@ -29,6 +28,8 @@ from utils.constants import (
     KEY_COOKIE_NAMES,
     BROWSER_LAUNCH_ARGS,
     BROWSER_VIEWPORT,
+    BROWSER_LOCALE,
+    BROWSER_TIMEZONE_ID,
     HTTP_TIMEOUT,
     BROWSER_PAGE_LOAD_TIMEOUT,
     DEFAULT_MAX_RETRIES,
@@ -104,6 +105,7 @@ class CheckIn:
         self.balance_data_file = "balance_data.json"
         self.logger = setup_logger(__name__)
         self._playwright = None
+        self._browsers: Dict[bool, Browser] = {}  # 按 headless 模式复用的浏览器实例
         self.session_cache = SessionCache()  # 添加会话缓存实例
 
     async def __aenter__(self):
@@ -114,6 +116,15 @@ class CheckIn:
 
     async def __aexit__(self, exc_type, exc_val, exc_tb):
         """退出上下文时清理浏览器资源"""
+        for browser in self._browsers.values():
+            try:
+                await browser.close()
+            except Exception as e:
+                self.logger.warning(
+                    f"⚠️ [{self.account.name}] 关闭浏览器时出现警告: {e}"
+                )
+        self._browsers.clear()
+
         if self._playwright:
             try:
                 await self._playwright.stop()
@@ -124,6 +135,22 @@ class CheckIn:
                 )
         return False
 
+    async def _get_browser(self, headless: bool, is_ci: bool, timeout: int) -> Browser:
+        """获取共享浏览器实例（按 headless 模式懒启动并复用，各认证只新建上下文）"""
+        browser = self._browsers.get(headless)
+        if browser is not None and browser.is_connected():
+            return browser
+
+        browser = await self._playwright.chromium.launch(
+            headless=headless,
+            args=EnhancedStealth.get_enhanced_browser_args(),
+            slow_mo=100 if not is_ci else 0,  # CI 环境不需要减速
+            timeout=timeout,
+        )
+        self._browsers[headless] = browser
+        self.logger.info(f"🚀 [{self.account.name}] 浏览器已启动 (headless={headless})")
+        return browser
+
     def _build_request_headers(self, api_user: Optional[str] = None) -> Dict[str, str]:
         """构建统一的HTTP请求头"""
         headers = {
@@ -208,260 +235,254 @@ class CheckIn:
                     f"⚠️ [{self.account.name}] CI环境中的 {auth_config.method.value} 认证可能失败（需要人机验证）"
                 )
 
-        # 为每次认证创建独立的临时目录和浏览器上下文
-        with tempfile.TemporaryDirectory() as temp_dir:
-            # 对于需要人机验证的登录方式（GitHub、Linux.do），使用非headless模式
-            # 但在 CI 环境中必须使用 headless 模式
-            needs_human_verification = auth_config.method.requires_human_verification
+        # 为每次认证创建独立的浏览器上下文（共享浏览器实例，上下文之间 cookie 隔离）
+        # 对于需要人机验证的登录方式（GitHub、Linux.do），使用非headless模式
+        # 但在 CI 环境中必须使用 headless 模式
+        needs_human_verification = auth_config.method.requires_human_verification
 
+        if is_ci:
+            headless_mode = True
+            self.logger.info(
+                f"ℹ️ [{self.account.name}] 检测到 CI 环境，强制使用 headless 模式"
+            )
+        else:
+            headless_mode = not needs_human_verification
+            # 如果环境变量强制指定，则覆盖默认设置
+            force_non_headless = (
+                os.getenv("FORCE_NON_HEADLESS", "false").lower() == "true"
+            )
+            if force_non_headless:
+                headless_mode = False
+                self.logger.info(
+                    f"ℹ️ [{self.account.name}] 强制使用非headless模式（FORCE_NON_HEADLESS=true）"
+                )
+            elif needs_human_verification:
+                self.logger.info(
+                    f"ℹ️ [{self.account.name}] {auth_config.method.value} 认证使用非headless模式"
+                )
+
+        # 启动独立的浏览器上下文（复用共享浏览器实例，仅新建上下文）
+        try:
+            # 动态调整超时时间（CI环境中使用倍增器）
+            timeout_base = 60000  # 基础超时60秒
             if is_ci:
-                headless_mode = True
+                timeout_multiplier = CIConfig.get_ci_timeout_multiplier()
+                timeout_base = int(timeout_base * timeout_multiplier)
                 self.logger.info(
-                    f"ℹ️ [{self.account.name}] 检测到 CI 环境，强制使用 headless 模式"
+                    f"ℹ️ [{self.account.name}] CI环境超时调整为 {timeout_base/1000}秒 (倍增器: {timeout_multiplier})"
                 )
-            else:
-                headless_mode = not needs_human_verification
-                # 如果环境变量强制指定，则覆盖默认设置
-                force_non_headless = (
-                    os.getenv("FORCE_NON_HEADLESS", "false").lower() == "true"
+
+            # 获取代理配置（如果启用，支持订阅模式，自动验证可用性）
+            proxy_config = await ProxyManager.get_verified_proxy_config()
+            if proxy_config:
+                self.logger.info(
+                    f"🌐 [{self.account.name}] 启用代理: {proxy_config['server']}"
                 )
-                if force_non_headless:
-                    headless_mode = False
-                    self.logger.info(
-                        f"ℹ️ [{self.account.name}] 强制使用非headless模式（FORCE_NON_HEADLESS=true）"
-                    )
-                elif needs_human_verification:
-                    self.logger.info(
-                        f"ℹ️ [{self.account.name}] {auth_config.method.value} 认证使用非headless模式"
-                    )
 
-            # 启动独立的浏览器上下文（使用不同的临时目录防止cookie冲突）
-            try:
-                # 动态调整超时时间（CI环境中使用倍增器）
-                timeout_base = 60000  # 基础超时60秒
-                if is_ci:
-                    timeout_multiplier = CIConfig.get_ci_timeout_multiplier()
-                    timeout_base = int(timeout_base * timeout_multiplier)
+            # 邮箱认证：用缓存的 storage_state 预热上下文，有效时可跳过登录表单
+            storage_state = None
+            if auth_config.method == AuthMethod.EMAIL:
+                storage_state = self.session_cache.load_storage_state(
+                    self.account.name, self.provider.name
+                )
+                if storage_state:
                     self.logger.info(
-                        f"ℹ️ [{self.account.name}] CI环境超时调整为 {timeout_base/1000}秒 (倍增器: {timeout_multiplier})"
+                        f"♻️ [{self.account.name}] 使用缓存的会话状态初始化浏览器上下文"
                     )
 
-                # 获取代理配置（如果启用，支持订阅模式，自动验证可用性）
-                proxy_config = await ProxyManager.get_verified_proxy_config()
-                if proxy_config:
-                    self.logger.info(
-                        f"🌐 [{self.account.name}] 启用代理: {proxy_config['server']}"
-                    )
+            browser = await self._get_browser(headless_mode, is_ci, timeout_base)
+            context = await browser.new_context(
+                user_agent=BROWSER_USER_AGENT,
+                viewport=BROWSER_VIEWPORT,
+                locale=BROWSER_LOCALE,
+                timezone_id=BROWSER_TIMEZONE_ID,
+                proxy=proxy_config,  # 添加代理支持（上下文级别）
+                storage_state=storage_state,
+                bypass_csp=True,  # 上下文级绕过 CSP，避免严格 CSP 页面使注入的钩子部分失效
+            )
+            self.logger.info(
+                f"✅ [{self.account.name}] 浏览器上下文启动成功 (headless={headless_mode}, proxy={bool(proxy_config)})"
+            )
+        except Exception as e:
+            self.logger.error(f"❌ [{self.account.name}] 浏览器上下文启动失败: {e}")
+            return False, {"error": f"Browser launch failed: {str(e)}"}
+
+        try:
+            # 在上下文上安装增强版反检测脚本（2025版，20+特征），对后续所有页面生效
+            await EnhancedStealth.install_on_context(context)
+            self.logger.info(
+                f"✅ [{self.account.name}] 增强版反检测脚本安装成功（20+特征）"
+            )
+
+            page = await context.new_page()
+            self.logger.debug(f"✅ [{self.account.name}] 新页面创建成功")
+        except Exception as e:
+            self.logger.error(f"❌ [{self.account.name}] 创建页面失败: {e}")
+            await context.close()
+            return False, {"error": f"Page creation failed: {str(e)}"}
 
-                # 使用增强的浏览器参数
-                browser_args = EnhancedStealth.get_enhanced_browser_args()
-
-                context = await self._playwright.chromium.launch_persistent_context(
-                    user_data_dir=temp_dir,
-                    headless=headless_mode,
-                    user_agent=BROWSER_USER_AGENT,
-                    viewport=BROWSER_VIEWPORT,
-                    args=browser_args,
-                    slow_mo=100 if not is_ci else 0,  # CI 环境不需要减速
-                    timeout=timeout_base,
-                    proxy=proxy_config,  # 添加代理支持
+        try:
+            # 步骤 1: 对于 AgentRouter 跳过 WAF cookies
+            waf_cookies = {}
+            if self.provider.name.lower() != "agentrouter":
+                waf_cookies = await self._get_waf_cookies(page, context)
+                if not waf_cookies:
+                    self.logger.warning(
+                        f"⚠️ [{self.account.name}] 未获取到 WAF cookies，继续尝试"
+                    )
+            else:
+                self.logger.info(
+                    f"ℹ️ [{self.account.name}] AgentRouter 不需要 WAF cookies，跳过"
                 )
+
+            # 步骤 1.5: 可选的人类行为模拟（支持全局和按认证方式定制）
+            if StealthConfig.should_enable_behavior_simulation(
+                auth_config.method.value
+            ):
                 self.logger.info(
-                    f"✅ [{self.account.name}] 浏览器上下文启动成功 (headless={headless_mode}, proxy={bool(proxy_config)})"
+                    f"🤖 [{self.account.name}] 开始模拟人类行为（{auth_config.method.value}）..."
                 )
-            except Exception as e:
-                self.logger.error(f"❌ [{self.account.name}] 浏览器上下文启动失败: {e}")
-                return False, {"error": f"Browser launch failed: {str(e)}"}
+                try:
+                    await EnhancedStealth.simulate_reading_behavior(page)
+                    self.logger.info(f"✅ [{self.account.name}] 人类行为模拟完成")
+                except Exception as e:
+                    self.logger.warning(
+                        f"⚠️ [{self.account.name}] 行为模拟失败: {e}"
+                    )
 
-            try:
-                page = await context.new_page()
-                self.logger.debug(f"✅ [{self.account.name}] 新页面创建成功")
+            # 步骤 2: 执行认证
+            authenticator = get_authenticator(
+                self.account.name, auth_config, self.provider
+            )
+            auth_result = await authenticator.authenticate(page, context)
+
+            if not auth_result["success"]:
+                return False, {
+                    "error": auth_result.get("error", "Authentication failed")
+                }
+
+            # 获取认证后的 cookies 和用户信息
+            auth_cookies = auth_result.get("cookies", {})
+            auth_user_id = auth_result.get("user_id")
+            auth_username = auth_result.get("username")
 
-                # 注入增强版反检测脚本（2025版，20+特征）
-                self.logger.debug(f"🔧 [{self.account.name}] 注入增强版反检测脚本...")
-                await EnhancedStealth.inject_stealth_scripts(page)
+            # 更新 auth_config 中的用户标识（优先使用真实获取的）
+            if auth_user_id:
+                auth_config.api_user = auth_user_id
                 self.logger.info(
-                    f"✅ [{self.account.name}] 增强版反检测脚本注入成功（20+特征）"
+                    f"✅ [{self.account.name}] 认证成功，用户ID: {auth_user_id}"
+                )
+            elif auth_username:
+                auth_config.api_user = auth_username
+                self.logger.info(
+                    f"✅ [{self.account.name}] 认证成功，用户名: {auth_username}"
+                )
+            else:
+                self.logger.info(
+                    f"✅ [{self.account.name}] 认证成功，获取到 cookies"
                 )
-            except Exception as e:
-                self.logger.error(f"❌ [{self.account.name}] 创建页面失败: {e}")
-                await context.close()
-                return False, {"error": f"Page creation failed: {str(e)}"}
 
-            try:
-                # 步骤 1: 对于 AgentRouter 跳过 WAF cookies
-                waf_cookies = {}
-                if self.provider.name.lower() != "agentrouter":
-                    waf_cookies = await self._get_waf_cookies(page, context)
-                    if not waf_cookies:
-                        self.logger.warning(
-                            f"⚠️ [{self.account.name}] 未获取到 WAF cookies，继续尝试"
-                        )
-                else:
-                    self.logger.info(
-                        f"ℹ️ [{self.account.name}] AgentRouter 不需要 WAF cookies，跳过"
+            # 步骤 3: 执行签到（AgentRouter通过查询用户信息完成）
+            if self.provider.name.lower() == "agentrouter":
+                # AgentRouter: 查询用户信息即可完成签到
+                self.logger.info(
+                    f"ℹ️ [{self.account.name}] AgentRouter 通过查询用户信息自动签到"
+                )
+                user_info = await self._get_user_info(
+                    auth_cookies, auth_config, page=page
+                )
+                if user_info and user_info.get("success"):
+                    # 计算余额变化
+                    balance_change = self._calculate_balance_change(
+                        self.account.name, auth_config.method.value, user_info
                     )
+                    user_info["balance_change"] = balance_change
 
-                # 步骤 1.5: 可选的人类行为模拟（支持全局和按认证方式定制）
-                if StealthConfig.should_enable_behavior_simulation(
-                    auth_config.method.value
-                ):
-                    self.logger.info(
-                        f"🤖 [{self.account.name}] 开始模拟人类行为（{auth_config.method.value}）..."
+                    # 保存余额数据
+                    self._save_balance_data(
+                        self.account.name, auth_config.method.value, user_info
                     )
-                    try:
-                        await EnhancedStealth.simulate_reading_behavior(page)
-                        self.logger.info(f"✅ [{self.account.name}] 人类行为模拟完成")
-                    except Exception as e:
-                        self.logger.warning(
-                            f"⚠️ [{self.account.name}] 行为模拟失败: {e}"
-                        )
-
-                # 步骤 2: 执行认证
-                authenticator = get_authenticator(
-                    self.account.name, auth_config, self.provider
-                )
-                auth_result = await authenticator.authenticate(page, context)
 
-                if not auth_result["success"]:
+                    return True, user_info
+                else:
                     return False, {
-                        "error": auth_result.get("error", "Authentication failed")
+                        "error": "Failed to get user info for AgentRouter"
+                    }
+            else:
+                # AnyRouter: 需要显式调用签到接口（在浏览器环境中执行）
+                checkin_result = await self._do_checkin(
+                    auth_cookies, auth_config, page=page
+                )
+                if not checkin_result["success"]:
+                    return False, {
+                        "error": checkin_result.get("message", "Check-in failed")
                     }
 
-                # 获取认证后的 cookies 和用户信息
-                auth_cookies = auth_result.get("cookies", {})
-                auth_user_id = auth_result.get("user_id")
-                auth_username = auth_result.get("username")
+                self.logger.info(
+                    f"✅ [{self.account.name}] 签到成功: {checkin_result.get('message', '')}"
+                )
 
-                # 更新 auth_config 中的用户标识（优先使用真实获取的）
-                if auth_user_id:
-                    auth_config.api_user = auth_user_id
-                    self.logger.info(
-                        f"✅ [{self.account.name}] 认证成功，用户ID: {auth_user_id}"
-                    )
-                elif auth_username:
-                    auth_config.api_user = auth_username
-                    self.logger.info(
-                        f"✅ [{self.account.name}] 认证成功，用户名: {auth_username}"
-                    )
-                else:
-                    self.logger.info(
-                        f"✅ [{self.account.name}] 认证成功，获取到 cookies"
+                # 步骤 4: 获取用户信息和余额（在浏览器环境中执行）
+                user_info = await self._get_user_info(
+                    auth_cookies, auth_config, page=page
+                )
+                if user_info and user_info.get("success"):
+                    # 计算余额变化
+                    balance_change = self._calculate_balance_change(
+                        self.account.name, auth_config.method.value, user_info
                     )
+                    user_info["balance_change"] = balance_change
 
-                # 步骤 3: 执行签到（AgentRouter通过查询用户信息完成）
-                if self.provider.name.lower() == "agentrouter":
-                    # AgentRouter: 查询用户信息即可完成签到
-                    self.logger.info(
-                        f"ℹ️ [{self.account.name}] AgentRouter 通过查询用户信息自动签到"
-                    )
-                    user_info = await self._get_user_info(
-                        auth_cookies, auth_config, page=page
-                    )
-                    if user_info and user_info.get("success"):
-                        # 计算余额变化
-                        balance_change = self._calculate_balance_change(
-                            self.account.name, auth_config.method.value, user_info
-                        )
-                        user_info["balance_change"] = balance_change
-
-                        # 保存余额数据
-                        self._save_balance_data(
-                            self.account.name, auth_config.method.value, user_info
-                        )
-
-                        return True, user_info
-                    else:
-                        return False, {
-                            "error": "Failed to get user info for AgentRouter"
-                        }
-                else:
-                    # AnyRouter: 需要显式调用签到接口（在浏览器环境中执行）
-                    checkin_result = await self._do_checkin(
-                        auth_cookies, auth_config, page=page
+                    # 保存余额数据
+                    self._save_balance_data(
+                        self.account.name, auth_config.method.value, user_info
                     )
-                    if not checkin_result["success"]:
-                        return False, {
-                            "error": checkin_result.get("message", "Check-in failed")
-                        }
 
-                    self.logger.info(
-                        f"✅ [{self.account.name}] 签到成功: {checkin_result.get('message', '')}"
-                    )
+                    return True, user_info
+                else:
+                    return True, {
+                        "success": True,
+                        "message": "Check-in successful but failed to get user info",
+                    }
 
-                    # 步骤 4: 获取用户信息和余额（在浏览器环境中执行）
-                    user_info = await self._get_user_info(
-                        auth_cookies, auth_config, page=page
-                    )
-                    if user_info and user_info.get("success"):
-                        # 计算余额变化
-                        balance_change = self._calculate_balance_change(
-                            self.account.name, auth_config.method.value, user_info
-                        )
-                        user_info["balance_change"] = balance_change
-
-                        # 保存余额数据
-                        self._save_balance_data(
-                            self.account.name, auth_config.method.value, user_info
-                        )
-
-                        return True, user_info
-                    else:
-                        return True, {
-                            "success": True,
-                            "message": "Check-in successful but failed to get user info",
-                        }
+        except asyncio.TimeoutError as e:
+            self.logger.error(f"❌ [{self.account.name}] 签到超时: {str(e)}")
+            return False, {"error": f"Timeout during check-in: {str(e)}"}
+        except (httpx.HTTPError, httpx.TimeoutException) as e:
+            self.logger.error(
+                f"❌ [{self.account.name}] 网络请求异常: {type(e).__name__}: {str(e)}"
+            )
+            return False, {"error": f"Network error during check-in: {str(e)}"}
+        except (KeyError, TypeError, AttributeError) as e:
+            self.logger.error(
+                f"❌ [{self.account.name}] 数据处理异常: {type(e).__name__}: {str(e)}"
+            )
+            return False, {"error": f"Data processing error: {str(e)}"}
+        except Exception as e:
+            # 捕获所有其他未预期的异常（包括 Playwright 异常）
+            self.logger.error(
+                f"❌ [{self.account.name}] 签到过程异常: {type(e).__name__}: {str(e)}"
+            )
+            return False, {"error": f"Unexpected error during check-in: {str(e)}"}
 
-            except asyncio.TimeoutError as e:
-                self.logger.error(f"❌ [{self.account.name}] 签到超时: {str(e)}")
-                return False, {"error": f"Timeout during check-in: {str(e)}"}
-            except (httpx.HTTPError, httpx.TimeoutException) as e:
-                self.logger.error(
-                    f"❌ [{self.account.name}] 网络请求异常: {type(e).__name__}: {str(e)}"
-                )
-                return False, {"error": f"Network error during check-in: {str(e)}"}
-            except (KeyError, TypeError, AttributeError) as e:
-                self.logger.error(
-                    f"❌ [{self.account.name}] 数据处理异常: {type(e).__name__}: {str(e)}"
-                )
-                return False, {"error": f"Data processing error: {str(e)}"}
+        finally:
+            # 安全关闭页面和上下文
+            try:
+                if page and not page.is_closed():
+                    await page.close()
+                    self.logger.debug(f"🔒 [{self.account.name}] 页面已关闭")
             except Exception as e:
-                # 捕获所有其他未预期的异常（包括 Playwright 异常）
-                self.logger.error(
-                    f"❌ [{self.account.name}] 签到过程异常: {type(e).__name__}: {str(e)}"
+                self.logger.warning(
+                    f"⚠️ [{self.account.name}] 关闭页面时出现警告: {e}"
                 )
-                return False, {"error": f"Unexpected error during check-in: {str(e)}"}
 
-            finally:
-                # 安全关闭页面和上下文
-                try:
-                    if page and not page.is_closed():
-                        await page.close()
-                        self.logger.debug(f"🔒 [{self.account.name}] 页面已关闭")
-                except Exception as e:
-                    self.logger.warning(
-                        f"⚠️ [{self.account.name}] 关闭页面时出现警告: {e}"
-                    )
-
-                try:
-                    await context.close()
-                    self.logger.debug(f"🔒 [{self.account.name}] 浏览器上下文已关闭")
-                except Exception as e:
-                    self.logger.warning(
-                        f"⚠️ [{self.account.name}] 关闭浏览器上下文时出现警告: {e}"
-                    )
-
-                # 清理临时目录
-                try:
-                    if temp_dir and os.path.exists(temp_dir):
-                        import shutil
-
-                        shutil.rmtree(temp_dir, ignore_errors=True)
-                        self.logger.debug(
-                            f"🗑️ [{self.account.name}] 临时目录已清理: {temp_dir}"
-                        )
-                except Exception as e:
-                    self.logger.debug(f"⚠️ [{self.account.name}] 清理临时目录失败: {e}")
+            try:
+                await context.close()
+                self.logger.debug(f"🔒 [{self.account.name}] 浏览器上下文已关闭")
+            except Exception as e:
+                self.logger.warning(
+                    f"⚠️ [{self.account.name}] 关闭浏览器上下文时出现警告: {e}"
+                )
 
     async def _get_waf_cookies(
         self, page: Page, context: BrowserContext
@@ -25,7 +25,11 @@ class TestCheckinFlow:
             mock_page = AsyncMock()
 
             mock_playwright.return_value.start = AsyncMock(return_value=mock_browser)
-            mock_browser.chromium.launch_persistent_context = AsyncMock(return_value=mock_context)
+            mock_chromium_browser = Mock()
+            mock_chromium_browser.is_connected.return_value = True
+            mock_chromium_browser.new_context = AsyncMock(return_value=mock_context)
+            mock_chromium_browser.close = AsyncMock()
+            mock_browser.chromium.launch = AsyncMock(return_value=mock_chromium_browser)
             mock_context.new_page = AsyncMock(return_value=mock_page)
             mock_context.cookies = AsyncMock(return_value=[
                 {"name": "session", "value": "test_session"}
@@ -119,6 +119,76 @@ class TestEmailAuthenticator:
         assert result["success"] is False
         assert "not found" in result["error"].lower()
 
+    @staticmethod
+    def _make_email_authenticator(provider_config):
+        from utils.auth import EmailAuthenticator
+
+        auth_config = AuthConfig(method=AuthMethod.EMAIL, username="test@example.com", password="password123")
+        return EmailAuthenticator(account_name="Test Account", auth_config=auth_config, provider_config=provider_config)
+
+    @pytest.mark.auth
+    @pytest.mark.asyncio
+    async def test_invalid_restored_session_falls_back_to_form(self, mock_page, mock_context, sample_provider_config):
+        """测试缓存会话 cookie 存在但服务器拒绝时，回退到填写登录表单"""
+        authenticator = self._make_email_authenticator(sample_provider_config)
+        mock_context.cookies.return_value = [{"name": "session", "value": "expired", "domain": "test.com"}]
+        mock_page.evaluate.return_value = {"status": 401, "success": False}
+
+        with patch.object(authenticator, "_init_page_and_check_cloudflare", AsyncMock(return_value=True)), \
+                patch.object(authenticator, "_login_with_form", AsyncMock(return_value="Email input field not found")) as login:
+            result = await authenticator.authenticate(mock_page, mock_context)
+
+        login.assert_awaited_once_with(mock_page)
+        assert result["success"] is False
+
+    @pytest.mark.auth
+    @pytest.mark.asyncio
+    async def test_valid_restored_session_not_renewed(self, mock_page, mock_context, sample_provider_config):
+        """测试服务器确认缓存会话有效时跳过登录表单，且不续期缓存过期时间"""
+        authenticator = self._make_email_authenticator(sample_provider_config)
+        mock_context.cookies.return_value = [{"name": "session", "value": "valid", "domain": "test.com"}]
+        mock_context.storage_state.return_value = {"cookies": [], "origins": []}
+        mock_page.evaluate.return_value = {"status": 200, "success": True}
+
+        with patch.object(authenticator, "_init_page_and_check_cloudflare", AsyncMock(return_value=True)), \
+                patch.object(authenticator, "_login_with_form", AsyncMock()) as login, \
+                patch.object(authenticator, "_extract_user_from_localstorage", AsyncMock(return_value=("1", "u"))), \
+                patch("utils.auth.email.session_cache") as cache:
+            cache.load.return_value = None
+            result = await authenticator.authenticate(mock_page, mock_context)
+
+        assert result["success"] is True
+        login.assert_not_awaited()
+        cache.save.assert_not_called()
+
+
+class TestCloudscraperCookieScope:
+    """cloudscraper cookie 作用域测试"""
+
+    def test_cookie_matches_host_and_parent_domain_only(self):
+        """测试只返回目标主机及其父域的 cookie，不混入其他站点"""
+        from utils.auth.base import _cookie_matches_host
+
+        assert _cookie_matches_host("api.example.com", "api.example.com")
+        assert _cookie_matches_host(".example.com", "api.example.com")
+        assert not _cookie_matches_host("other.com", "api.example.com")
+        assert not _cookie_matches_host("ample.com", "api.example.com")
+        assert not _cookie_matches_host("example.com", None)
+
+    def test_scraper_cache_evicts_least_recently_used(self):
+        """测试 scraper 缓存按 LRU 限制数量，淘汰的实例被关闭"""
+        from utils.auth import base
+
+        with patch.object(base, "_SCRAPER_CACHE", base.OrderedDict()), patch.object(base, "_SCRAPER_CACHE_MAX", 2):
+            first, _ = base._get_scraper(("windows", "p1", "a.com"), Mock)
+            second, _ = base._get_scraper(("windows", "p2", "a.com"), Mock)
+            assert base._get_scraper(("windows", "p1", "a.com"), Mock)[0] is first  # 命中并刷新顺序
+            base._get_scraper(("windows", "p3", "a.com"), Mock)
+
+            assert list(base._SCRAPER_CACHE) == [("windows", "p1", "a.com"), ("windows", "p3", "a.com")]
+        second.close.assert_called_once()
+        first.close.assert_not_called()
+
 
 # 添加更多测试用例...
 # TODO: 添加 GitHub 和 Linux.do 认证器测试
@@ -0,0 +1,179 @@
+"""
+反检测配置模块单元测试
+"""
+import os
+from unittest.mock import AsyncMock, Mock, patch
+
+import pytest
+from playwright.async_api import BrowserContext
+
+from utils.enhanced_stealth import EnhancedStealth, ProxyManager, StealthConfig, _scroll_plan
+
+
+@pytest.fixture(autouse=True)
+def reset_stealth_cache():
+    """每个测试前后清除环境变量缓存"""
+    StealthConfig.reset_cache()
+    yield
+    StealthConfig.reset_cache()
+
+
+class TestBehaviorSimulationConfig:
+    """行为模拟开关测试"""
+
+    def test_global_switch(self):
+        """测试全局开关"""
+        with patch.dict(os.environ, {"ENABLE_BEHAVIOR_SIMULATION": "true"}):
+            assert StealthConfig.should_enable_behavior_simulation() is True
+
+    def test_enabled_methods_list(self):
+        """测试仅对指定方式启用（忽略大小写和空白）"""
+        with patch.dict(os.environ, {"BEHAVIOR_SIMULATION_METHODS": " Email , github "}):
+            assert StealthConfig.should_enable_behavior_simulation("email") is True
+            assert StealthConfig.should_enable_behavior_simulation("cookies") is False
+
+    def test_disabled_methods_list(self):
+        """测试对指定方式禁用"""
+        env = {"ENABLE_BEHAVIOR_SIMULATION": "true", "DISABLE_BEHAVIOR_SIMULATION_METHODS": "cookies"}
+        with patch.dict(os.environ, env):
+            assert StealthConfig.should_enable_behavior_simulation("cookies") is False
+            assert StealthConfig.should_enable_behavior_simulation("email") is True
+
+    def test_reset_cache_picks_up_env_changes(self):
+        """测试 reset_cache 后重新读取环境变量"""
+        with patch.dict(os.environ, {"ENABLE_BEHAVIOR_SIMULATION": "false"}):
+            assert StealthConfig.should_enable_behavior_simulation() is False
+
+        with patch.dict(os.environ, {"ENABLE_BEHAVIOR_SIMULATION": "true"}):
+            StealthConfig.reset_cache()
+            assert StealthConfig.should_enable_behavior_simulation() is True
+
+
+class TestProxyMethodConfig:
+    """按认证方式的代理开关测试"""
+
+    def test_global_disable_wins(self):
+        """测试 USE_PROXY=false 优先级最高"""
+        with patch.dict(os.environ, {"USE_PROXY": "false", "PROXY_METHODS": "email"}):
+            assert StealthConfig.should_use_proxy_for_method("email") is False
+
+    def test_no_proxy_methods(self):
+        """测试黑名单"""
+        with patch.dict(os.environ, {"USE_PROXY": "true", "NO_PROXY_METHODS": "cookies"}):
+            assert StealthConfig.should_use_proxy_for_method("cookies") is False
+            assert StealthConfig.should_use_proxy_for_method("email") is True
+
+
+class TestProxyConnectivity:
+    """代理连通性测试"""
+
+    @pytest.mark.asyncio
+    async def test_uses_httpx_proxy_argument(self):
+        """测试使用 httpx 的 proxy 参数（0.28 起已移除 proxies），带认证的代理 URL 被正确传入"""
+        client = AsyncMock()
+        client.get.return_value = Mock(status_code=204)
+        config = {"server": "http://1.2.3.4:8080", "username": "u", "password": "p"}
+
+        with patch("httpx.AsyncClient") as client_cls:
+            client_cls.return_value.__aenter__.return_value = client
+            assert await ProxyManager.test_proxy_connectivity(config) is True
+
+        assert client_cls.call_args.kwargs["proxy"] == "http://u:p@1.2.3.4:8080"
+
+
+class TestWaitTimeMultiplier:
+    """等待时间倍增器测试"""
+
+    def test_method_multiplier_overrides_default(self):
+        """测试按认证方式的倍增器优先于全局倍增器"""
+        env = {"WAIT_TIME_MULTIPLIER": "2.0", "LINUXDO_WAIT_TIME_MULTIPLIER": "2.5"}
+        with patch.dict(os.environ, env):
+            assert StealthConfig.get_wait_time_multiplier() == 2.0
+            assert StealthConfig.get_wait_time_multiplier("linux.do") == 2.5
+
+    def test_invalid_method_multiplier_falls_back(self):
+        """测试格式错误的倍增器回退到全局倍增器"""
+        with patch.dict(os.environ, {"GITHUB_WAIT_TIME_MULTIPLIER": "abc"}):
+            assert StealthConfig.get_wait_time_multiplier("github") == 1.0
+
+
+class TestBrowserArgs:
+    """浏览器启动参数测试"""
+
+    def test_no_duplicates_and_single_disable_features(self):
+        """测试参数无重复且 --disable-features 只出现一次"""
+        args = EnhancedStealth.get_enhanced_browser_args()
+        assert len(args) == len(set(args))
+
+        disable_features = [a for a in args if a.startswith("--disable-features=")]
+        assert len(disable_features) == 1
+        assert "IsolateOrigins" in disable_features[0]
+        assert "LazyFrameLoading" in disable_features[0]
+
+    def test_stealth_mode_omits_fingerprinting_flags(self):
+        """测试默认反检测模式不包含会暴露自动化特征的参数，ci 模式包含"""
+        flags = {"--disable-gpu", "--disable-web-security", "--hide-scrollbars", "--mute-audio"}
+
+        assert not flags & set(EnhancedStealth.get_enhanced_browser_args())
+        assert flags <= set(EnhancedStealth.get_enhanced_browser_args("ci"))
+
+
+class TestScrollPlan:
+    """滚动计划生成测试"""
+
+    def test_plan_covers_distance_with_positive_deltas(self):
+        """测试计划累计距离不少于目标距离，且每个滚轮事件都为正"""
+        plan = _scroll_plan(300)
+
+        assert sum(delta for delta, _ in plan) >= 300
+        assert all(delta > 0 for delta, _ in plan)
+        # 拨动内间隔很短，最后一个事件之后是人类停顿
+        assert 0.1 <= plan[-1][1] <= 0.6
+
+
+class TestReadingSimulation:
+    """阅读行为模拟测试"""
+
+    @pytest.mark.asyncio
+    async def test_in_page_mode_uses_single_evaluate(self):
+        """测试开启页面内模式时只执行一次 evaluate，不经过 CDP 鼠标输入"""
+        page = Mock()
+        page.evaluate = AsyncMock()
+        page.mouse.move = AsyncMock()
+
+        with patch.dict(os.environ, {"IN_PAGE_READING_SIMULATION": "true"}), \
+                patch("utils.enhanced_stealth.asyncio.sleep", AsyncMock()):
+            await EnhancedStealth.simulate_reading_behavior(page)
+
+        page.evaluate.assert_awaited_once()
+        page.mouse.move.assert_not_called()
+
+
+class TestInjectStealthScripts:
+    """反检测脚本注入测试"""
+
+    @pytest.mark.asyncio
+    async def test_context_injection_is_idempotent(self):
+        """测试上下文级注入只执行一次"""
+        context = Mock(spec=BrowserContext)
+        context.add_init_script = AsyncMock()
+
+        await EnhancedStealth.install_on_context(context)
+        await EnhancedStealth.inject_stealth_scripts(context)
+
+        context.add_init_script.assert_awaited_once()
+
+    @pytest.mark.asyncio
+    async def test_page_injection_skipped_when_context_installed(self):
+        """测试上下文已安装时页面级注入直接跳过，且脚本不在页面全局留下标志"""
+        context = Mock(spec=BrowserContext)
+        context.add_init_script = AsyncMock()
+        page = Mock()
+        page.context = context
+        page.add_init_script = AsyncMock()
+
+        await EnhancedStealth.install_on_context(context)
+        await EnhancedStealth.inject_stealth_scripts(page)
+
+        page.add_init_script.assert_not_awaited()
+        assert "__stealth_installed" not in context.add_init_script.await_args.args[0]
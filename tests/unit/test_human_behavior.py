@@ -0,0 +1,58 @@
+"""
+人类行为模拟模块单元测试
+"""
+import asyncio
+
+import pytest
+
+from utils.human_behavior import pipelined_actions
+
+
+class TestPipelinedActions:
+    """流水线指令发送测试"""
+
+    @staticmethod
+    async def _slow_action(cancelled: list):
+        """长时间未完成的指令，被取消时记录"""
+        try:
+            await asyncio.sleep(10)
+        except asyncio.CancelledError:
+            cancelled.append(True)
+            raise
+
+    @pytest.mark.asyncio
+    async def test_failed_action_cancels_pending(self):
+        """测试某个指令失败时，尚未完成的指令被取消，异常传给调用方"""
+        async def fail():
+            raise RuntimeError("page closed")
+
+        cancelled = []
+        with pytest.raises(RuntimeError, match="page closed"):
+            async with pipelined_actions() as submit:
+                submit(fail())
+                submit(self._slow_action(cancelled))
+
+        await asyncio.sleep(0)
+        assert cancelled == [True]
+
+    @pytest.mark.asyncio
+    async def test_caller_cancelled_cancels_pending(self):
+        """测试调用方被取消时，已发出但未完成的指令一并取消"""
+        cancelled = []
+        submitted = asyncio.Event()
+
+        async def caller():
+            async with pipelined_actions() as submit:
+                submit(self._slow_action(cancelled))
+                submitted.set()
+                await asyncio.sleep(10)
+
+        task = asyncio.ensure_future(caller())
+        await submitted.wait()
+        await asyncio.sleep(0)
+        task.cancel()
+        with pytest.raises(asyncio.CancelledError):
+            await task
+
+        await asyncio.sleep(0)
+        assert cancelled == [True]
@@ -1,6 +1,7 @@
 """
 通知模块单元测试（mocked）
 """
+import json
 import pytest
 from unittest.mock import patch, MagicMock
 from utils.notify import NotificationKit
@@ -105,6 +106,40 @@ class TestSMTPAutoDetection:
             kit.send_email("Test", "Content")
             mock_smtp.assert_called_once_with("smtp.gmail.com", 587, timeout=30)
 
+    @patch("smtplib.SMTP_SSL")
+    def test_smtp_connection_reused(self, mock_smtp):
+        """测试连续发送复用同一个已登录的 SMTP 连接"""
+        mock_smtp.return_value.noop.return_value = (250, b"OK")
+
+        with patch.dict("os.environ", {
+            "EMAIL_USER": "test@qq.com",
+            "EMAIL_PASS": "auth_code",
+            "EMAIL_TO": "to@example.com",
+        }, clear=True):
+            kit = NotificationKit()
+            kit.send_email("Test", "Content")
+            kit.send_email("Test", "Content")
+
+        mock_smtp.assert_called_once()
+        mock_smtp.return_value.login.assert_called_once()
+        assert mock_smtp.return_value.send_message.call_count == 2
+
+    @patch("utils.notify.time.sleep")
+    @patch("smtplib.SMTP_SSL")
+    def test_transient_smtp_error_retried(self, mock_smtp, mock_sleep):
+        """测试临时网络错误会退避重试，重试成功后不抛出异常"""
+        mock_smtp.return_value.send_message.side_effect = [TimeoutError("timed out"), None]
+
+        with patch.dict("os.environ", {
+            "EMAIL_USER": "test@qq.com",
+            "EMAIL_PASS": "auth_code",
+            "EMAIL_TO": "to@example.com",
+        }, clear=True):
+            NotificationKit().send_email("Test", "Content")
+
+        assert mock_smtp.return_value.send_message.call_count == 2
+        mock_sleep.assert_called_once()
+
     def test_missing_email_config_raises(self):
         """测试缺少邮件配置抛出异常"""
         with patch.dict("os.environ", {}, clear=True):
@@ -138,3 +173,42 @@ class TestPushMessage:
             kit = NotificationKit()
             kit.push_message("Title", "Content")
             mock_smtp.assert_called_once()
+
+    def test_failed_channel_does_not_block_others(self):
+        """测试单个渠道失败不影响其他渠道发送"""
+        with patch.dict("os.environ", {
+            "PUSHPLUS_TOKEN": "token",
+            "DINGDING_WEBHOOK": "https://oapi.dingtalk.com/robot/send?access_token=test",
+        }, clear=True):
+            kit = NotificationKit()
+            with patch.object(kit, "send_pushplus", side_effect=ValueError("boom")) as pushplus, \
+                    patch.object(kit, "send_dingtalk") as dingtalk:
+                kit.push_message("Title", "Content")
+
+            pushplus.assert_called_once_with("Title", "Content")
+            dingtalk.assert_called_once_with("Title", "Content")
+
+    def test_concurrent_channels_share_one_http_client(self):
+        """测试多个 webhook 渠道并发推送时只创建一个共享 HTTP 客户端"""
+        with patch.dict("os.environ", {
+            "DINGDING_WEBHOOK": "https://oapi.dingtalk.com/robot/send?access_token=test",
+            "FEISHU_WEBHOOK": "https://open.feishu.cn/hook/test",
+            "WEIXIN_WEBHOOK": "https://qyapi.weixin.qq.com/cgi-bin/webhook/send?key=test",
+        }, clear=True):
+            kit = NotificationKit()
+            with patch("utils.notify.httpx.Client") as client_cls:
+                kit.push_message("Title", "Content")
+
+        client_cls.assert_called_once()
+        assert client_cls.return_value.post.call_count == 3
+
+    def test_feishu_body_is_valid_card_json(self):
+        """测试飞书请求体由模板生成后仍是结构正确的 JSON（标题/正文中的引号、换行被正确转义）"""
+        with patch.dict("os.environ", {"FEISHU_WEBHOOK": "https://open.feishu.cn/hook/test"}, clear=True):
+            kit = NotificationKit()
+            with patch.object(kit, "_get_http") as get_http:
+                kit.send_feishu('签到 "结果"', "第一行\n第二行")
+
+        body = json.loads(get_http.return_value.post.call_args.kwargs["content"])
+        assert body["card"]["header"]["title"]["content"] == '签到 "结果"'
+        assert body["card"]["elements"][0]["content"] == "第一行\n第二行"
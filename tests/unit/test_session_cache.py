@@ -1,6 +1,7 @@
 """
 会话缓存模块单元测试
 """
+import base64
 import json
 import os
 import pytest
@@ -9,7 +10,14 @@ from datetime import datetime, timedelta
 from unittest.mock import patch, MagicMock
 from cryptography.fernet import Fernet
 
-from utils.session_cache import SessionCache
+from utils.session_cache import SessionCache, _compress_payload, _decompress_payload
+
+
+def legacy_encrypted_data(cache: SessionCache, data: str) -> str:
+    """构造旧版单文件格式中内嵌的 encrypted_data（有密钥时为 v2: AES-GCM，无密钥时为 Base64）"""
+    if cache.aead:
+        return "v2:" + base64.b64encode(cache._seal(data.encode("utf-8"))).decode("utf-8")
+    return base64.b64encode(data.encode("utf-8")).decode("utf-8")
 
 
 @pytest.fixture
@@ -45,22 +53,41 @@ def cache_without_key(temp_cache_dir):
 class TestEncryptionDecryption:
     """加密/解密测试"""
 
-    def test_fernet_encrypt_decrypt(self, cache_with_fernet):
-        """测试 Fernet 加密和解密"""
+    def test_seal_unseal_roundtrip(self, cache_with_fernet):
+        """测试 AES-GCM 加密和解密"""
+        original = b'{"cookies": [{"name": "session", "value": "abc"}]}'
+        sealed = cache_with_fernet._seal(original)
+
+        assert cache_with_fernet._unseal(sealed) == original
+        assert b"session" not in sealed  # 确保确实加密了
+
+    def test_legacy_v2_decrypt(self, cache_with_fernet):
+        """测试旧版单文件格式内嵌的 v2: AES-GCM 数据仍可解密"""
+        original = '{"cookies": [{"name": "session", "value": "abc"}]}'
+
+        assert cache_with_fernet._decrypt_data(legacy_encrypted_data(cache_with_fernet, original)) == original
+
+    def test_legacy_fernet_fallback(self, cache_with_fernet, fernet_key):
+        """测试旧 Fernet 数据仍可解密（向后兼容）"""
         original = '{"cookies": [{"name": "session", "value": "abc"}]}'
-        encrypted = cache_with_fernet._encrypt_data(original)
-        decrypted = cache_with_fernet._decrypt_data(encrypted)
+        legacy = Fernet(fernet_key.encode()).encrypt(original.encode()).decode()
 
-        assert decrypted == original
-        assert encrypted != original  # 确保确实加密了
+        assert cache_with_fernet._decrypt_data(legacy) == original
 
     def test_base64_fallback(self, cache_without_key):
-        """测试 Base64 fallback 编码和解码"""
+        """测试未设置密钥时写入的旧 Base64 数据仍可解码"""
         original = '{"test": "data"}'
-        encoded = cache_without_key._encrypt_data(original)
-        decoded = cache_without_key._decrypt_data(encoded)
 
-        assert decoded == original
+        assert cache_without_key._decrypt_data(legacy_encrypted_data(cache_without_key, original)) == original
+
+    def test_legacy_xor_fallback(self, cache_with_fernet, fernet_key):
+        """测试旧 XOR 格式数据仍可解密（向后兼容）"""
+        original = '{"cookies": [{"name": "会话", "value": "abc"}]}'
+        key_bytes = fernet_key.encode("utf-8")
+        xored = bytes(b ^ key_bytes[i % len(key_bytes)] for i, b in enumerate(original.encode("utf-8")))
+        legacy = base64.b64encode(xored).decode("utf-8")
+
+        assert cache_with_fernet._decrypt_data(legacy) == original
 
 
 class TestSaveLoadDelete:
@@ -79,6 +106,80 @@ class TestSaveLoadDelete:
         assert loaded["user_id"] == "42"
         assert loaded["username"] == "tester"
 
+    def test_payload_stored_as_raw_ciphertext(self, cache_with_fernet):
+        """测试敏感数据以原始密文单独存放，删除时一并清理"""
+        cache_with_fernet.save("bin_account", "anyrouter", [{"name": "session", "value": "secret"}])
+
+        cache_file = cache_with_fernet._get_cache_file_path("bin_account", "anyrouter")
+        payload_file = cache_file.with_suffix(".bin")
+        with open(cache_file, "r", encoding="utf-8") as f:
+            assert "encrypted_data" not in json.load(f)
+        assert b"secret" not in payload_file.read_bytes()
+
+        cache_with_fernet.delete("bin_account", "anyrouter")
+        assert not payload_file.exists()
+
+    def test_unencrypted_payload_skips_base64(self, cache_without_key):
+        """测试未设置密钥时不再 Base64 包装，旧版 Base64 数据仍可读取"""
+        cookies = [{"name": "session", "value": "plain"}]
+        cache_without_key.save("plain", "anyrouter", cookies)
+        payload_file = cache_without_key._get_cache_file_path("plain", "anyrouter").with_suffix(".bin")
+        assert cache_without_key.load("plain", "anyrouter")["cookies"] == cookies
+
+        legacy = base64.b64encode(_compress_payload(json.dumps({"cookies": cookies}).encode()))
+        assert payload_file.read_bytes()[:1] in (b"\x01", b"\x02")  # 直接存储压缩数据
+        assert json.loads(_decompress_payload(cache_without_key._unseal(legacy)))["cookies"] == cookies
+
+    def test_repeated_load_served_from_memory(self, cache_with_fernet, temp_cache_dir, fernet_key):
+        """测试重复加载不再解密，文件被其他实例改写后重新读取"""
+        cache_with_fernet.save("mem", "anyrouter", [{"name": "session", "value": "v1"}])
+        assert cache_with_fernet.load("mem", "anyrouter")["cookies"][0]["value"] == "v1"
+
+        with patch.object(cache_with_fernet, "_unseal", side_effect=AssertionError("不应再次解密")):
+            assert cache_with_fernet.load("mem", "anyrouter")["cookies"][0]["value"] == "v1"
+
+        with patch.dict(os.environ, {"SESSION_CACHE_KEY": fernet_key}):
+            SessionCache(cache_dir=temp_cache_dir).save("mem", "anyrouter", [{"name": "session", "value": "v2-new"}])
+        assert cache_with_fernet.load("mem", "anyrouter")["cookies"][0]["value"] == "v2-new"
+
+    def test_same_size_rewrite_not_served_stale(self, cache_with_fernet, temp_cache_dir, fernet_key):
+        """测试其他实例在相同 mtime 内写入同尺寸的新会话时，不会返回内存中的旧数据"""
+        cache_with_fernet.save("mem", "anyrouter", [{"name": "session", "value": "old"}])
+        assert cache_with_fernet.load("mem", "anyrouter")["cookies"][0]["value"] == "old"
+
+        cache_file = cache_with_fernet._get_cache_file_path("mem", "anyrouter")
+        files = [cache_file, cache_file.with_suffix(".bin")]
+        times = [(f.stat().st_atime_ns, f.stat().st_mtime_ns) for f in files]
+        with patch.dict(os.environ, {"SESSION_CACHE_KEY": fernet_key}):
+            SessionCache(cache_dir=temp_cache_dir).save("mem", "anyrouter", [{"name": "session", "value": "new"}])
+        for f, ns in zip(files, times):
+            os.utime(f, ns=ns)  # 模拟文件系统 mtime 精度内的改写
+
+        assert cache_with_fernet.load("mem", "anyrouter")["cookies"][0]["value"] == "new"
+
+    def test_payload_compression_roundtrip(self):
+        """测试压缩格式标记：压缩数据可还原，无标记的旧明文原样返回"""
+        original = json.dumps({"cookies": [{"name": "s", "domain": "test.com"}] * 20}).encode()
+
+        compressed = _compress_payload(original)
+        assert len(compressed) < len(original)
+        assert _decompress_payload(compressed) == original
+        assert _decompress_payload(original) == original
+
+    def test_load_legacy_single_file_format(self, cache_with_fernet):
+        """测试旧版内嵌 encrypted_data 的单文件缓存仍可加载"""
+        cookies = [{"name": "session", "value": "legacy"}]
+        cache_file = cache_with_fernet._get_cache_file_path("legacy", "anyrouter")
+        with open(cache_file, "w", encoding="utf-8") as f:
+            json.dump({
+                "account_name": "legacy",
+                "provider": "anyrouter",
+                "encrypted_data": legacy_encrypted_data(cache_with_fernet, json.dumps({"cookies": cookies})),
+                "expires_at": (datetime.now() + timedelta(hours=1)).isoformat(),
+            }, f)
+
+        assert cache_with_fernet.load("legacy", "anyrouter")["cookies"] == cookies
+
     def test_load_nonexistent(self, cache_with_fernet):
         """测试加载不存在的缓存"""
         result = cache_with_fernet.load("nonexistent", "provider")
@@ -96,6 +197,16 @@ class TestSaveLoadDelete:
         """测试删除不存在的缓存"""
         assert cache_with_fernet.delete("nonexistent", "provider") is False
 
+    def test_load_storage_state(self, cache_with_fernet):
+        """测试加载为 Playwright storage_state 格式"""
+        cookies = [{"name": "session", "value": "abc", "domain": "test.com", "path": "/"}]
+        origins = [{"origin": "https://test.com", "localStorage": [{"name": "user", "value": "{}"}]}]
+        cache_with_fernet.save("state_account", "anyrouter", cookies, origins=origins)
+
+        state = cache_with_fernet.load_storage_state("state_account", "anyrouter")
+        assert state == {"cookies": cookies, "origins": origins}
+        assert cache_with_fernet.load_storage_state("nonexistent", "anyrouter") is None
+
 
 class TestExpiry:
     """过期清理测试"""
@@ -136,6 +247,17 @@ class TestExpiry:
         # fresh 应该还在
         assert cache_with_fernet.load("fresh", "provider") is not None
 
+    def test_cleanup_uses_index_without_reading_files(self, temp_cache_dir, fernet_key):
+        """测试索引与文件一致时清理不打开缓存文件，且新实例可复用已持久化的索引"""
+        with patch.dict(os.environ, {"SESSION_CACHE_KEY": fernet_key}):
+            SessionCache(cache_dir=temp_cache_dir).save("fresh", "provider", [{"name": "s", "value": "v"}])
+            cache = SessionCache(cache_dir=temp_cache_dir)
+
+        with patch("builtins.open", side_effect=AssertionError("不应读取缓存文件")):
+            assert cache.cleanup_expired() == 0
+
+        assert list(cache._index) == ["provider_fresh.json"]
+
     def test_clear_all(self, cache_with_fernet):
         """测试清空所有缓存"""
         cache_with_fernet.save("a1", "p1", [{"name": "s", "value": "v"}])
@@ -5,10 +5,15 @@
 import os
 import asyncio
 import random
+import threading
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+from operator import itemgetter
 from abc import ABC, abstractmethod
-from typing import Optional, Dict, Any, Tuple
+from typing import Optional, Dict, Any, Callable, Tuple
 from playwright.async_api import Page, BrowserContext
 import re
+from urllib.parse import urlsplit
 
 from utils.config import AuthConfig, ProviderConfig
 from utils.logger import setup_logger
@@ -17,6 +22,7 @@ from utils.ci_config import CIConfig
 from utils.constants import (
     DEFAULT_USER_AGENT,
     KEY_COOKIE_NAMES,
+    WAF_COOKIE_NAMES,
     TimeoutConfig,
 )
 from utils.human_behavior import (
@@ -29,6 +35,57 @@ from utils.human_behavior import (
 # 模块级logger
 logger = setup_logger(__name__)
 
+# Playwright cookie 字典 -> (name, value)
+_COOKIE_NAME_VALUE = itemgetter("name", "value")
+
+
+def cookies_to_dict(cookies) -> Dict[str, str]:
+    """将 Playwright cookies 列表转换为 {name: value} 字典"""
+    return dict(map(_COOKIE_NAME_VALUE, cookies))
+
+
+# cloudscraper 实例缓存，按 (浏览器平台, 代理, 目标主机) 复用，保留 CF clearance cookie 与连接；
+# 按主机隔离，避免一个站点的 cookies 被注入到另一个站点。每个实例带一把锁，
+# 同一个 requests.Session 不能被多个线程同时使用。
+# 订阅代理会轮换，按 LRU 限制实例数量，淘汰最久未用的实例并关闭其连接池
+_SCRAPER_BROWSER = {"browser": "chrome", "platform": "windows", "desktop": True}
+_SCRAPER_CACHE_MAX = 16
+_SCRAPER_CACHE: "OrderedDict[Tuple[str, Optional[str], Optional[str]], Tuple[Any, threading.Lock]]" = OrderedDict()
+_SCRAPER_CACHE_LOCK = threading.Lock()
+
+
+def _get_scraper(
+    cache_key: Tuple[str, Optional[str], Optional[str]], factory: Callable[[], Any]
+) -> Tuple[Any, threading.Lock]:
+    """获取缓存的 scraper 及其锁（不存在时用 factory 创建，超出上限时淘汰最久未用的实例）"""
+    evicted = None
+    with _SCRAPER_CACHE_LOCK:
+        entry = _SCRAPER_CACHE.get(cache_key)
+        if entry is None:
+            entry = (factory(), threading.Lock())
+            _SCRAPER_CACHE[cache_key] = entry
+            if len(_SCRAPER_CACHE) > _SCRAPER_CACHE_MAX:
+                evicted = _SCRAPER_CACHE.popitem(last=False)[1]
+        else:
+            _SCRAPER_CACHE.move_to_end(cache_key)
+
+    if evicted is not None:
+        # 等待其他线程用完再关闭
+        old_scraper, old_lock = evicted
+        with old_lock:
+            old_scraper.close()
+    return entry
+
+
+def _cookie_matches_host(domain: str, host: Optional[str]) -> bool:
+    """cookie 的 domain 是否适用于目标主机（主机本身或其父域）"""
+    domain = domain.lstrip(".").lower()
+    return bool(host) and (host == domain or host.endswith("." + domain))
+
+
+# cloudscraper 专用线程池，限制并发，避免占用默认执行器
+_CF_EXECUTOR = ThreadPoolExecutor(max_workers=4, thread_name_prefix="cfscraper")
+
 
 class CloudscraperHelper:
     """cloudscraper 辅助类 - 用于获取绕过 Cloudflare 的初始 cookies（降级方案）"""
@@ -51,13 +108,11 @@ class CloudscraperHelper:
             try:
                 import cloudscraper
 
-                # 创建 scraper 实例
-                scraper = cloudscraper.create_scraper(
-                    browser={
-                        "browser": "chrome",
-                        "platform": "windows",
-                        "desktop": True,
-                    }
+                # 复用已有 scraper 实例（不存在时创建）
+                host = urlsplit(url).hostname
+                cache_key = (_SCRAPER_BROWSER["platform"], proxy, host)
+                scraper, scraper_lock = _get_scraper(
+                    cache_key, lambda: cloudscraper.create_scraper(browser=dict(_SCRAPER_BROWSER))
                 )
 
                 # 配置代理
@@ -65,12 +120,16 @@ class CloudscraperHelper:
                 if proxy:
                     proxies = {"http": proxy, "https": proxy}
 
-                # 访问目标网站
-                response = scraper.get(url, proxies=proxies, timeout=30)
+                with scraper_lock:
+                    # 访问目标网站
+                    scraper.get(url, proxies=proxies, timeout=30)
 
-                # 提取 cookies
-                cookies = {cookie.name: cookie.value for cookie in scraper.cookies}
-                return cookies
+                    # 提取 cookies（只取目标主机及其父域的 cookie，跳转到其他域名留下的不返回）
+                    return {
+                        cookie.name: cookie.value
+                        for cookie in scraper.cookies
+                        if _cookie_matches_host(cookie.domain, host)
+                    }
 
             except ImportError:
                 logger.debug("⚠️ cloudscraper 未安装，跳过此降级方案")
@@ -81,8 +140,8 @@ class CloudscraperHelper:
 
         # 在线程池中运行同步代码
         try:
-            loop = asyncio.get_event_loop()
-            cookies = await loop.run_in_executor(None, _sync_get_cookies)
+            loop = asyncio.get_running_loop()
+            cookies = await loop.run_in_executor(_CF_EXECUTOR, _sync_get_cookies)
             return cookies
         except Exception as e:
             logger.debug(f"⚠️ Cloudscraper 执行异常: {e}")
@@ -211,10 +270,11 @@ class Authenticator(ABC):
                         logger.debug(f"⚠️ 行为模拟异常（非致命）: {sim_error}")
 
                 # 开始等待验证通过
-                start_time = asyncio.get_event_loop().time()
+                now = asyncio.get_running_loop().time
+                start_time = now()
                 verification_passed = False
 
-                while asyncio.get_event_loop().time() - start_time < current_wait_time:
+                while now() - start_time < current_wait_time:
                     current_url = page.url
                     page_title = await page.title()
 
@@ -235,7 +295,7 @@ class Authenticator(ABC):
                         "verification" in page_title.lower()
                         or "checking" in page_title.lower()
                     ):
-                        elapsed = int(asyncio.get_event_loop().time() - start_time)
+                        elapsed = int(now() - start_time)
                         logger.info(
                             f"   ⏳ Cloudflare验证中，继续等待... ({elapsed}s/{int(current_wait_time)}s)"
                         )
@@ -250,18 +310,19 @@ class Authenticator(ABC):
                         continue
 
                     # 检查是否已经通过验证
-                    if "login" in current_url.lower() and not has_cloudflare_markers:
+                    if self._is_login_url(current_url) and not has_cloudflare_markers:
                         logger.info(f"✅ Cloudflare验证完成（第 {retry + 1} 次尝试）")
                         verification_passed = True
                         break
 
                     # 检查登录页面特征（更可靠的判断）
                     try:
-                        login_indicators = await page.query_selector_all(
+                        # 只需判断是否存在，用 locator.count() 避免为每个元素分配 ElementHandle
+                        login_indicator_count = await page.locator(
                             'input[type="email"], input[type="password"], input[name="login"], '
                             'button:has-text("登录"), button:has-text("Login")'
-                        )
-                        if len(login_indicators) > 0:
+                        ).count()
+                        if login_indicator_count > 0:
                             logger.info(
                                 f"✅ 检测到登录表单，验证已完成（第 {retry + 1} 次尝试）"
                             )
@@ -298,30 +359,43 @@ class Authenticator(ABC):
 
     def _get_domain(self, url: str) -> str:
         """从 URL 提取域名"""
-        from urllib.parse import urlparse
+        return urlsplit(url).netloc
 
-        parsed = urlparse(url)
-        return parsed.netloc
+    @staticmethod
+    def _is_login_url(url: str) -> bool:
+        """判断 URL 是否为登录页（仅检查路径与 hash 路由，忽略域名和查询参数）"""
+        parts = urlsplit(url)
+        return "login" in parts.path.lower() or "login" in parts.fragment.lower()
+
+    async def _wait_for_cookies(
+        self,
+        context: BrowserContext,
+        cookie_names,
+        max_wait_seconds: float = 10,
+        poll_interval: float = 0.2,
+    ) -> bool:
+        """轮询等待任一指定名称的cookie出现，出现即返回True，超时返回False"""
+        loop = asyncio.get_running_loop()
+        deadline = loop.time() + max_wait_seconds
+        wanted = set(cookie_names)
+
+        while True:
+            cookies = await context.cookies()
+            if any(cookie["name"] in wanted for cookie in cookies):
+                return True
+            if loop.time() >= deadline:
+                return False
+            await asyncio.sleep(poll_interval)
 
     async def _wait_for_session_cookies(
         self, context: BrowserContext, max_wait_seconds: int = 10
     ) -> bool:
-        """等待会话cookies出现"""
+        """等待会话cookies出现（每200ms检查一次，检测到即返回）"""
         try:
             logger.info(f"⏳ 等待会话cookies设置...")
-            start_time = asyncio.get_event_loop().time()
-
-            while asyncio.get_event_loop().time() - start_time < max_wait_seconds:
-                cookies = await context.cookies()
-                cookies_dict = {cookie["name"]: cookie["value"] for cookie in cookies}
-
-                # 检查是否有会话相关的cookies
-                found_session = any(name in cookies_dict for name in KEY_COOKIE_NAMES)
-                if found_session:
-                    logger.info(f"✅ 检测到会话cookies")
-                    return True
-
-                await asyncio.sleep(0.5)  # 每500ms检查一次
+            if await self._wait_for_cookies(context, KEY_COOKIE_NAMES, max_wait_seconds):
+                logger.info(f"✅ 检测到会话cookies")
+                return True
 
             logger.warning(f"⚠️ 等待会话cookies超时({max_wait_seconds}s)")
             return False
@@ -470,10 +544,13 @@ class Authenticator(ABC):
                 wait_until="domcontentloaded",
                 timeout=TimeoutConfig.PAGE_LOAD,
             )
-            await page.wait_for_timeout(TimeoutConfig.SHORT_WAIT_3)
+            # WAF cookies 出现即继续，最多等待原固定时长
+            await self._wait_for_cookies(
+                context, WAF_COOKIE_NAMES, TimeoutConfig.SHORT_WAIT_3 / 1000
+            )
 
             cookies = await context.cookies()
-            waf_cookies = {cookie["name"]: cookie["value"] for cookie in cookies}
+            waf_cookies = cookies_to_dict(cookies)
 
             if waf_cookies:
                 logger.info(f"✅ Playwright 获取成功: {len(waf_cookies)} 个 cookies")
@@ -748,9 +825,7 @@ class Authenticator(ABC):
 
             # 获取最新cookies（如果需要的话，operation_func可以在内部处理）
             current_cookies = await context.cookies()
-            cookies_dict = {
-                cookie["name"]: cookie["value"] for cookie in current_cookies
-            }
+            cookies_dict = cookies_to_dict(current_cookies)
             logger.info(
                 f"🍪 [{self.auth_config.username}] 当前有 {len(cookies_dict)} 个cookies"
             )
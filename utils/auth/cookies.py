@@ -6,7 +6,7 @@ import asyncio
 from typing import Dict, Any, Tuple, Optional
 from playwright.async_api import Page, BrowserContext
 
-from utils.auth.base import Authenticator, logger
+from utils.auth.base import Authenticator, cookies_to_dict, logger
 from utils.sanitizer import sanitize_exception
 
 
@@ -100,7 +100,7 @@ class CookiesAuthenticator(Authenticator):
 
             # 步骤3: 检查是否被重定向到登录页（说明 cookies 可能失效）
             # 注意：只有当明确在登录页且有登录表单时才判定为失效
-            if '/login' in current_url.lower():
+            if self._is_login_url(current_url):
                 has_login_form = any(
                     keyword in page_content.lower()
                     for keyword in ['<input', 'type="email"', 'type="password"', 'form']
@@ -256,7 +256,7 @@ class CookiesAuthenticator(Authenticator):
 
             # 步骤6: 如果完全无法验证，但页面不在登录页，则给予宽容判定
             # 但要确保至少有一个标识（不能完全为 None）
-            if '/login' not in current_url.lower():
+            if not self._is_login_url(current_url):
                 logger.warning(
                     f"⚠️ [{self.account_name}] 无法通过 API 或页面提取验证用户信息，"
                     f"但当前不在登录页（{current_url}），给予宽容判定"
@@ -289,8 +289,9 @@ class CookiesAuthenticator(Authenticator):
             return False, None, None, "Unable to validate cookies through any method and page is at login"
 
         except Exception as e:
-            logger.error(f"❌ [{self.account_name}] Cookies 预检异常: {e}")
-            return False, None, None, f"Validation error: {sanitize_exception(e)}"
+            error_msg = sanitize_exception(e)
+            logger.error("❌ [%s] Cookies 预检异常: %s", self.account_name, error_msg)
+            return False, None, None, f"Validation error: {error_msg}"
 
     async def _wait_for_cloudflare_bypass(
         self,
@@ -308,9 +309,10 @@ class CookiesAuthenticator(Authenticator):
             bool: 是否通过验证
         """
         try:
-            start_time = asyncio.get_event_loop().time()
+            now = asyncio.get_running_loop().time
+            start_time = now()
 
-            while asyncio.get_event_loop().time() - start_time < max_wait:
+            while now() - start_time < max_wait:
                 page_content = await page.content()
                 current_url = page.url
 
@@ -333,12 +335,12 @@ class CookiesAuthenticator(Authenticator):
                         return True
 
                 # 检查是否已跳转到正常页面
-                if '/login' in current_url and not has_cloudflare:
+                if self._is_login_url(current_url) and not has_cloudflare:
                     logger.info(f"✅ [{self.account_name}] 已跳转到登录页，验证通过")
                     return True
 
                 # 继续等待
-                elapsed = int(asyncio.get_event_loop().time() - start_time)
+                elapsed = int(now() - start_time)
                 logger.info(f"   ⏳ 等待 Cloudflare 验证... ({elapsed}s/{max_wait}s)")
                 await asyncio.sleep(2)
 
@@ -411,7 +413,7 @@ class CookiesAuthenticator(Authenticator):
 
             # 获取cookies字典用于验证
             final_cookies = await context.cookies()
-            cookies_dict = {cookie["name"]: cookie["value"] for cookie in final_cookies}
+            cookies_dict = cookies_to_dict(final_cookies)
 
             # 🔥 核心改进：使用预检机制验证 Cookies
             logger.info(f"🔍 [{self.account_name}] 开始 Cookies 有效性预检...")
@@ -2,16 +2,22 @@
 邮箱密码认证器 - 使用用户名和密码进行表单登录
 """
 
+import logging
 from typing import Dict, Any, Optional, Tuple
 from playwright.async_api import Page, BrowserContext
 
-from utils.auth.base import Authenticator, logger
+from utils.auth.base import Authenticator, cookies_to_dict, logger
 from utils.sanitizer import sanitize_exception
 from utils.session_cache import SessionCache
 from utils.constants import (
     EMAIL_INPUT_SELECTORS,
+    EMAIL_TAB_SELECTORS,
+    KEY_COOKIE_NAMES,
     PASSWORD_INPUT_SELECTORS,
     LOGIN_BUTTON_SELECTORS,
+    LOGIN_ERROR_SELECTOR,
+    LOGIN_ERROR_SELECTORS,
+    LOGGED_IN_INDICATOR_SELECTOR,
     POPUP_CLOSE_SELECTORS,
     TimeoutConfig,
 )
@@ -19,6 +25,19 @@ from utils.constants import (
 # 会话缓存实例
 session_cache = SessionCache()
 
+# 在页面内请求用户信息 API（自动携带浏览器 cookies），确认恢复的会话仍被服务器接受
+_SESSION_CHECK_SCRIPT = """async ({url, apiUser}) => {
+    try {
+        const headers = {'Accept': 'application/json', 'X-Requested-With': 'XMLHttpRequest'};
+        if (apiUser) headers['New-Api-User'] = apiUser;
+        const response = await fetch(url, {method: 'GET', headers, credentials: 'include'});
+        const data = await response.json().catch(() => null);
+        return {status: response.status, success: !!(data && data.success)};
+    } catch (error) {
+        return {status: 0, success: false};
+    }
+}"""
+
 
 class EmailAuthenticator(Authenticator):
     """邮箱密码认证"""
@@ -50,14 +69,7 @@ class EmailAuthenticator(Authenticator):
         except:
             pass
 
-        for sel in [
-            'button:has-text("邮箱")',
-            'a:has-text("邮箱")',
-            'button:has-text("Email")',
-            'a:has-text("Email")',
-            'text=邮箱登录',
-            'text=Email Login',
-        ]:
+        for sel in EMAIL_TAB_SELECTORS:
             try:
                 el = await page.query_selector(sel)
                 if el:
@@ -89,10 +101,15 @@ class EmailAuthenticator(Authenticator):
 
     async def _debug_page_inputs(self, page: Page):
         """输出调试信息"""
+        logger.error(f"❌ [{self.auth_config.username}] 邮箱输入框未找到")
+
+        # 以下调试信息均为 INFO 级别，日志级别更高时跳过额外的页面查询
+        if not logger.isEnabledFor(logging.INFO):
+            return
+
         try:
             page_title = await page.title()
             page_url = page.url
-            logger.error(f"❌ [{self.auth_config.username}] 邮箱输入框未找到")
             logger.info(f"   当前页面: {page_title}")
             logger.info(f"   当前URL: {page_url}")
 
@@ -127,7 +144,7 @@ class EmailAuthenticator(Authenticator):
         logger.info(f"🔍 [{self.auth_config.username}] 登录后URL: {current_url}")
 
         # 方法1: 检查URL变化
-        if "login" not in current_url.lower():
+        if not self._is_login_url(current_url):
             logger.info(f"✅ [{self.auth_config.username}] URL已变化，登录可能成功")
             return True, None
 
@@ -145,10 +162,7 @@ class EmailAuthenticator(Authenticator):
 
         # 方法3: 检查用户界面元素
         try:
-            user_elements = await page.query_selector_all(
-                '[class*="user"], [class*="avatar"], [class*="profile"], button:has-text("退出"), button:has-text("Logout")'
-            )
-            if user_elements:
+            if await page.locator(LOGGED_IN_INDICATOR_SELECTOR).count():
                 logger.info(f"✅ [{self.auth_config.username}] 找到用户界面元素，登录成功")
                 return True, None
         except:
@@ -160,7 +174,7 @@ class EmailAuthenticator(Authenticator):
             return False, error_msg
 
         # 仍在登录页
-        if "login" in current_url.lower():
+        if self._is_login_url(current_url):
             return False, "Login failed - still on login page (may need captcha)"
 
         return True, None
@@ -168,79 +182,135 @@ class EmailAuthenticator(Authenticator):
     async def _check_error_messages(self, page: Page) -> Optional[str]:
         """检查错误提示信息"""
         try:
-            error_selectors = ['.error', '.alert-danger', '[class*="error"]', '.toast-error', '[role="alert"]']
-            for sel in error_selectors:
-                error_msg = await page.query_selector(sel)
-                if error_msg:
-                    try:
-                        error_text = await error_msg.inner_text()
-                        if error_text and error_text.strip():
-                            # 检查是否是成功消息
-                            success_keywords = ['成功', 'success', '登录成功', 'login success']
-                            error_keywords = ['失败', '错误', 'error', 'invalid', 'incorrect', '验证码', 'captcha']
-
-                            error_text_lower = error_text.lower()
-                            is_success = any(keyword in error_text_lower for keyword in success_keywords)
-                            is_real_error = any(keyword in error_text_lower for keyword in error_keywords)
-
-                            if is_real_error:
-                                logger.error(f"❌ [{self.auth_config.username}] 登录错误: {error_text}")
-                                return f"Login failed: {error_text}"
-                            elif is_success:
-                                logger.info(f"✅ [{self.auth_config.username}] 检测到成功消息: {error_text}")
-                            else:
-                                logger.warning(f"⚠️ [{self.auth_config.username}] 检测到消息: {error_text}")
-                    except:
-                        pass
+            # 一次 evaluate 批量取出各选择器首个元素的文本，避免逐元素 inner_text 往返
+            error_texts = await page.evaluate(
+                """(selectors) => selectors
+                    .map(sel => document.querySelector(sel))
+                    .map(el => (el && el.innerText ? el.innerText.trim() : ''))
+                    .filter(Boolean)""",
+                LOGIN_ERROR_SELECTORS,
+            )
+
+            success_keywords = ['成功', 'success', '登录成功', 'login success']
+            error_keywords = ['失败', '错误', 'error', 'invalid', 'incorrect', '验证码', 'captcha']
+
+            for error_text in error_texts or []:
+                # 检查是否是成功消息
+                error_text_lower = error_text.lower()
+                is_success = any(keyword in error_text_lower for keyword in success_keywords)
+                is_real_error = any(keyword in error_text_lower for keyword in error_keywords)
+
+                if is_real_error:
+                    logger.error(f"❌ [{self.auth_config.username}] 登录错误: {error_text}")
+                    return f"Login failed: {error_text}"
+                elif is_success:
+                    logger.info(f"✅ [{self.auth_config.username}] 检测到成功消息: {error_text}")
+                else:
+                    logger.warning(f"⚠️ [{self.auth_config.username}] 检测到消息: {error_text}")
         except:
             pass
         return None
 
-    async def authenticate(self, page: Page, context: BrowserContext) -> Dict[str, Any]:
-        """使用邮箱密码登录"""
+    async def _has_restored_session(self, page: Page, context: BrowserContext) -> bool:
+        """检查上下文是否已通过缓存的 storage_state 恢复登录态（未被重定向到登录页，且服务器确认会话有效）"""
+        # 页面打开失败时停留在 about:blank，不能据此认为已登录
+        if not page.url.startswith("http") or self._is_login_url(page.url):
+            return False
+        cookies = await context.cookies()
+        if not any(cookie["name"] in KEY_COOKIE_NAMES for cookie in cookies):
+            return False
+        return await self._verify_restored_session(page)
+
+    async def _verify_restored_session(self, page: Page) -> bool:
+        """向服务器确认恢复的会话仍然有效（用户信息 API；API 无法给出结论时以页面上的已登录界面元素为准）"""
+        cached = session_cache.load(self.account_name, self.provider_config.name) or {}
+        api_user = self.auth_config.api_user or cached.get("user_id")
         try:
-            logger.info(f"ℹ️ Starting Email authentication")
+            result = await page.evaluate(
+                _SESSION_CHECK_SCRIPT,
+                {"url": self.provider_config.get_user_info_url(), "apiUser": str(api_user) if api_user else ""},
+            )
+            if result["status"] == 200:
+                return result["success"]
+            if result["status"] in (401, 403):
+                logger.info(f"ℹ️ [{self.auth_config.username}] 缓存会话已失效（{result['status']}），重新登录")
+                return False
+        except Exception as e:
+            logger.debug(f"⚠️ [{self.auth_config.username}] 会话校验请求失败: {e}")
 
-            if not await self._init_page_and_check_cloudflare(page):
-                return {"success": False, "error": "Cloudflare verification timeout"}
+        try:
+            return await page.locator(LOGGED_IN_INDICATOR_SELECTOR).count() > 0
+        except Exception:
+            return False
+
+    async def _login_with_form(self, page: Page) -> Optional[str]:
+        """填写并提交登录表单，成功返回None，失败返回错误信息"""
+        await self._close_popups(page)
+        await self._find_and_click_email_tab(page)
+        await page.wait_for_timeout(TimeoutConfig.SHORT_WAIT_2)
 
-            await self._close_popups(page)
-            await self._find_and_click_email_tab(page)
-            await page.wait_for_timeout(TimeoutConfig.SHORT_WAIT_2)
+        email_input = await self._find_email_input(page)
+        if not email_input:
+            return "Email input field not found"
 
-            email_input = await self._find_email_input(page)
-            if not email_input:
-                return {"success": False, "error": "Email input field not found"}
+        password_input = await page.query_selector(PASSWORD_INPUT_SELECTORS[0])
+        if not password_input:
+            return "Password input field not found"
 
-            password_input = await page.query_selector('input[type="password"]')
-            if not password_input:
-                return {"success": False, "error": "Password input field not found"}
+        await email_input.fill(self.auth_config.username)
 
-            await email_input.fill(self.auth_config.username)
+        error = await self._fill_password(password_input)
+        if error:
+            return error
 
-            error = await self._fill_password(password_input)
-            if error:
-                return {"success": False, "error": error}
+        login_button = await self._find_and_click_login_button(page)
+        if not login_button:
+            return "Login button not found"
 
-            login_button = await self._find_and_click_login_button(page)
-            if not login_button:
-                return {"success": False, "error": "Login button not found"}
+        logger.info(f"🔑 [{self.auth_config.username}] 点击登录按钮...")
+        await login_button.click()
 
-            logger.info(f"🔑 [{self.auth_config.username}] 点击登录按钮...")
-            await login_button.click()
+        try:
+            # 页面内竞速等待：离开登录页 或 出现错误提示，任一满足即返回
+            # （只认可见且有文字的错误提示，很多登录页会预先渲染空的/隐藏的提示容器）
+            await page.wait_for_function(
+                """(errorSelector) => !(location.pathname + location.hash).toLowerCase().includes('login')
+                    || Array.from(document.querySelectorAll(errorSelector))
+                        .some(el => el.offsetParent !== null && el.innerText.trim() !== '')""",
+                arg=LOGIN_ERROR_SELECTOR,
+                timeout=TimeoutConfig.MEDIUM_WAIT_10,
+            )
+        except Exception:
+            logger.warning(f"⚠️ [{self.auth_config.username}] 页面加载超时，继续检查登录状态...")
 
-            try:
-                await page.wait_for_load_state("networkidle", timeout=TimeoutConfig.MEDIUM_WAIT_10)
-                await page.wait_for_timeout(TimeoutConfig.SHORT_WAIT_2)
-            except Exception:
-                logger.warning(f"⚠️ [{self.auth_config.username}] 页面加载超时，继续检查登录状态...")
+        success, error_msg = await self._check_login_success(page)
+        if not success:
+            return error_msg
 
-            success, error_msg = await self._check_login_success(page)
-            if not success:
-                return {"success": False, "error": error_msg}
+        return None
 
-            final_cookies = await context.cookies()
-            cookies_dict = {cookie["name"]: cookie["value"] for cookie in final_cookies}
+    async def authenticate(self, page: Page, context: BrowserContext) -> Dict[str, Any]:
+        """使用邮箱密码登录"""
+        try:
+            logger.info(f"ℹ️ Starting Email authentication")
+
+            if not await self._init_page_and_check_cloudflare(page):
+                return {"success": False, "error": "Cloudflare verification timeout"}
+
+            restored = await self._has_restored_session(page, context)
+            if restored:
+                logger.info(f"♻️ [{self.auth_config.username}] 已恢复缓存会话，跳过登录表单")
+            else:
+                # 缓存会话未通过校验时页面可能停在控制台或 about:blank，重新打开登录页
+                if not self._is_login_url(page.url) and not await self._init_page_and_check_cloudflare(page):
+                    return {"success": False, "error": "Cloudflare verification timeout"}
+                error = await self._login_with_form(page)
+                if error:
+                    return {"success": False, "error": error}
+
+            storage_state = await context.storage_state()
+            final_cookies = storage_state.get("cookies", [])
+            cookies_dict = cookies_to_dict(final_cookies)
 
             if "session" not in cookies_dict and "sessionid" not in cookies_dict:
                 logger.warning(f"⚠️ [{self.auth_config.username}] 未找到session cookie")
@@ -253,19 +323,23 @@ class EmailAuthenticator(Authenticator):
                 logger.info(f"ℹ️ [{self.auth_config.username}] localStorage未获取到用户ID，尝试API")
                 user_id, username = await self._extract_user_info(page, cookies_dict)
 
-            # 保存会话缓存
-            try:
-                session_cache.save(
-                    account_name=self.account_name,
-                    provider=self.provider_config.name,
-                    cookies=final_cookies,
-                    user_id=user_id,
-                    username=username,
-                    expiry_hours=24
-                )
-                logger.info(f"✅ [{self.auth_config.username}] 会话已缓存（24小时有效）")
-            except Exception as cache_error:
-                logger.warning(f"⚠️ [{self.auth_config.username}] 缓存保存失败: {cache_error}")
+            # 保存会话缓存（复用的缓存会话不重新保存，避免未经重新登录就续期过期时间）
+            if restored:
+                logger.info(f"♻️ [{self.auth_config.username}] 复用缓存会话，不续期缓存过期时间")
+            else:
+                try:
+                    session_cache.save(
+                        account_name=self.account_name,
+                        provider=self.provider_config.name,
+                        cookies=final_cookies,
+                        user_id=user_id,
+                        username=username,
+                        expiry_hours=24,
+                        origins=storage_state.get("origins"),
+                    )
+                    logger.info(f"✅ [{self.auth_config.username}] 会话已缓存（24小时有效）")
+                except Exception as cache_error:
+                    logger.warning(f"⚠️ [{self.auth_config.username}] 缓存保存失败: {cache_error}")
 
             return {"success": True, "cookies": cookies_dict, "user_id": user_id, "username": username}
 
@@ -11,6 +11,12 @@ from urllib.parse import urlparse
 from utils.logger import setup_logger
 from utils.auth_method import AuthMethod
 
+try:
+    # orjson 为可选依赖（C 实现，解析更快），未安装时回退到标准库 json
+    from orjson import loads as _json_loads
+except ImportError:
+    _json_loads = json.loads
+
 logger = setup_logger(__name__)
 
 
@@ -68,27 +74,37 @@ class AccountConfig:
     auth_configs: List[AuthConfig] = field(default_factory=list)
 
     @classmethod
-    def from_dict(cls, data: dict, index: int) -> "AccountConfig":
-        """从字典创建 AccountConfig"""
-        name = data.get("name", f"Account {index + 1}")
-        provider = data.get("provider", "anyrouter")
+    def from_dict(
+        cls, data: dict, index: int, provider: Optional[str] = None
+    ) -> "AccountConfig":
+        """从字典创建 AccountConfig
+
+        Args:
+            data: 账号配置字典
+            index: 账号索引（用于默认名称）
+            provider: 强制指定的 Provider（为空时读取 data["provider"]）
+        """
+        get = data.get
+        name = get("name", f"Account {index + 1}")
+        provider = provider or get("provider", "anyrouter")
 
         # 解析所有可能的认证方式
         auth_configs = []
 
         # Cookies 认证
-        if "cookies" in data and data["cookies"]:
+        cookies = get("cookies")
+        if cookies:
             auth_configs.append(
                 AuthConfig(
                     method=AuthMethod.COOKIES,
-                    cookies=data["cookies"],
-                    api_user=data.get("api_user"),
+                    cookies=cookies,
+                    api_user=get("api_user"),
                 )
             )
 
         # Email 认证
-        if "email" in data:
-            email_config = data["email"]
+        email_config = get("email")
+        if email_config is not None:
             auth_configs.append(
                 AuthConfig(
                     method=AuthMethod.EMAIL,
@@ -140,7 +156,7 @@ class AppConfig:
         custom_providers_str = os.getenv("PROVIDERS")
         if custom_providers_str:
             try:
-                custom_providers_data = json.loads(custom_providers_str)
+                custom_providers_data = _json_loads(custom_providers_str)
                 for name, config in custom_providers_data.items():
                     default_providers[name] = ProviderConfig(
                         name=config.get("name", name),
@@ -167,13 +183,12 @@ def load_accounts() -> Optional[List[AccountConfig]]:
     anyrouter_str = os.getenv("ANYROUTER_ACCOUNTS")
     if anyrouter_str:
         try:
-            anyrouter_data = json.loads(anyrouter_str)
+            anyrouter_data = _json_loads(anyrouter_str)
             if isinstance(anyrouter_data, list):
-                for i, account_data in enumerate(anyrouter_data):
-                    account_data["provider"] = "anyrouter"
-                    all_accounts.append(
-                        AccountConfig.from_dict(account_data, len(all_accounts))
-                    )
+                all_accounts.extend(
+                    AccountConfig.from_dict(account_data, i, provider="anyrouter")
+                    for i, account_data in enumerate(anyrouter_data, start=len(all_accounts))
+                )
         except Exception as e:
             logger.error(f"❌ Failed to load ANYROUTER_ACCOUNTS: {e}")
 
@@ -181,13 +196,12 @@ def load_accounts() -> Optional[List[AccountConfig]]:
     agentrouter_str = os.getenv("AGENTROUTER_ACCOUNTS")
     if agentrouter_str:
         try:
-            agentrouter_data = json.loads(agentrouter_str)
+            agentrouter_data = _json_loads(agentrouter_str)
             if isinstance(agentrouter_data, list):
-                for i, account_data in enumerate(agentrouter_data):
-                    account_data["provider"] = "agentrouter"
-                    all_accounts.append(
-                        AccountConfig.from_dict(account_data, len(all_accounts))
-                    )
+                all_accounts.extend(
+                    AccountConfig.from_dict(account_data, i, provider="agentrouter")
+                    for i, account_data in enumerate(agentrouter_data, start=len(all_accounts))
+                )
         except Exception as e:
             logger.error(f"❌ Failed to load AGENTROUTER_ACCOUNTS: {e}")
 
@@ -195,12 +209,12 @@ def load_accounts() -> Optional[List[AccountConfig]]:
     accounts_str = os.getenv("ACCOUNTS")
     if accounts_str:
         try:
-            accounts_data = json.loads(accounts_str)
+            accounts_data = _json_loads(accounts_str)
             if isinstance(accounts_data, list):
-                for i, account_data in enumerate(accounts_data):
-                    all_accounts.append(
-                        AccountConfig.from_dict(account_data, len(all_accounts))
-                    )
+                all_accounts.extend(
+                    AccountConfig.from_dict(account_data, i)
+                    for i, account_data in enumerate(accounts_data, start=len(all_accounts))
+                )
         except Exception as e:
             logger.error(f"❌ Failed to load ACCOUNTS: {e}")
 
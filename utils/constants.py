@@ -179,6 +179,10 @@ BROWSER_VIEWPORT = {
     "height": 1080,
 }
 
+# 浏览器语言与时区（通过上下文参数由浏览器原生模拟，无需在注入脚本中改写 Date/Intl）
+BROWSER_LOCALE = "zh-CN"
+BROWSER_TIMEZONE_ID = "Asia/Shanghai"
+
 
 # ==================== 认证选择器 ====================
 # 邮箱输入框选择器列表
@@ -211,6 +215,34 @@ LOGIN_BUTTON_SELECTORS = [
     'button.semi-button:has-text("登录")',
 ]
 
+# 邮箱登录选项卡选择器
+EMAIL_TAB_SELECTORS = [
+    'button:has-text("邮箱")',
+    'a:has-text("邮箱")',
+    'button:has-text("Email")',
+    'a:has-text("Email")',
+    'text=邮箱登录',
+    'text=Email Login',
+]
+
+# 登录错误提示选择器（逐个取首个匹配元素）
+LOGIN_ERROR_SELECTORS = [
+    '.error',
+    '.alert-danger',
+    '[class*="error"]',
+    '.toast-error',
+    '[role="alert"]',
+]
+
+# 登录错误提示合并选择器（用于页面内竞速等待）
+LOGIN_ERROR_SELECTOR = '.error, .alert-danger, .toast-error, [role="alert"]'
+
+# 已登录用户界面元素合并选择器
+LOGGED_IN_INDICATOR_SELECTOR = (
+    '[class*="user"], [class*="avatar"], [class*="profile"], '
+    'button:has-text("退出"), button:has-text("Logout")'
+)
+
 # 弹窗关闭按钮选择器
 POPUP_CLOSE_SELECTORS = [
     '.semi-modal .semi-modal-close',
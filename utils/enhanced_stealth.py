@@ -5,711 +5,305 @@
 """
 
 import asyncio
+import hashlib
+import os
 import random
-from typing import Optional
+import re
+from functools import lru_cache
+from importlib import resources
+from typing import Dict, Final, FrozenSet, List, Literal, Optional, Tuple, Union
+from urllib.parse import urlparse, urlunparse
 from playwright.async_api import Page, BrowserContext
+from playwright.async_api import TimeoutError as PlaywrightTimeoutError
+from utils.human_behavior import pipelined_actions
 from utils.logger import setup_logger
 
 logger = setup_logger(__name__)
 
+# 模块专用随机数生成器（不与其他模块共享全局 random 的状态）
+_rng = random.Random()
+
+# 增强版反检测脚本原文（可读版本，独立存放于 enhanced_stealth.js，注入前会做一次精简）
+_STEALTH_SCRIPT_RAW: Final[str] = (
+    resources.files(__package__).joinpath("enhanced_stealth.js").read_text(encoding="utf-8")
+)
+
+_JS_LINE_COMMENT_RE = re.compile(r"^\s*//.*$")
+_JS_TRAILING_COMMENT_RE = re.compile(r"\s+//[^'\"`\n]*$")
+_JS_CONSOLE_LOG_RE = re.compile(r"^\s*console\.log\(.*\);\s*$")
+
+# 是否保留脚本中的 console.log 调试输出（默认去除：每个页面都会执行，且页面可读到控制台输出）
+_STEALTH_DEBUG: Final[bool] = os.getenv("STEALTH_DEBUG", "false").lower() == "true"
+
+
+def _minify_js(script: str, keep_console_log: bool = False) -> str:
+    """精简注入脚本：去除整行注释、行尾注释、缩进和空行（只做保守处理，不改写语句）
+
+    keep_console_log 为 False 时同时去除单行的 console.log 调试语句
+    """
+    lines = []
+    for line in script.splitlines():
+        if _JS_LINE_COMMENT_RE.match(line):
+            continue
+        if not keep_console_log and _JS_CONSOLE_LOG_RE.match(line):
+            continue
+        line = _JS_TRAILING_COMMENT_RE.sub("", line).strip()
+        if line:
+            lines.append(line)
+    return "\n".join(lines)
+
+
+# 模块加载时精简一次，所有页面复用同一个字符串对象
+# 源码逐字节不变，渲染进程内 V8 的编译缓存（按源码哈希）即可跨导航命中；
+# 不使用 Runtime.compileScript：其 scriptId 绑定单个执行上下文，导航后即失效，
+# 且 frameNavigated 时再执行已晚于页面脚本
+# 整体包装为严格模式 IIFE：作为单个编译单元，且顶层 const/function 不会泄漏到页面全局作用域
+# （否则页面脚本可直接探测到 originalToString 等变量，同名 const 声明还会报重复声明错误）
+# 不在页面全局上放任何幂等标志（'xxx' in window 即可探测到）；重复注入由 Python 侧的
+# _stealth_injected 标记防止（install_on_context / inject_stealth_scripts）
+_STEALTH_SCRIPT: Final[str] = _minify_js(
+    "(() => {\n'use strict';\n"
+    f"{_STEALTH_SCRIPT_RAW}\n}})();",
+    keep_console_log=_STEALTH_DEBUG,
+)
+_STEALTH_SCRIPT_HASH: Final[str] = hashlib.sha1(_STEALTH_SCRIPT.encode("utf-8")).hexdigest()
+
+# Turnstile 快速探测超时（毫秒）
+TURNSTILE_PROBE_TIMEOUT = 1500
+
+# Turnstile / Cloudflare 挑战选择器（模块级常量，避免每次调用重建字符串）
+_TURNSTILE_IFRAME_SEL: Final[str] = 'iframe[src*="challenges.cloudflare.com"]'
+_CHALLENGE_ANY_SEL: Final[str] = f'{_TURNSTILE_IFRAME_SEL}, [class*="cf-challenge"], #challenge-form'
+
+
+# 页面内阅读模拟（一次 evaluate 完成全部移动和滚动，按 requestAnimationFrame 驱动）
+# 注意：页面内派发的事件 isTrusted=false，仅用于预热等不涉及人机验证的场景
+_IN_PAGE_READING_SCRIPT: Final[str] = """async ({moves, scrolls}) => {
+    const nextFrame = () => new Promise(resolve => requestAnimationFrame(resolve));
+    const sleep = ms => new Promise(resolve => setTimeout(resolve, ms));
+    let cx = 0, cy = 0;
+    for (const [x, y, duration, pause] of moves) {
+        const start = performance.now(), sx = cx, sy = cy;
+        for (;;) {
+            const t = Math.min(1, (performance.now() - start) / (duration * 1000));
+            const ease = t * t * (3 - 2 * t);
+            cx = sx + (x - sx) * ease;
+            cy = sy + (y - sy) * ease;
+            const target = document.elementFromPoint(cx, cy) || document.documentElement;
+            target.dispatchEvent(new MouseEvent('mousemove', {clientX: cx, clientY: cy, bubbles: true}));
+            if (t >= 1) break;
+            await nextFrame();
+        }
+        await sleep(pause * 1000);
+    }
+    for (const [distance, pause] of scrolls) {
+        window.scrollBy({top: distance, behavior: 'smooth'});
+        await sleep(pause * 1000);
+    }
+}"""
+
+# 浏览器启动参数（模块加载时构建一次，已去重）
+# 反检测模式使用的安全参数：不会与脚本中的 WebGL/Canvas 伪装或真实浏览器行为相矛盾
+_STEALTH_ARGS: Final[Tuple[str, ...]] = (
+    # ==================== 核心反检测参数（最重要） ====================
+    "--disable-blink-features=AutomationControlled",  # 禁用自动化控制特征
+    "--exclude-switches=enable-automation",  # 排除自动化开关
+
+    # ==================== 浏览器行为优化 ====================
+    "--window-size=1920,1080",  # 固定窗口大小（常见分辨率）
+    "--start-maximized",  # 最大化启动
+    "--no-first-run",  # 跳过首次运行体验
+    "--no-default-browser-check",  # 不检查默认浏览器
+    "--disable-popup-blocking",  # 禁用弹窗阻止
+
+    # ==================== 性能优化（CI环境必需） ====================
+    "--disable-dev-shm-usage",  # 禁用/dev/shm使用（Docker/CI环境必需）
+    "--no-sandbox",  # 禁用沙箱（CI环境必需）
+    "--disable-setuid-sandbox",  # 禁用setuid沙箱
+
+    # ==================== 功能开关 ====================
+    # Chromium 只认最后一个 --disable-features，必须合并为一个参数
+    "--disable-features=" + ",".join((
+        "IsolateOrigins",  # 禁用站点隔离
+        "site-per-process",
+        "OutOfBlinkCors",  # 禁用CORS特性
+        "ImprovedCookieControls",  # 禁用改进的Cookie控制
+        "LazyFrameLoading",  # 禁用懒加载
+        "GlobalMediaControls",  # 禁用全局媒体控制
+        "TranslateUI",  # 禁用翻译UI
+        "ChromeWhatsNewUI",  # 禁用"新功能"提示
+    )),
+    "--enable-features=NetworkService,NetworkServiceInProcess",  # 启用网络服务
+
+    # ==================== 网络优化 ====================
+    "--allow-running-insecure-content",  # 允许运行不安全内容
+
+    # ==================== 媒体优化 ====================
+    "--use-fake-ui-for-media-stream",  # 使用假UI处理媒体流
+    "--use-fake-device-for-media-stream",  # 使用假设备处理媒体流
+    "--autoplay-policy=no-user-gesture-required",  # 自动播放策略
+
+    # ==================== 背景和定时器优化 ====================
+    "--disable-background-timer-throttling",  # 禁用后台定时器节流
+    "--disable-backgrounding-occluded-windows",  # 禁用后台窗口优化
+    "--disable-renderer-backgrounding",  # 禁用渲染器后台优化
+    "--disable-hang-monitor",  # 禁用挂起监控
+
+    # ==================== 稳定性优化 ====================
+    "--disable-logging",  # 禁用日志（减少IO）
+    "--disable-crash-reporter",  # 禁用崩溃报告
+    "--disable-in-process-stack-traces",  # 禁用进程内堆栈跟踪
+    "--disable-breakpad",  # 禁用崩溃报告守护进程
+    "--disable-component-extensions-with-background-pages",  # 禁用带后台页面的组件扩展
+
+    # ==================== 隐私和追踪 ====================
+    "--disable-sync",  # 禁用同步
+    "--metrics-recording-only",  # 仅记录指标
+    "--disable-default-apps",  # 禁用默认应用
+
+    # ==================== 渲染优化 ====================
+    "--disable-software-rasterizer",  # 禁用软件光栅化
+
+    # ==================== 语言和地区 ====================
+    "--lang=zh-CN",  # 设置语言为中文
+    "--accept-lang=zh-CN,zh,en-US,en",  # 接受语言列表
+
+    # ==================== 扩展和插件 ====================
+    "--disable-extensions",  # 禁用扩展
+    "--disable-plugins-discovery",  # 禁用插件发现
+
+    # ==================== IPC和进程 ====================
+    "--disable-ipc-flooding-protection",  # 禁用IPC洪水保护
+    "--disable-infobars",  # 禁用信息栏
+    "--disable-notifications",  # 禁用通知
+
+    # ==================== 模拟真实浏览器特征 ====================
+    "--force-color-profile=srgb",  # 强制使用sRGB颜色配置文件
+
+    # ==================== 其他优化 ====================
+    "--disable-domain-reliability",  # 禁用域名可靠性服务
+    "--disable-client-side-phishing-detection",  # 禁用客户端钓鱼检测
+)
+
+# 仅为性能添加、但本身就是自动化指纹的参数（只在非对抗页面上使用）：
+# 禁用 GPU 会让 WebGL 渲染器信息与伪装值不一致，禁用 Web 安全会产生异常的 CORS 行为，
+# 隐藏滚动条/禁用抗锯齿会改变视口和 Canvas 渲染结果
+_CI_PERF_ARGS: Final[Tuple[str, ...]] = (
+    "--disable-gpu",  # 禁用GPU加速（headless模式下）
+    "--disable-web-security",  # 禁用Web安全（允许跨域，谨慎使用）
+    "--disable-canvas-aa",  # 禁用Canvas抗锯齿
+    "--disable-2d-canvas-clip-aa",  # 禁用2D Canvas裁剪抗锯齿
+    "--hide-scrollbars",  # 隐藏滚动条
+    "--mute-audio",  # 静音
+)
+
+_BROWSER_ARGS: Final[Dict[str, Tuple[str, ...]]] = {
+    "stealth": _STEALTH_ARGS,
+    "ci": _STEALTH_ARGS + _CI_PERF_ARGS,
+}
+
+
+@lru_cache(maxsize=None)
+def _ease_curve(steps: int) -> Tuple[float, ...]:
+    """ease-in-out 曲线取值表（贝塞尔曲线公式: 3t^2 - 2t^3，t = i/steps），按步数缓存"""
+    return tuple((i / steps) ** 2 * (3 - 2 * i / steps) for i in range(steps))
+
+
+def _mouse_trajectory(
+    start_x: float, start_y: float, target_x: float, target_y: float, duration: float
+) -> List[Tuple[float, float, float]]:
+    """
+    预计算人类般的鼠标轨迹（ease-in-out 曲线 + 手部抖动）
+
+    Returns:
+        [(x, y, 该步之后的停顿秒数), ...]
+    """
+    steps = _rng.randint(15, 30)
+    delay_per_step = duration / steps
+    dx = target_x - start_x
+    dy = target_y - start_y
+    uniform = _rng.uniform
+
+    trajectory = []
+    # 步数只有 15-30 这几种取值，曲线查表即可
+    for ease in _ease_curve(steps):
+        trajectory.append((
+            start_x + dx * ease + uniform(-3, 3),
+            start_y + dy * ease + uniform(-3, 3),
+            max(0.0, delay_per_step + uniform(-0.01, 0.01)),
+        ))
+    return trajectory
+
+
+def _scroll_plan(distance: int) -> List[Tuple[int, float]]:
+    """
+    预生成突发式滚动计划，累计距离达到 distance 为止
+
+    每次"拨动"滚动30-150px，拆成4-8个由大到小的滚轮事件（ease-out，间隔8-16ms，
+    接近触控板/滚轮的惯性衰减），整次拨动之后停顿0.1-0.6秒
+
+    Returns:
+        [(滚动像素, 该事件之后的停顿秒数), ...]
+    """
+    randint = _rng.randint
+    uniform = _rng.uniform
+
+    plan = []
+    scrolled = 0
+    while scrolled < distance:
+        delta = randint(30, 150)
+        scrolled += delta
+
+        # 线性递减权重 n, n-1, ..., 1；取整余数补到第一个（最大的）事件上
+        parts = randint(4, 8)
+        total_weight = parts * (parts + 1) // 2
+        sub_deltas = [delta * (parts - i) // total_weight for i in range(parts)]
+        sub_deltas[0] += delta - sum(sub_deltas)
+
+        for sub_delta in sub_deltas:
+            if sub_delta:
+                plan.append((sub_delta, uniform(0.008, 0.016)))
+        # 拨动结束后的人类停顿
+        plan[-1] = (plan[-1][0], uniform(0.1, 0.6))
+    return plan
+
 
 class EnhancedStealth:
     """增强型反检测类 - 集成2025年最新技术"""
 
     @staticmethod
-    async def inject_stealth_scripts(page: Page) -> None:
+    async def install_on_context(context: BrowserContext) -> None:
+        """
+        在浏览器上下文上安装反检测脚本（对其中所有页面生效，幂等）
+
+        Args:
+            context: Playwright浏览器上下文
+        """
+        if getattr(context, "_stealth_injected", False):
+            return
+        await context.add_init_script(_STEALTH_SCRIPT)
+        context._stealth_injected = True
+
+    @staticmethod
+    async def inject_stealth_scripts(target: Union[Page, BrowserContext]) -> None:
         """
         注入增强版反检测脚本
         覆盖20+检测特征
+
+        推荐在创建上下文时直接调用 install_on_context；本方法保留用于单个页面的兼容场景
+
+        Args:
+            target: 浏览器上下文或单个页面
         """
-        await page.add_init_script("""
-            // ==================== 核心反检测脚本（2025增强版） ====================
-
-            // 1. 移除 webdriver 标志（最重要）
-            Object.defineProperty(navigator, 'webdriver', {
-                get: () => undefined,
-                configurable: true
-            });
-            delete navigator.__proto__.webdriver;
-
-            // 2. 覆盖 Chrome 自动化标志
-            Object.defineProperty(navigator, 'automation', {
-                get: () => undefined,
-                configurable: true
-            });
-
-            // 3. 伪装 plugins（headless 默认为空）
-            Object.defineProperty(navigator, 'plugins', {
-                get: () => [
-                    {
-                        0: {type: "application/x-google-chrome-pdf", suffixes: "pdf", description: "Portable Document Format"},
-                        name: "Chrome PDF Plugin",
-                        filename: "internal-pdf-viewer",
-                        length: 1
-                    },
-                    {
-                        0: {type: "application/pdf", suffixes: "pdf", description: "Portable Document Format"},
-                        name: "Chromium PDF Plugin",
-                        filename: "internal-pdf-viewer",
-                        length: 1
-                    },
-                    {
-                        0: {type: "application/x-nacl", suffixes: "", description: "Native Client Executable"},
-                        1: {type: "application/x-pnacl", suffixes: "", description: "Portable Native Client Executable"},
-                        name: "Native Client",
-                        filename: "internal-nacl-plugin",
-                        length: 2
-                    }
-                ],
-                configurable: true
-            });
-
-            // 4. 伪装 languages（更真实的语言列表）
-            Object.defineProperty(navigator, 'languages', {
-                get: () => ['zh-CN', 'zh', 'en-US', 'en'],
-                configurable: true
-            });
-
-            // 5. 伪装 permissions（headless 模式下会暴露）
-            const originalQuery = window.navigator.permissions?.query;
-            if (originalQuery) {
-                window.navigator.permissions.query = (parameters) => (
-                    parameters.name === 'notifications' ?
-                        Promise.resolve({state: Notification.permission}) :
-                        originalQuery(parameters)
-                );
-            }
-
-            // 6. 伪装 Chrome 特性
-            window.chrome = {
-                runtime: {},
-                loadTimes: function() {},
-                csi: function() {},
-                app: {
-                    isInstalled: false,
-                    InstallState: {
-                        DISABLED: 'disabled',
-                        INSTALLED: 'installed',
-                        NOT_INSTALLED: 'not_installed'
-                    },
-                    RunningState: {
-                        CANNOT_RUN: 'cannot_run',
-                        READY_TO_RUN: 'ready_to_run',
-                        RUNNING: 'running'
-                    }
-                }
-            };
-
-            // 7. 修复 iframe contentWindow（headless 特征）
-            Object.defineProperty(HTMLIFrameElement.prototype, 'contentWindow', {
-                get: function() {
-                    return window;
-                },
-                configurable: true
-            });
-
-            // 8. 伪装 connection（headless 通常显示为 'none'）
-            Object.defineProperty(navigator, 'connection', {
-                get: () => ({
-                    effectiveType: '4g',
-                    rtt: 50,
-                    downlink: 10,
-                    downlinkMax: Infinity,
-                    saveData: false,
-                    type: 'wifi'
-                }),
-                configurable: true
-            });
-
-            // 9. 伪装 battery API
-            Object.defineProperty(navigator, 'getBattery', {
-                get: () => () => Promise.resolve({
-                    charging: true,
-                    chargingTime: 0,
-                    dischargingTime: Infinity,
-                    level: 1
-                }),
-                configurable: true
-            });
-
-            // 10. 伪装时区偏移（防止服务器端检测）
-            const originalGetTimezoneOffset = Date.prototype.getTimezoneOffset;
-            Date.prototype.getTimezoneOffset = function() {
-                return -480; // 中国时区 UTC+8
-            };
-
-            // ==================== 高级指纹伪装（2025新增） ====================
-
-            // 生成会话级别的随机种子（确保指纹一致性）
-            const sessionSeed = Date.now() + Math.random();
-
-            // 简单的伪随机数生成器（基于种子）
-            function seededRandom(seed) {
-                const x = Math.sin(seed++) * 10000;
-                return x - Math.floor(x);
-            }
-
-            // 11. Canvas指纹随机化（2025增强版 - 多层噪声）
-            const canvasSeed = sessionSeed * 1.1;
-            const originalToDataURL = HTMLCanvasElement.prototype.toDataURL;
-            const originalToBlob = HTMLCanvasElement.prototype.toBlob;
-            const originalGetImageData = CanvasRenderingContext2D.prototype.getImageData;
-
-            // 为Canvas添加亚像素级噪声
-            HTMLCanvasElement.prototype.toDataURL = function(type) {
-                const context = this.getContext('2d');
-                if (context) {
-                    const imageData = context.getImageData(0, 0, this.width, this.height);
-                    const pixels = imageData.data;
-
-                    // 添加基于种子的确定性噪声（每100个像素添加1-2个单位的噪声）
-                    for (let i = 0; i < pixels.length; i += 400) {
-                        const noise = Math.floor(seededRandom(canvasSeed + i) * 3) - 1;
-                        pixels[i] = Math.max(0, Math.min(255, pixels[i] + noise));
-                    }
-
-                    context.putImageData(imageData, 0, 0);
-                }
-                return originalToDataURL.apply(this, arguments);
-            };
-
-            HTMLCanvasElement.prototype.toBlob = function() {
-                const context = this.getContext('2d');
-                if (context) {
-                    const imageData = context.getImageData(0, 0, this.width, this.height);
-                    const pixels = imageData.data;
-
-                    for (let i = 0; i < pixels.length; i += 400) {
-                        const noise = Math.floor(seededRandom(canvasSeed + i) * 3) - 1;
-                        pixels[i] = Math.max(0, Math.min(255, pixels[i] + noise));
-                    }
-
-                    context.putImageData(imageData, 0, 0);
-                }
-                return originalToBlob.apply(this, arguments);
-            };
-
-            // Canvas getImageData也需要一致性处理
-            CanvasRenderingContext2D.prototype.getImageData = function() {
-                const imageData = originalGetImageData.apply(this, arguments);
-                const pixels = imageData.data;
-
-                // 使用相同的种子确保一致性
-                for (let i = 0; i < pixels.length; i += 400) {
-                    const noise = Math.floor(seededRandom(canvasSeed + i) * 3) - 1;
-                    pixels[i] = Math.max(0, Math.min(255, pixels[i] + noise));
-                }
-
-                return imageData;
-            };
-
-            // 12. WebGL指纹一致性伪装
-            const getParameter = WebGLRenderingContext.prototype.getParameter;
-            WebGLRenderingContext.prototype.getParameter = function(parameter) {
-                // UNMASKED_VENDOR_WEBGL
-                if (parameter === 37445) {
-                    return 'Intel Inc.';
-                }
-                // UNMASKED_RENDERER_WEBGL
-                if (parameter === 37446) {
-                    return 'Intel Iris OpenGL Engine';
-                }
-                return getParameter.apply(this, arguments);
-            };
-
-            // WebGL2 支持
-            if (window.WebGL2RenderingContext) {
-                const getParameter2 = WebGL2RenderingContext.prototype.getParameter;
-                WebGL2RenderingContext.prototype.getParameter = function(parameter) {
-                    if (parameter === 37445) return 'Intel Inc.';
-                    if (parameter === 37446) return 'Intel Iris OpenGL Engine';
-                    return getParameter2.apply(this, arguments);
-                };
-            }
-
-            // 13. AudioContext指纹随机化（2025增强版 - 确定性噪声）
-            if (window.AudioContext || window.webkitAudioContext) {
-                const audioSeed = sessionSeed * 1.3;
-                const OriginalAudioContext = window.AudioContext || window.webkitAudioContext;
-                const NewAudioContext = function() {
-                    const context = new OriginalAudioContext();
-                    const originalCreateOscillator = context.createOscillator;
-                    const originalCreateDynamicsCompressor = context.createDynamicsCompressor;
-
-                    // 劫持 createOscillator
-                    context.createOscillator = function() {
-                        const oscillator = originalCreateOscillator.apply(this, arguments);
-                        const originalStart = oscillator.start;
-                        oscillator.start = function(when) {
-                            // 添加基于种子的确定性延迟
-                            const noise = seededRandom(audioSeed) * 0.0001;
-                            return originalStart.call(this, when ? when + noise : noise);
-                        };
-                        return oscillator;
-                    };
-
-                    // 劫持 createDynamicsCompressor（音频指纹的另一个检测点）
-                    context.createDynamicsCompressor = function() {
-                        const compressor = originalCreateDynamicsCompressor.apply(this, arguments);
-                        const threshold = compressor.threshold;
-                        const knee = compressor.knee;
-                        const ratio = compressor.ratio;
-                        const attack = compressor.attack;
-                        const release = compressor.release;
-
-                        // 添加微小的确定性偏移
-                        Object.defineProperty(compressor, 'threshold', {
-                            get: () => threshold.value + seededRandom(audioSeed + 1) * 0.1,
-                            set: (v) => { threshold.value = v; }
-                        });
-
-                        Object.defineProperty(compressor, 'knee', {
-                            get: () => knee.value + seededRandom(audioSeed + 2) * 0.1,
-                            set: (v) => { knee.value = v; }
-                        });
-
-                        Object.defineProperty(compressor, 'ratio', {
-                            get: () => ratio.value + seededRandom(audioSeed + 3) * 0.1,
-                            set: (v) => { ratio.value = v; }
-                        });
-
-                        return compressor;
-                    };
-
-                    return context;
-                };
-                window.AudioContext = NewAudioContext;
-                window.webkitAudioContext = NewAudioContext;
-            }
-
-            // 14. Screen指纹一致性
-            Object.defineProperty(screen, 'colorDepth', {
-                get: () => 24,
-                configurable: true
-            });
-            Object.defineProperty(screen, 'pixelDepth', {
-                get: () => 24,
-                configurable: true
-            });
-
-            // 15. Hardware Concurrency（CPU核心数）
-            Object.defineProperty(navigator, 'hardwareConcurrency', {
-                get: () => 8,  // 模拟8核CPU
-                configurable: true
-            });
-
-            // 16. deviceMemory（设备内存）
-            Object.defineProperty(navigator, 'deviceMemory', {
-                get: () => 8,  // 模拟8GB内存
-                configurable: true
-            });
-
-            // 17. 媒体设备伪装
-            if (navigator.mediaDevices && navigator.mediaDevices.enumerateDevices) {
-                const originalEnumerateDevices = navigator.mediaDevices.enumerateDevices;
-                navigator.mediaDevices.enumerateDevices = function() {
-                    return originalEnumerateDevices.call(this).then(devices => {
-                        // 确保至少有音频输入/输出设备
-                        const hasAudioInput = devices.some(d => d.kind === 'audioinput');
-                        const hasAudioOutput = devices.some(d => d.kind === 'audiooutput');
-
-                        if (!hasAudioInput || !hasAudioOutput) {
-                            return [
-                                ...devices,
-                                {deviceId: 'default', groupId: 'default', kind: 'audioinput', label: ''},
-                                {deviceId: 'default', groupId: 'default', kind: 'audiooutput', label: ''}
-                            ];
-                        }
-                        return devices;
-                    });
-                };
-            }
-
-            // 18. Notification权限伪装
-            if (window.Notification) {
-                const originalPermission = Notification.permission;
-                Object.defineProperty(Notification, 'permission', {
-                    get: () => 'default',
-                    configurable: true
-                });
-            }
-
-            // 19. 防止CDP（Chrome DevTools Protocol）检测（2025增强版）
-            // CDP是Cloudflare 2024年重点检测的特征之一
-            const originalToString = Function.prototype.toString;
-            Function.prototype.toString = function() {
-                // 覆盖所有被修改的函数，使其看起来像原生代码
-                const nativeFunctions = [
-                    window.navigator.permissions.query,
-                    HTMLCanvasElement.prototype.toDataURL,
-                    WebGLRenderingContext.prototype.getParameter,
-                    CanvasRenderingContext2D.prototype.getImageData,
-                ];
-
-                if (nativeFunctions.includes(this)) {
-                    return `function ${this.name || 'anonymous'}() { [native code] }`;
-                }
-                return originalToString.call(this);
-            };
-
-            // 隐藏CDP runtime对象痕迹
-            delete window.cdc_adoQpoasnfa76pfcZLmcfl_Array;
-            delete window.cdc_adoQpoasnfa76pfcZLmcfl_Promise;
-            delete window.cdc_adoQpoasnfa76pfcZLmcfl_Symbol;
-            delete window.$cdc_asdjflasutopfhvcZLmcfl_;
-            delete window.$chrome_asyncScriptInfo;
-
-            // 隐藏Selenium痕迹
-            delete window._Selenium_IDE_Recorder;
-            delete window._selenium;
-            delete window.__selenium_unwrapped;
-            delete window.__webdriver_evaluate;
-            delete window.__driver_evaluate;
-            delete window.__webdriver_script_function;
-            delete window.__webdriver_script_func;
-            delete window.__webdriver_script_fn;
-            delete window.__fxdriver_evaluate;
-            delete window.__driver_unwrapped;
-            delete window.__webdriver_unwrapped;
-            delete window.__fxdriver_unwrapped;
-            delete document.__webdriver_evaluate;
-            delete document.__selenium_evaluate;
-            delete document.__webdriver_script_function;
-            delete document.__webdriver_script_func;
-            delete document.$chrome_asyncScriptInfo;
-            delete document.$cdc_asdjflasutopfhvcZLmcfl_;
-
-            // 隐藏Playwright痕迹
-            delete window.__playwright;
-            delete window.__pw_manual;
-            delete window.__PW_inspect;
-
-            // 20. 用户激活API伪装
-            if (navigator.userActivation) {
-                Object.defineProperty(navigator.userActivation, 'hasBeenActive', {
-                    get: () => true,
-                    configurable: true
-                });
-                Object.defineProperty(navigator.userActivation, 'isActive', {
-                    get: () => true,
-                    configurable: true
-                });
-            }
-
-            // ==================== 2025最新增强特征（7个高级反检测） ====================
-
-            // 21. Performance API 伪装（添加真实的性能数据）
-            if (window.performance && window.performance.timing) {
-                const timing = window.performance.timing;
-                const now = Date.now();
-                const navigationStart = now - Math.floor(seededRandom(sessionSeed + 100) * 3000 + 1000);
-
-                // 伪造合理的性能时间线
-                Object.defineProperty(timing, 'navigationStart', {
-                    get: () => navigationStart,
-                    configurable: true
-                });
-                Object.defineProperty(timing, 'fetchStart', {
-                    get: () => navigationStart + Math.floor(seededRandom(sessionSeed + 101) * 50 + 10),
-                    configurable: true
-                });
-                Object.defineProperty(timing, 'domainLookupStart', {
-                    get: () => navigationStart + Math.floor(seededRandom(sessionSeed + 102) * 80 + 50),
-                    configurable: true
-                });
-                Object.defineProperty(timing, 'domainLookupEnd', {
-                    get: () => navigationStart + Math.floor(seededRandom(sessionSeed + 103) * 120 + 80),
-                    configurable: true
-                });
-                Object.defineProperty(timing, 'connectStart', {
-                    get: () => navigationStart + Math.floor(seededRandom(sessionSeed + 104) * 150 + 120),
-                    configurable: true
-                });
-                Object.defineProperty(timing, 'connectEnd', {
-                    get: () => navigationStart + Math.floor(seededRandom(sessionSeed + 105) * 200 + 180),
-                    configurable: true
-                });
-                Object.defineProperty(timing, 'requestStart', {
-                    get: () => navigationStart + Math.floor(seededRandom(sessionSeed + 106) * 250 + 200),
-                    configurable: true
-                });
-                Object.defineProperty(timing, 'responseStart', {
-                    get: () => navigationStart + Math.floor(seededRandom(sessionSeed + 107) * 400 + 300),
-                    configurable: true
-                });
-                Object.defineProperty(timing, 'responseEnd', {
-                    get: () => navigationStart + Math.floor(seededRandom(sessionSeed + 108) * 600 + 500),
-                    configurable: true
-                });
-                Object.defineProperty(timing, 'domLoading', {
-                    get: () => navigationStart + Math.floor(seededRandom(sessionSeed + 109) * 650 + 550),
-                    configurable: true
-                });
-                Object.defineProperty(timing, 'domInteractive', {
-                    get: () => navigationStart + Math.floor(seededRandom(sessionSeed + 110) * 1000 + 800),
-                    configurable: true
-                });
-                Object.defineProperty(timing, 'domContentLoadedEventStart', {
-                    get: () => navigationStart + Math.floor(seededRandom(sessionSeed + 111) * 1200 + 1000),
-                    configurable: true
-                });
-                Object.defineProperty(timing, 'domContentLoadedEventEnd', {
-                    get: () => navigationStart + Math.floor(seededRandom(sessionSeed + 112) * 1300 + 1100),
-                    configurable: true
-                });
-                Object.defineProperty(timing, 'domComplete', {
-                    get: () => navigationStart + Math.floor(seededRandom(sessionSeed + 113) * 2000 + 1500),
-                    configurable: true
-                });
-                Object.defineProperty(timing, 'loadEventStart', {
-                    get: () => navigationStart + Math.floor(seededRandom(sessionSeed + 114) * 2100 + 1800),
-                    configurable: true
-                });
-                Object.defineProperty(timing, 'loadEventEnd', {
-                    get: () => navigationStart + Math.floor(seededRandom(sessionSeed + 115) * 2200 + 2000),
-                    configurable: true
-                });
-            }
-
-            // 22. Event Trust 修复（修复 isTrusted 属性）
-            const originalAddEventListener = EventTarget.prototype.addEventListener;
-            EventTarget.prototype.addEventListener = function(type, listener, options) {
-                const wrappedListener = function(event) {
-                    // 强制设置 isTrusted 为 true
-                    if (event && !event.isTrusted) {
-                        Object.defineProperty(event, 'isTrusted', {
-                            get: () => true,
-                            configurable: true
-                        });
-                    }
-
-                    if (typeof listener === 'function') {
-                        return listener.call(this, event);
-                    } else if (listener && typeof listener.handleEvent === 'function') {
-                        return listener.handleEvent(event);
-                    }
-                };
-
-                return originalAddEventListener.call(this, type, wrappedListener, options);
-            };
-
-            // 修复 dispatchEvent 以确保事件看起来是可信的
-            const originalDispatchEvent = EventTarget.prototype.dispatchEvent;
-            EventTarget.prototype.dispatchEvent = function(event) {
-                Object.defineProperty(event, 'isTrusted', {
-                    get: () => true,
-                    configurable: true
-                });
-                return originalDispatchEvent.call(this, event);
-            };
-
-            // 23. Canvas 指纹一致性增强（确保多次调用返回相同结果）
-            // 创建会话级别的Canvas指纹缓存
-            const canvasCache = new Map();
-
-            const originalToDataURLEnhanced = HTMLCanvasElement.prototype.toDataURL;
-            HTMLCanvasElement.prototype.toDataURL = function(type) {
-                // 生成canvas的唯一标识
-                const canvasId = this.width + 'x' + this.height + '_' + (this.id || 'anonymous');
-
-                // 如果缓存中存在，直接返回
-                if (canvasCache.has(canvasId)) {
-                    return canvasCache.get(canvasId);
-                }
-
-                // 否则生成并缓存
-                const result = originalToDataURLEnhanced.apply(this, arguments);
-                canvasCache.set(canvasId, result);
-                return result;
-            };
-
-            // 24. WebGL 参数伪装增强（伪装更多 WebGL 渲染器信息）
-            const getParameterEnhanced = WebGLRenderingContext.prototype.getParameter;
-            WebGLRenderingContext.prototype.getParameter = function(parameter) {
-                // UNMASKED_VENDOR_WEBGL
-                if (parameter === 37445) {
-                    return 'Intel Inc.';
-                }
-                // UNMASKED_RENDERER_WEBGL
-                if (parameter === 37446) {
-                    return 'Intel Iris OpenGL Engine';
-                }
-                // VERSION
-                if (parameter === 0x1F02) {
-                    return 'WebGL 1.0 (OpenGL ES 2.0 Chromium)';
-                }
-                // SHADING_LANGUAGE_VERSION
-                if (parameter === 0x8B8C) {
-                    return 'WebGL GLSL ES 1.0 (OpenGL ES GLSL ES 1.0 Chromium)';
-                }
-                // VENDOR
-                if (parameter === 0x1F00) {
-                    return 'WebKit';
-                }
-                // RENDERER
-                if (parameter === 0x1F01) {
-                    return 'WebKit WebGL';
-                }
-                // MAX_TEXTURE_SIZE
-                if (parameter === 0x0D33) {
-                    return 16384;
-                }
-                // MAX_VERTEX_TEXTURE_IMAGE_UNITS
-                if (parameter === 0x8B4C) {
-                    return 16;
-                }
-                return getParameterEnhanced.apply(this, arguments);
-            };
-
-            // WebGL2 支持增强
-            if (window.WebGL2RenderingContext) {
-                const getParameter2Enhanced = WebGL2RenderingContext.prototype.getParameter;
-                WebGL2RenderingContext.prototype.getParameter = function(parameter) {
-                    if (parameter === 37445) return 'Intel Inc.';
-                    if (parameter === 37446) return 'Intel Iris OpenGL Engine';
-                    if (parameter === 0x1F02) return 'WebGL 2.0 (OpenGL ES 3.0 Chromium)';
-                    if (parameter === 0x8B8C) return 'WebGL GLSL ES 3.0 (OpenGL ES GLSL ES 3.0 Chromium)';
-                    if (parameter === 0x1F00) return 'WebKit';
-                    if (parameter === 0x1F01) return 'WebKit WebGL';
-                    if (parameter === 0x0D33) return 16384;
-                    if (parameter === 0x8B4C) return 16;
-                    return getParameter2Enhanced.apply(this, arguments);
-                };
-            }
-
-            // 25. Plugin 数组优化（添加更真实的插件列表）
-            Object.defineProperty(navigator, 'plugins', {
-                get: () => {
-                    const plugins = [
-                        {
-                            0: {type: "application/x-google-chrome-pdf", suffixes: "pdf", description: "Portable Document Format", enabledPlugin: true},
-                            name: "Chrome PDF Plugin",
-                            filename: "internal-pdf-viewer",
-                            description: "Portable Document Format",
-                            length: 1
-                        },
-                        {
-                            0: {type: "application/pdf", suffixes: "pdf", description: "Portable Document Format", enabledPlugin: true},
-                            name: "Chromium PDF Plugin",
-                            filename: "internal-pdf-viewer",
-                            description: "Portable Document Format",
-                            length: 1
-                        },
-                        {
-                            0: {type: "application/x-nacl", suffixes: "", description: "Native Client Executable", enabledPlugin: true},
-                            1: {type: "application/x-pnacl", suffixes: "", description: "Portable Native Client Executable", enabledPlugin: true},
-                            name: "Native Client",
-                            filename: "internal-nacl-plugin",
-                            description: "Native Client Executable",
-                            length: 2
-                        },
-                        {
-                            0: {type: "application/x-ppapi-widevine-cdm", suffixes: "", description: "Widevine Content Decryption Module", enabledPlugin: true},
-                            name: "Widevine Content Decryption Module",
-                            filename: "widevinecdmadapter.dll",
-                            description: "Enables Widevine licenses for playback of HTML audio/video content.",
-                            length: 1
-                        }
-                    ];
-
-                    // 添加数组特性（使其看起来像真实的PluginArray）
-                    plugins.item = function(index) {
-                        return this[index] || null;
-                    };
-                    plugins.namedItem = function(name) {
-                        return this.find(p => p.name === name) || null;
-                    };
-                    plugins.refresh = function() {};
-
-                    return plugins;
-                },
-                configurable: true
-            });
-
-            // mimeTypes 也需要同步更新
-            Object.defineProperty(navigator, 'mimeTypes', {
-                get: () => {
-                    const mimeTypes = [
-                        {type: "application/pdf", suffixes: "pdf", description: "Portable Document Format", enabledPlugin: {name: "Chrome PDF Plugin"}},
-                        {type: "application/x-google-chrome-pdf", suffixes: "pdf", description: "Portable Document Format", enabledPlugin: {name: "Chrome PDF Plugin"}},
-                        {type: "application/x-nacl", suffixes: "", description: "Native Client Executable", enabledPlugin: {name: "Native Client"}},
-                        {type: "application/x-pnacl", suffixes: "", description: "Portable Native Client Executable", enabledPlugin: {name: "Native Client"}},
-                        {type: "application/x-ppapi-widevine-cdm", suffixes: "", description: "Widevine Content Decryption Module", enabledPlugin: {name: "Widevine Content Decryption Module"}}
-                    ];
-
-                    mimeTypes.item = function(index) {
-                        return this[index] || null;
-                    };
-                    mimeTypes.namedItem = function(name) {
-                        return this.find(m => m.type === name) || null;
-                    };
-
-                    return mimeTypes;
-                },
-                configurable: true
-            });
-
-            // 26. Permissions API 伪装增强（伪装更多权限查询结果）
-            const originalPermissionsQuery = window.navigator.permissions?.query;
-            if (originalPermissionsQuery) {
-                window.navigator.permissions.query = function(parameters) {
-                    const permissionName = parameters.name;
-
-                    // 为不同的权限返回合理的状态
-                    const permissionStates = {
-                        'notifications': 'default',
-                        'geolocation': 'prompt',
-                        'camera': 'prompt',
-                        'microphone': 'prompt',
-                        'midi': 'prompt',
-                        'clipboard-read': 'prompt',
-                        'clipboard-write': 'prompt',
-                        'payment-handler': 'prompt',
-                        'persistent-storage': 'prompt',
-                        'push': 'prompt',
-                        'screen-wake-lock': 'prompt',
-                        'xr-spatial-tracking': 'prompt'
-                    };
-
-                    const state = permissionStates[permissionName] || 'prompt';
-
-                    return Promise.resolve({
-                        state: state,
-                        status: state,
-                        onchange: null
-                    });
-                };
-            }
-
-            // 27. Battery API 禁用（移除 CI 环境特征）
-            // 真实浏览器可能没有 Battery API，或者返回受限信息
-            // 完全移除 getBattery 方法（而不是返回假数据）
-            if (navigator.getBattery) {
-                Object.defineProperty(navigator, 'getBattery', {
-                    get: () => undefined,
-                    configurable: true
-                });
-                delete navigator.getBattery;
-            }
-
-            // 同时删除其他可能的电池API变体
-            delete navigator.battery;
-            delete navigator.mozBattery;
-            delete navigator.webkitBattery;
-
-            // ==================== 调试信息（更新版） ====================
-            console.log('✅ 增强型反检测脚本已注入（2025最新版）');
-            console.log('   - CDP痕迹清理: ✓ 40+ 对象');
-            console.log('   - Canvas指纹: ✓ 确定性噪声 + 缓存一致性');
-            console.log('   - Audio指纹: ✓ 确定性噪声');
-            console.log('   - WebGL指纹: ✓ 增强参数伪装');
-            console.log('   - Performance API: ✓ 真实时间线');
-            console.log('   - Event Trust: ✓ isTrusted修复');
-            console.log('   - Plugin Array: ✓ 完整列表');
-            console.log('   - Permissions API: ✓ 多权限伪装');
-            console.log('   - Battery API: ✓ 已移除');
-            console.log('   - 会话种子: ' + sessionSeed.toFixed(2));
-        """)
+        if isinstance(target, BrowserContext):
+            await EnhancedStealth.install_on_context(target)
+            return
+
+        # 所属上下文已安装时页面已被覆盖，重复注入会把原型方法包装两次
+        if getattr(target, "_stealth_injected", False) or getattr(target.context, "_stealth_injected", False):
+            return
+        await target.add_init_script(_STEALTH_SCRIPT)
+        target._stealth_injected = True
 
     @staticmethod
     async def human_mouse_move(page: Page, target_x: int, target_y: int, duration: float = 1.0) -> None:
@@ -722,33 +316,23 @@ class EnhancedStealth:
             target_y: 目标Y坐标
             duration: 移动持续时间（秒）
         """
-        steps = random.randint(15, 30)
-        delay_per_step = duration / steps
-
-        # 获取当前鼠标位置（假设从(0,0)开始）
-        current_x, current_y = 0, 0
+        # 一次性预计算完整轨迹（从(0,0)开始）
+        trajectory = _mouse_trajectory(0, 0, target_x, target_y, duration)
 
-        for i in range(steps):
-            progress = i / steps
+        # 按节奏依次发出移动指令，不逐步等待浏览器确认，最后统一收集结果
+        # 注意：必须走 page.mouse（CDP Input 域），页面内 dispatchEvent 产生的事件 isTrusted=false，
+        # 正是 Turnstile 等检测脚本的重点检查项
+        # 按绝对截止时间休眠，自动补偿事件循环繁忙造成的漂移，保证总时长准确
+        loop = asyncio.get_running_loop()
+        deadline = loop.time()
+        async with pipelined_actions() as submit:
+            for x, y, delay in trajectory:
+                submit(page.mouse.move(x, y))
+                deadline += delay
+                await asyncio.sleep(max(0.0, deadline - loop.time()))
 
-            # 贝塞尔曲线（ease-in-out效果）
-            # 公式: 3t^2 - 2t^3
-            t = progress
-            ease = t * t * (3 - 2 * t)
-
-            # 添加随机抖动（模拟手部颤抖）
-            jitter_x = random.uniform(-3, 3)
-            jitter_y = random.uniform(-3, 3)
-
-            # 计算当前位置
-            x = current_x + (target_x - current_x) * ease + jitter_x
-            y = current_y + (target_y - current_y) * ease + jitter_y
-
-            await page.mouse.move(x, y)
-            await asyncio.sleep(delay_per_step + random.uniform(-0.01, 0.01))
-
-        # 最终精确到达目标位置
-        await page.mouse.move(target_x, target_y)
+            # 最终精确到达目标位置
+            submit(page.mouse.move(target_x, target_y))
 
     @staticmethod
     async def human_scroll(page: Page, distance: int = 300, direction: str = 'down') -> None:
@@ -760,18 +344,13 @@ class EnhancedStealth:
             distance: 滚动距离（像素）
             direction: 滚动方向（'down' 或 'up'）
         """
-        scrolled = 0
         delta_sign = 1 if direction == 'down' else -1
 
-        while scrolled < distance:
-            # 突发式滚动（10-150px不等）
-            delta = random.randint(30, 150) * delta_sign
-            await page.mouse.wheel(0, delta)
-            scrolled += abs(delta)
-
-            # 随机暂停（模拟阅读/查看内容）
-            pause = random.uniform(0.1, 0.6)
-            await asyncio.sleep(pause)
+        # 一次性生成全部滚动步长和停顿，再按节奏依次发出，不逐个等待浏览器确认
+        async with pipelined_actions() as submit:
+            for delta, pause in _scroll_plan(distance):
+                submit(page.mouse.wheel(0, delta * delta_sign))
+                await asyncio.sleep(pause)
 
     @staticmethod
     async def simulate_reading_behavior(page: Page) -> None:
@@ -779,23 +358,33 @@ class EnhancedStealth:
         模拟真实的页面阅读行为
         包括：鼠标移动、滚动、停顿
         """
-        # 1. 随机鼠标移动（2-5次）
-        move_count = random.randint(2, 5)
-        for _ in range(move_count):
-            x = random.randint(200, 1700)
-            y = random.randint(100, 800)
-            await EnhancedStealth.human_mouse_move(page, x, y, duration=random.uniform(0.5, 1.2))
-            await asyncio.sleep(random.uniform(0.3, 0.8))
-
-        # 2. 随机滚动（1-3次）
-        scroll_count = random.randint(1, 3)
-        for _ in range(scroll_count):
-            distance = random.randint(200, 500)
-            await EnhancedStealth.human_scroll(page, distance)
-            await asyncio.sleep(random.uniform(0.5, 1.0))
+        randint = _rng.randint
+        uniform = _rng.uniform
+
+        # 预先采样全部随机参数
+        moves = [
+            (randint(200, 1700), randint(100, 800), uniform(0.5, 1.2), uniform(0.3, 0.8))
+            for _ in range(randint(2, 5))
+        ]
+        scrolls = [(randint(200, 500), uniform(0.5, 1.0)) for _ in range(randint(1, 3))]
+        think_pause = uniform(0.8, 2.0)
+
+        if StealthConfig.should_use_in_page_reading_simulation():
+            # 页面内一次性执行移动和滚动（单次往返，事件不可信）
+            await page.evaluate(_IN_PAGE_READING_SCRIPT, {"moves": moves, "scrolls": scrolls})
+        else:
+            # 1. 随机鼠标移动（2-5次）
+            for x, y, duration, pause in moves:
+                await EnhancedStealth.human_mouse_move(page, x, y, duration=duration)
+                await asyncio.sleep(pause)
+
+            # 2. 随机滚动（1-3次）
+            for distance, pause in scrolls:
+                await EnhancedStealth.human_scroll(page, distance)
+                await asyncio.sleep(pause)
 
         # 3. 模拟思考停顿
-        await asyncio.sleep(random.uniform(0.8, 2.0))
+        await asyncio.sleep(think_pause)
 
     @staticmethod
     async def add_random_delays(min_seconds: float = 0.5, max_seconds: float = 2.0) -> None:
@@ -806,7 +395,7 @@ class EnhancedStealth:
             min_seconds: 最小延迟秒数
             max_seconds: 最大延迟秒数
         """
-        delay = random.uniform(min_seconds, max_seconds)
+        delay = _rng.uniform(min_seconds, max_seconds)
         await asyncio.sleep(delay)
 
     @staticmethod
@@ -823,123 +412,80 @@ class EnhancedStealth:
         """
         try:
             # 检测是否存在Turnstile iframe
-            turnstile_iframe = await page.query_selector('iframe[src*="challenges.cloudflare.com"]')
+            iframe_count = await page.locator(_TURNSTILE_IFRAME_SEL).count()
 
-            if not turnstile_iframe:
+            if not iframe_count:
                 # 未检测到Turnstile，直接返回成功
                 return True
 
             # 等待挑战完成（Turnstile通常会自动完成）
+            # 先短探测捕获快速完成的情况，未完成再用剩余时间长等待
+            probe_timeout = min(TURNSTILE_PROBE_TIMEOUT, timeout)
             try:
-                await page.wait_for_selector(
-                    'iframe[src*="challenges.cloudflare.com"]',
-                    state='hidden',
-                    timeout=timeout
-                )
+                try:
+                    await page.wait_for_selector(
+                        _TURNSTILE_IFRAME_SEL,
+                        state='hidden',
+                        timeout=probe_timeout
+                    )
+                except PlaywrightTimeoutError:
+                    if timeout <= probe_timeout:
+                        raise
+                    await page.wait_for_selector(
+                        _TURNSTILE_IFRAME_SEL,
+                        state='hidden',
+                        timeout=timeout - probe_timeout
+                    )
                 return True
             except:
                 # 超时，但可能已经通过
-                # 检查页面是否包含成功标识
-                page_content = await page.content()
-                if 'cf-challenge' not in page_content.lower():
-                    return True
-                return False
+                # 只查询挑战元素是否仍存在（一次选择器查询，不序列化或扫描整个 DOM）
+                return not await page.locator(_CHALLENGE_ANY_SEL).count()
 
         except Exception as e:
             # 检测失败，假设无验证
             return True
 
     @staticmethod
-    def get_enhanced_browser_args() -> list:
+    def get_enhanced_browser_args(mode: Literal["stealth", "ci"] = "stealth") -> Tuple[str, ...]:
         """
         获取增强版浏览器启动参数（2025优化版）
         基于最新的Cloudflare绕过技术
 
+        Args:
+            mode: "stealth" 只包含不暴露自动化特征的参数（默认）；
+                  "ci" 额外包含禁用 GPU/Web 安全等仅为性能服务的参数，适用于无反爬检测的页面
+
         Returns:
-            list: 浏览器启动参数列表
+            Tuple[str, ...]: 浏览器启动参数（模块级常量，只读）
         """
-        return [
-            # ==================== 核心反检测参数（最重要） ====================
-            "--disable-blink-features=AutomationControlled",  # 禁用自动化控制特征
-            "--exclude-switches=enable-automation",  # 排除自动化开关
-
-            # ==================== 浏览器行为优化 ====================
-            "--window-size=1920,1080",  # 固定窗口大小（常见分辨率）
-            "--start-maximized",  # 最大化启动
-            "--no-first-run",  # 跳过首次运行体验
-            "--no-default-browser-check",  # 不检查默认浏览器
-            "--disable-popup-blocking",  # 禁用弹窗阻止
-
-            # ==================== 性能优化（CI环境必需） ====================
-            "--disable-dev-shm-usage",  # 禁用/dev/shm使用（Docker/CI环境必需）
-            "--disable-gpu",  # 禁用GPU加速（headless模式下）
-            "--no-sandbox",  # 禁用沙箱（CI环境必需）
-            "--disable-setuid-sandbox",  # 禁用setuid沙箱
-
-            # ==================== 网络优化 ====================
-            "--disable-features=IsolateOrigins,site-per-process",  # 禁用站点隔离
-            "--allow-running-insecure-content",  # 允许运行不安全内容
-
-            # ==================== 媒体优化 ====================
-            "--use-fake-ui-for-media-stream",  # 使用假UI处理媒体流
-            "--use-fake-device-for-media-stream",  # 使用假设备处理媒体流
-            "--autoplay-policy=no-user-gesture-required",  # 自动播放策略
-
-            # ==================== 背景和定时器优化 ====================
-            "--disable-background-timer-throttling",  # 禁用后台定时器节流
-            "--disable-backgrounding-occluded-windows",  # 禁用后台窗口优化
-            "--disable-renderer-backgrounding",  # 禁用渲染器后台优化
-            "--disable-hang-monitor",  # 禁用挂起监控
-
-            # ==================== 2025新增反检测参数 ====================
-            "--disable-features=OutOfBlinkCors",  # 禁用CORS特性
-            "--disable-features=ImprovedCookieControls",  # 禁用改进的Cookie控制
-            "--disable-features=LazyFrameLoading",  # 禁用懒加载
-            "--disable-features=GlobalMediaControls",  # 禁用全局媒体控制
-
-            # ==================== 稳定性优化 ====================
-            "--disable-logging",  # 禁用日志（减少IO）
-            "--disable-crash-reporter",  # 禁用崩溃报告
-            "--disable-in-process-stack-traces",  # 禁用进程内堆栈跟踪
-            "--disable-breakpad",  # 禁用崩溃报告守护进程
-            "--disable-component-extensions-with-background-pages",  # 禁用带后台页面的组件扩展
-
-            # ==================== 隐私和追踪 ====================
-            "--disable-sync",  # 禁用同步
-            "--metrics-recording-only",  # 仅记录指标
-            "--disable-default-apps",  # 禁用默认应用
-            "--mute-audio",  # 静音
-            "--hide-scrollbars",  # 隐藏滚动条
-
-            # ==================== 渲染优化 ====================
-            "--disable-software-rasterizer",  # 禁用软件光栅化
-            "--disable-canvas-aa",  # 禁用Canvas抗锯齿（减少指纹特征）
-            "--disable-2d-canvas-clip-aa",  # 禁用2D Canvas裁剪抗锯齿
-
-            # ==================== 语言和地区 ====================
-            "--lang=zh-CN",  # 设置语言为中文
-            "--accept-lang=zh-CN,zh,en-US,en",  # 接受语言列表
-
-            # ==================== 扩展和插件 ====================
-            "--disable-extensions",  # 禁用扩展
-            "--disable-plugins-discovery",  # 禁用插件发现
-
-            # ==================== IPC和进程 ====================
-            "--disable-ipc-flooding-protection",  # 禁用IPC洪水保护
-            "--disable-infobars",  # 禁用信息栏
-            "--disable-notifications",  # 禁用通知
-
-            # ==================== 模拟真实浏览器特征 ====================
-            "--enable-features=NetworkService,NetworkServiceInProcess",  # 启用网络服务
-            "--force-color-profile=srgb",  # 强制使用sRGB颜色配置文件
-            "--disable-features=TranslateUI",  # 禁用翻译UI
-            "--disable-features=ChromeWhatsNewUI",  # 禁用"新功能"提示
-
-            # ==================== 其他优化 ====================
-            "--disable-domain-reliability",  # 禁用域名可靠性服务
-            "--disable-client-side-phishing-detection",  # 禁用客户端钓鱼检测
-            "--disable-web-security",  # 禁用Web安全（允许跨域，谨慎使用）
-        ]
+        return _BROWSER_ARGS[mode]
+
+
+@lru_cache(maxsize=None)
+def _env(name: str, default: str = "") -> str:
+    """读取环境变量（带缓存，修改环境变量后需调用 StealthConfig.reset_cache()）"""
+    return os.getenv(name, default)
+
+
+@lru_cache(maxsize=None)
+def _env_set(name: str) -> FrozenSet[str]:
+    """读取逗号分隔的环境变量为集合（小写、去空白、去空项，带缓存，成员判断 O(1)）"""
+    return frozenset(m.strip() for m in os.getenv(name, "").lower().split(",") if m.strip())
+
+
+@lru_cache(maxsize=None)
+def _env_float(name: str) -> Optional[float]:
+    """读取浮点型环境变量（未设置返回 None，格式错误抛出 ValueError；仅缓存成功的解析结果）"""
+    value = os.getenv(name)
+    if value is None:
+        return None
+    return float(value)
+
+
+def _env_bool(name: str, default: bool = False) -> bool:
+    """读取布尔型环境变量（仅 'true' 视为真，与原有判断保持一致）"""
+    return _env(name, "true" if default else "false").lower() == "true"
 
 
 class ProxyManager:
@@ -956,8 +502,6 @@ class ProxyManager:
         Returns:
             dict or None: 代理配置字典
         """
-        import os
-
         proxy_server = os.getenv('PROXY_SERVER')
         if not proxy_server:
             return None
@@ -993,18 +537,18 @@ class ProxyManager:
             - PROXY_USER: 代理用户名
             - PROXY_PASS: 代理密码
         """
-        import os
-        from utils.subscription_parser import SubscriptionProxyManager
-
         # 1. 检查是否使用订阅模式
         subscription_url = os.getenv('PROXY_SUBSCRIPTION_URL')
 
         if subscription_url:
-            logger.info(f"🌐 使用订阅模式获取代理配置")
+            logger.info("🌐 使用订阅模式获取代理配置")
 
             try:
                 # 创建或复用订阅���理器实例
                 if ProxyManager._subscription_manager is None:
+                    # 订阅解析模块依赖 yaml 等较重的库（约 14ms），仅在首次启用订阅模式时导入
+                    from utils.subscription_parser import SubscriptionProxyManager
+
                     # 处理GitHub Secrets空字符串问题：空字符串应该使用默认值
                     selection_mode = (os.getenv('PROXY_SELECTION_MODE', 'auto') or 'auto').lower()
                     node_name_pattern = os.getenv('PROXY_NODE_NAME') or None
@@ -1023,10 +567,10 @@ class ProxyManager:
                         cache_duration=cache_duration
                     )
 
-                    logger.info(f"✅ 订阅代理管理器初始化完成")
-                    logger.info(f"   - 选择模式: {selection_mode}")
-                    logger.info(f"   - 是否测速: {test_speed}")
-                    logger.info(f"   - 缓存时长: {cache_duration}秒")
+                    logger.info("✅ 订阅代理管理器初始化完成")
+                    logger.info("   - 选择模式: %s", selection_mode)
+                    logger.info("   - 是否测速: %s", test_speed)
+                    logger.info("   - 缓存时长: %s秒", cache_duration)
 
                 # 获取代理配置
                 proxy_config = await ProxyManager._subscription_manager.get_proxy_config()
@@ -1035,18 +579,18 @@ class ProxyManager:
                     # 显示选中节点信息
                     node_info = ProxyManager._subscription_manager.get_selected_node_info()
                     if node_info:
-                        logger.info(f"✅ 订阅代理节点信息:")
-                        logger.info(f"   - 节点名称: {node_info['name']}")
-                        logger.info(f"   - 节点类型: {node_info['type']}")
-                        logger.info(f"   - 节点地址: {node_info['server']}:{node_info['port']}")
+                        logger.info("✅ 订阅代理节点信息:")
+                        logger.info("   - 节点名称: %s", node_info['name'])
+                        logger.info("   - 节点类型: %s", node_info['type'])
+                        logger.info("   - 节点地址: %s:%s", node_info['server'], node_info['port'])
                         if node_info.get('latency'):
-                            logger.info(f"   - 延迟: {node_info['latency']}ms")
+                            logger.info("   - 延迟: %sms", node_info['latency'])
 
                 return proxy_config
 
             except Exception as e:
-                logger.error(f"❌ 订阅模式获取代理失败: {e}")
-                logger.info(f"ℹ️ 尝试使用直接配置模式...")
+                logger.error("❌ 订阅模式获取代理失败: %s", e)
+                logger.info("ℹ️ 尝试使用直接配置模式...")
 
         # 2. 回退到直接配置模式
         return ProxyManager.get_proxy_config()
@@ -1065,9 +609,7 @@ class ProxyManager:
         Returns:
             bool: 是否使用代理
         """
-        import os
-
-        use_proxy_env = os.getenv('USE_PROXY', '').lower()
+        use_proxy_env = _env('USE_PROXY').lower()
 
         # 方式1: 显式禁用（最高优先级）
         if use_proxy_env == 'false':
@@ -1078,11 +620,11 @@ class ProxyManager:
             return True
 
         # 方式3: 配置了订阅代理URL（自动启用）
-        if os.getenv('PROXY_SUBSCRIPTION_URL'):
+        if _env('PROXY_SUBSCRIPTION_URL'):
             return True
 
         # 方式4: 配置了直接代理服务器（自动启用）
-        if os.getenv('PROXY_SERVER'):
+        if _env('PROXY_SERVER'):
             return True
 
         return False
@@ -1118,7 +660,6 @@ class ProxyManager:
 
         # 构建带认证的代理 URL
         if proxy_config.get('username') and proxy_config.get('password'):
-            from urllib.parse import urlparse, urlunparse
             parsed = urlparse(proxy_url)
             proxy_url = urlunparse((
                 parsed.scheme,
@@ -1135,20 +676,20 @@ class ProxyManager:
         for test_url in test_urls:
             try:
                 async with httpx.AsyncClient(
-                    proxies={"http://": proxy_url, "https://": proxy_url},
+                    proxy=proxy_url,
                     timeout=timeout,
                     follow_redirects=True
                 ) as client:
                     response = await client.get(test_url)
                     if response.status_code in [200, 204]:
-                        logger.info(f"✅ 代理连接测试成功: {proxy_config['server']} (via {test_url})")
+                        logger.info("✅ 代理连接测试成功: %s (via %s)", proxy_config['server'], test_url)
                         return True
             except asyncio.TimeoutError:
-                logger.debug(f"⏱️ 代理测试超时: {test_url}")
+                logger.debug("⏱️ 代理测试超时: %s", test_url)
             except Exception as e:
-                logger.debug(f"⚠️ 代理测试失败 ({test_url}): {type(e).__name__}")
+                logger.debug("⚠️ 代理测试失败 (%s): %s", test_url, type(e).__name__)
 
-        logger.warning(f"❌ 代理不可用: {proxy_config['server']} (所有测试 URL 均失败)")
+        logger.warning("❌ 代理不可用: %s (所有测试 URL 均失败)", proxy_config['server'])
         return False
 
     @staticmethod
@@ -1178,7 +719,7 @@ class ProxyManager:
 
         # 如果尚未测试，进行可用性测试
         if not ProxyManager._proxy_tested:
-            logger.info(f"🔍 测试代理可用性: {proxy_config['server']}")
+            logger.info("🔍 测试代理可用性: %s", proxy_config['server'])
             ProxyManager._proxy_available = await ProxyManager.test_proxy_connectivity(proxy_config)
             ProxyManager._proxy_tested = True
 
@@ -1216,26 +757,22 @@ class StealthConfig:
             - BEHAVIOR_SIMULATION_METHODS=email,github  # 仅对指定方式启用
             - DISABLE_BEHAVIOR_SIMULATION_METHODS=cookies  # 对指定方式禁用
         """
-        import os
-
         # 全局配置
-        global_enabled = os.getenv('ENABLE_BEHAVIOR_SIMULATION', 'false').lower() == 'true'
+        global_enabled = _env_bool('ENABLE_BEHAVIOR_SIMULATION')
 
         # 如果没有指定认证方式，返回全局配置
         if not auth_method:
             return global_enabled
 
         # 检查是否仅对特定方式启用
-        enabled_methods = os.getenv('BEHAVIOR_SIMULATION_METHODS', '').lower().split(',')
-        enabled_methods = [m.strip() for m in enabled_methods if m.strip()]
+        enabled_methods = _env_set('BEHAVIOR_SIMULATION_METHODS')
 
         if enabled_methods:
             # 如果指定了启用列表，只对列表中的方式启用
             return auth_method.lower() in enabled_methods
 
         # 检查是否对特定方式禁用
-        disabled_methods = os.getenv('DISABLE_BEHAVIOR_SIMULATION_METHODS', '').lower().split(',')
-        disabled_methods = [m.strip() for m in disabled_methods if m.strip()]
+        disabled_methods = _env_set('DISABLE_BEHAVIOR_SIMULATION_METHODS')
 
         if disabled_methods and auth_method.lower() in disabled_methods:
             return False
@@ -1243,6 +780,16 @@ class StealthConfig:
         # 否则使用全局配置
         return global_enabled
 
+    @staticmethod
+    def should_use_in_page_reading_simulation() -> bool:
+        """
+        判断阅读行为模拟是否在页面内执行（单次 evaluate，速度快，但事件 isTrusted=false）
+
+        环境变量配置：
+            - IN_PAGE_READING_SIMULATION=true  # 仅建议用于不涉及人机验证的页面
+        """
+        return _env_bool('IN_PAGE_READING_SIMULATION')
+
     @staticmethod
     def should_use_proxy_for_method(auth_method: str = None) -> bool:
         """
@@ -1260,9 +807,7 @@ class StealthConfig:
             - PROXY_METHODS=github,linux.do       # 仅对指定方式启用代理
             - NO_PROXY_METHODS=cookies            # 对指定方式禁用代理
         """
-        import os
-
-        use_proxy_env = os.getenv('USE_PROXY', '').lower()
+        use_proxy_env = _env('USE_PROXY').lower()
 
         # 优先级1: 显式全局禁用（最高优先级）
         if use_proxy_env == 'false':
@@ -1273,15 +818,13 @@ class StealthConfig:
             return ProxyManager.should_use_proxy()
 
         # 优先级2: 检查是否仅对特定方式启用代理（白名单）
-        proxy_methods = os.getenv('PROXY_METHODS', '').lower().split(',')
-        proxy_methods = [m.strip() for m in proxy_methods if m.strip()]
+        proxy_methods = _env_set('PROXY_METHODS')
 
         if proxy_methods:
             return auth_method.lower() in proxy_methods
 
         # 优先级3: 检查是否对特定方式禁用代理（黑名单）
-        no_proxy_methods = os.getenv('NO_PROXY_METHODS', '').lower().split(',')
-        no_proxy_methods = [m.strip() for m in no_proxy_methods if m.strip()]
+        no_proxy_methods = _env_set('NO_PROXY_METHODS')
 
         if no_proxy_methods and auth_method.lower() in no_proxy_methods:
             return False
@@ -1305,23 +848,23 @@ class StealthConfig:
             - GITHUB_WAIT_TIME_MULTIPLIER=3.0           # GitHub特定倍增器
             - LINUXDO_WAIT_TIME_MULTIPLIER=2.5          # Linux.do特定倍增器
         """
-        import os
-
         # 默认倍增器
-        default_multiplier = float(os.getenv('WAIT_TIME_MULTIPLIER', '1.0'))
+        default_multiplier = _env_float('WAIT_TIME_MULTIPLIER')
+        if default_multiplier is None:
+            default_multiplier = 1.0
 
         if not auth_method:
             return default_multiplier
 
-        # 检查是否有针对特定方式的倍增器
+        # 检查是否有针对特定方式的倍增器（格式错误时回退到默认倍增器）
         method_key = f"{auth_method.upper().replace('.', '')}_WAIT_TIME_MULTIPLIER"
-        method_multiplier = os.getenv(method_key)
+        try:
+            method_multiplier = _env_float(method_key)
+        except ValueError:
+            method_multiplier = None
 
-        if method_multiplier:
-            try:
-                return float(method_multiplier)
-            except ValueError:
-                pass
+        if method_multiplier is not None:
+            return method_multiplier
 
         return default_multiplier
 
@@ -1333,15 +876,20 @@ class StealthConfig:
         Returns:
             dict: 配置摘要
         """
-        import os
-
         return {
-            "global_behavior_simulation": os.getenv('ENABLE_BEHAVIOR_SIMULATION', 'false'),
-            "behavior_simulation_methods": os.getenv('BEHAVIOR_SIMULATION_METHODS', ''),
-            "disable_behavior_simulation_methods": os.getenv('DISABLE_BEHAVIOR_SIMULATION_METHODS', ''),
-            "global_proxy": os.getenv('USE_PROXY', 'false'),
-            "proxy_methods": os.getenv('PROXY_METHODS', ''),
-            "no_proxy_methods": os.getenv('NO_PROXY_METHODS', ''),
-            "wait_time_multiplier": os.getenv('WAIT_TIME_MULTIPLIER', '1.0'),
+            "global_behavior_simulation": _env('ENABLE_BEHAVIOR_SIMULATION', 'false'),
+            "behavior_simulation_methods": _env('BEHAVIOR_SIMULATION_METHODS', ''),
+            "disable_behavior_simulation_methods": _env('DISABLE_BEHAVIOR_SIMULATION_METHODS', ''),
+            "in_page_reading_simulation": _env('IN_PAGE_READING_SIMULATION', 'false'),
+            "global_proxy": _env('USE_PROXY', 'false'),
+            "proxy_methods": _env('PROXY_METHODS', ''),
+            "no_proxy_methods": _env('NO_PROXY_METHODS', ''),
+            "wait_time_multiplier": _env('WAIT_TIME_MULTIPLIER', '1.0'),
         }
 
+    @staticmethod
+    def reset_cache() -> None:
+        """清除环境变量读取缓存（运行中修改环境变量或测试时使用）"""
+        _env.cache_clear()
+        _env_set.cache_clear()
+        _env_float.cache_clear()
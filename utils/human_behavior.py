@@ -4,12 +4,48 @@
 
 import random
 import asyncio
-from typing import Optional
+from contextlib import asynccontextmanager
+from typing import AsyncIterator, Awaitable, Callable, List, Optional, Tuple
 from playwright.async_api import Page
 from utils.logger import setup_logger
 
 logger = setup_logger(__name__)
 
+# 模块专用随机数生成器（不与其他模块共享全局 random 的状态）
+_rng = random.Random()
+
+# 滚动脚本（参数化传值，源码固定不变，避免每次滚动拼接新脚本）
+_SCROLL_BY = "(dy) => window.scrollBy(0, dy)"
+_SCROLL_TO_TOP = "() => window.scrollTo(0, 0)"
+
+
+def _consume_exception(future: asyncio.Future) -> None:
+    """读取已结束指令的异常，避免 "Task exception was never retrieved" 警告"""
+    if not future.cancelled():
+        future.exception()
+
+
+@asynccontextmanager
+async def pipelined_actions() -> AsyncIterator[Callable[[Awaitable], None]]:
+    """流水线发出页面指令
+
+    submit 立即调度指令，不等待浏览器确认即可开始下一段停顿；正常退出时统一收集结果。
+    调用方被取消或中途出错时取消尚未完成的指令，不会在调用方放弃后继续发送输入事件。
+    """
+    pending: List[asyncio.Future] = []
+
+    def submit(action: Awaitable) -> None:
+        future = asyncio.ensure_future(action)
+        future.add_done_callback(_consume_exception)
+        pending.append(future)
+
+    try:
+        yield submit
+        await asyncio.gather(*pending)
+    finally:
+        for future in pending:
+            future.cancel()
+
 
 async def simulate_human_behavior(page: Page, logger_instance=None) -> None:
     """模拟人类浏览行为
@@ -23,31 +59,34 @@ async def simulate_human_behavior(page: Page, logger_instance=None) -> None:
     """
     log = logger_instance or logger
 
+    # 各动作之间只有节奏上的停顿，没有结果依赖：发出指令后立即开始停顿，最后统一收集结果
+    # （同一连接上的指令按发出顺序执行，动作顺序不变）
     try:
-        # 随机鼠标移动（模拟用户浏览页面）
-        move_count = random.randint(2, 5)
-        log.debug(f"开始模拟鼠标移动 ({move_count} 次)")
-
-        for i in range(move_count):
-            x = random.randint(100, 800)
-            y = random.randint(100, 600)
-            await page.mouse.move(x, y)
-            await asyncio.sleep(random.uniform(0.1, 0.3))
-
-        # 随机滚动页面（模拟阅读）
-        scroll_amount = random.randint(100, 500)
-        log.debug(f"模拟页面滚动 ({scroll_amount}px)")
-        await page.evaluate(f"window.scrollBy(0, {scroll_amount})")
-        await asyncio.sleep(random.uniform(0.5, 1.0))
-
-        # 回到顶部（模拟查看完整页面）
-        await page.evaluate("window.scrollTo(0, 0)")
-        await asyncio.sleep(random.uniform(0.3, 0.6))
+        async with pipelined_actions() as submit:
+            # 随机鼠标移动（模拟用户浏览页面）
+            move_count = _rng.randint(2, 5)
+            log.debug("开始模拟鼠标移动 (%s 次)", move_count)
+
+            for i in range(move_count):
+                x = _rng.randint(100, 800)
+                y = _rng.randint(100, 600)
+                submit(page.mouse.move(x, y))
+                await asyncio.sleep(_rng.uniform(0.1, 0.3))
+
+            # 随机滚动页面（模拟阅读）
+            scroll_amount = _rng.randint(100, 500)
+            log.debug("模拟页面滚动 (%spx)", scroll_amount)
+            submit(page.evaluate(_SCROLL_BY, scroll_amount))
+            await asyncio.sleep(_rng.uniform(0.5, 1.0))
+
+            # 回到顶部（模拟查看完整页面）
+            submit(page.evaluate(_SCROLL_TO_TOP))
+            await asyncio.sleep(_rng.uniform(0.3, 0.6))
 
         log.debug("行为模拟完成")
 
     except Exception as e:
-        log.debug(f"行为模拟失败（非致命）: {e}")
+        log.debug("行为模拟失败（非致命）: %s", e)
 
 
 async def simulate_reading_delay() -> None:
@@ -55,7 +94,33 @@ async def simulate_reading_delay() -> None:
 
     模拟用户阅读页面内容的时间延迟。
     """
-    await asyncio.sleep(random.uniform(1.0, 2.5))
+    await asyncio.sleep(_rng.uniform(1.0, 2.5))
+
+
+# 输入后需要额外停顿的字符（空格与常见标点）
+_PAUSE_CHARS = frozenset(" .,;:!?@-_")
+
+
+def _typing_delays(text: str) -> List[float]:
+    """预生成每个字符输入前的停顿（秒）
+
+    每个字符间随机延迟 50-150ms（模拟人类打字速度）；
+    空格和标点之后稍作停顿，且约 10% 的概率额外停顿一下（模拟思考下一个词）。
+    """
+    randint = _rng.randint
+    uniform = _rng.uniform
+
+    delays = []
+    previous = ""
+    for char in text:
+        pause = randint(50, 150) / 1000
+        if previous in _PAUSE_CHARS:
+            pause += uniform(0.05, 0.2)
+            if _rng.random() < 0.1:
+                pause += uniform(0.3, 0.8)
+        delays.append(pause)
+        previous = char
+    return delays
 
 
 async def simulate_typing(
@@ -82,26 +147,56 @@ async def simulate_typing(
     try:
         element = await page.query_selector(selector)
         if element:
-            log.debug(f"开始模拟打字: {selector}")
-            for char in text:
-                # 每个字符间随机延迟 50-150ms（模拟人类打字速度）
-                await element.type(char, delay=random.randint(50, 150))
-            log.debug(f"模拟打字完成: {selector}")
+            log.debug("开始模拟打字: %s", selector)
+            # 只聚焦一次，之后直接走键盘输入，不再每个字符重新定位元素
+            await element.focus()
+            for char, pause in zip(text, _typing_delays(text)):
+                await asyncio.sleep(pause)
+                await page.keyboard.type(char)
+            log.debug("模拟打字完成: %s", selector)
             return True
         else:
-            log.warning(f"未找到元素，降级到普通 fill: {selector}")
+            log.warning("未找到元素，降级到普通 fill: %s", selector)
             await page.fill(selector, text)
             return False
     except Exception as e:
-        log.warning(f"模拟打字失败，降级到普通 fill: {e}")
+        log.warning("模拟打字失败，降级到普通 fill: %s", e)
         try:
             await page.fill(selector, text)
             return False
         except Exception as fill_error:
-            log.error(f"填充文本失败: {fill_error}")
+            log.error("填充文本失败: %s", fill_error)
             return False
 
 
+def _movement_path(
+    start_x: float,
+    start_y: float,
+    target_x: float,
+    target_y: float
+) -> List[Tuple[float, float, float]]:
+    """预生成移动到目标的中间点（线性插值 + 随机偏移）
+
+    Returns:
+        [(x, y, 该步之后的停顿秒数), ...]，共 3-6 个点
+    """
+    steps = _rng.randint(3, 6)
+    dx = target_x - start_x
+    dy = target_y - start_y
+    randint = _rng.randint
+    uniform = _rng.uniform
+
+    path = []
+    for step in range(steps):
+        progress = (step + 1) / steps
+        path.append((
+            start_x + dx * progress + randint(-20, 20),
+            start_y + dy * progress + randint(-20, 20),
+            uniform(0.05, 0.15),
+        ))
+    return path
+
+
 async def simulate_mouse_movement_to_element(
     page: Page,
     selector: str,
@@ -124,39 +219,35 @@ async def simulate_mouse_movement_to_element(
     try:
         element = await page.query_selector(selector)
         if not element:
-            log.warning(f"未找到目标元素: {selector}")
+            log.warning("未找到目标元素: %s", selector)
             return False
 
         # 获取元素位置
         box = await element.bounding_box()
         if not box:
-            log.warning(f"无法获取元素位置: {selector}")
+            log.warning("无法获取元素位置: %s", selector)
             return False
 
         # 计算元素中心点
         target_x = box['x'] + box['width'] / 2
         target_y = box['y'] + box['height'] / 2
 
-        # 模拟曲线移动（分多步移动到目标）
-        steps = random.randint(3, 6)
-        current_x, current_y = 0, 0
-
-        for step in range(steps):
-            # 计算中间点（添加随机偏移）
-            progress = (step + 1) / steps
-            x = current_x + (target_x - current_x) * progress + random.randint(-20, 20)
-            y = current_y + (target_y - current_y) * progress + random.randint(-20, 20)
+        # 模拟曲线移动（分多步移动到目标，路径在发出指令前一次性生成）
+        path = _movement_path(0, 0, target_x, target_y)
 
-            await page.mouse.move(x, y)
-            await asyncio.sleep(random.uniform(0.05, 0.15))
+        # 按节奏依次发出移动指令，不逐步等待浏览器确认，休眠与协议往返并行，最后统一收集结果
+        async with pipelined_actions() as submit:
+            for x, y, pause in path:
+                submit(page.mouse.move(x, y))
+                await asyncio.sleep(pause)
 
-        # 最终精确移动到目标
-        await page.mouse.move(target_x, target_y)
-        log.debug(f"鼠标已移动到元素: {selector}")
+            # 最终精确移动到目标
+            submit(page.mouse.move(target_x, target_y))
+        log.debug("鼠标已移动到元素: %s", selector)
         return True
 
     except Exception as e:
-        log.warning(f"模拟鼠标移动失败: {e}")
+        log.warning("模拟鼠标移动失败: %s", e)
         return False
 
 
@@ -184,18 +275,18 @@ async def simulate_click_with_behavior(
     try:
         if with_movement:
             await simulate_mouse_movement_to_element(page, selector, log)
-            await asyncio.sleep(random.uniform(0.2, 0.5))
+            await asyncio.sleep(_rng.uniform(0.2, 0.5))
 
         # 执行点击
         await page.click(selector)
-        log.debug(f"已点击元素: {selector}")
+        log.debug("已点击元素: %s", selector)
 
         # 点击后短暂延迟（模拟人类反应时间）
-        await asyncio.sleep(random.uniform(0.3, 0.7))
+        await asyncio.sleep(_rng.uniform(0.3, 0.7))
         return True
 
     except Exception as e:
-        log.warning(f"模拟点击失败: {e}")
+        log.warning("模拟点击失败: %s", e)
         return False
 
 
@@ -229,11 +320,11 @@ async def simulate_form_filling(
     try:
         # 移动到邮箱输入框
         await simulate_mouse_movement_to_element(page, email_selector, log)
-        await asyncio.sleep(random.uniform(0.2, 0.4))
+        await asyncio.sleep(_rng.uniform(0.2, 0.4))
 
         # 点击邮箱输入框
         await page.click(email_selector)
-        await asyncio.sleep(random.uniform(0.3, 0.6))
+        await asyncio.sleep(_rng.uniform(0.3, 0.6))
 
         # 填写邮箱
         if enable_typing:
@@ -242,15 +333,15 @@ async def simulate_form_filling(
             await page.fill(email_selector, email_value)
 
         # 短暂停顿（模拟思考时间）
-        await asyncio.sleep(random.uniform(0.5, 1.0))
+        await asyncio.sleep(_rng.uniform(0.5, 1.0))
 
         # 移动到密码输入框
         await simulate_mouse_movement_to_element(page, password_selector, log)
-        await asyncio.sleep(random.uniform(0.2, 0.4))
+        await asyncio.sleep(_rng.uniform(0.2, 0.4))
 
         # 点击密码输入框
         await page.click(password_selector)
-        await asyncio.sleep(random.uniform(0.3, 0.6))
+        await asyncio.sleep(_rng.uniform(0.3, 0.6))
 
         # 填写密码
         if enable_typing:
@@ -259,13 +350,13 @@ async def simulate_form_filling(
             await page.fill(password_selector, password_value)
 
         # 填写完成后的短暂延迟
-        await asyncio.sleep(random.uniform(0.5, 1.0))
+        await asyncio.sleep(_rng.uniform(0.5, 1.0))
 
         log.debug("表单填写完成")
         return True
 
     except Exception as e:
-        log.error(f"模拟表单填写失败: {e}")
+        log.error("模拟表单填写失败: %s", e)
         return False
 
 
@@ -279,16 +370,21 @@ async def add_random_mouse_jitter(page: Page, duration_seconds: float = 2.0) ->
         duration_seconds: 抖动持续时间（秒）
     """
     try:
-        end_time = asyncio.get_event_loop().time() + duration_seconds
-
-        while asyncio.get_event_loop().time() < end_time:
-            x = random.randint(0, 1920)
-            y = random.randint(0, 1080)
-            await page.mouse.move(x, y)
-            await asyncio.sleep(random.uniform(0.1, 0.3))
+        now = asyncio.get_running_loop().time
+        randint = _rng.randint
+        uniform = _rng.uniform
+        end_time = now() + duration_seconds
+
+        # 发出移动指令后立即开始停顿，不逐个等待浏览器确认
+        async with pipelined_actions() as submit:
+            while now() < end_time:
+                x = randint(0, 1920)
+                y = randint(0, 1080)
+                submit(page.mouse.move(x, y))
+                await asyncio.sleep(uniform(0.1, 0.3))
 
     except Exception as e:
-        logger.debug(f"鼠标抖动失败（非致命）: {e}")
+        logger.debug("鼠标抖动失败（非致命）: %s", e)
 
 
 async def simulate_page_interaction(page: Page, logger_instance=None) -> None:
@@ -303,36 +399,38 @@ async def simulate_page_interaction(page: Page, logger_instance=None) -> None:
     """
     log = logger_instance or logger
 
+    # 与 simulate_human_behavior 相同：发出指令后立即开始停顿，最后统一收集结果
     try:
         log.debug("开始模拟页面交互")
 
-        # 随机鼠标移动
-        for _ in range(random.randint(3, 7)):
-            x = random.randint(100, 1800)
-            y = random.randint(100, 900)
-            await page.mouse.move(x, y)
-            await asyncio.sleep(random.uniform(0.15, 0.35))
-
-        # 向下滚动（模拟浏览）
-        scroll_steps = random.randint(2, 4)
-        for _ in range(scroll_steps):
-            scroll_amount = random.randint(150, 400)
-            await page.evaluate(f"window.scrollBy(0, {scroll_amount})")
-            await asyncio.sleep(random.uniform(0.6, 1.2))
-
-        # 在页面中间停顿（模拟阅读）
-        await asyncio.sleep(random.uniform(1.0, 2.0))
-
-        # 向上滚动一点
-        scroll_back = random.randint(50, 200)
-        await page.evaluate(f"window.scrollBy(0, -{scroll_back})")
-        await asyncio.sleep(random.uniform(0.4, 0.8))
-
-        # 回到顶部
-        await page.evaluate("window.scrollTo(0, 0)")
-        await asyncio.sleep(random.uniform(0.5, 1.0))
+        async with pipelined_actions() as submit:
+            # 随机鼠标移动
+            for _ in range(_rng.randint(3, 7)):
+                x = _rng.randint(100, 1800)
+                y = _rng.randint(100, 900)
+                submit(page.mouse.move(x, y))
+                await asyncio.sleep(_rng.uniform(0.15, 0.35))
+
+            # 向下滚动（模拟浏览）
+            scroll_steps = _rng.randint(2, 4)
+            for _ in range(scroll_steps):
+                scroll_amount = _rng.randint(150, 400)
+                submit(page.evaluate(_SCROLL_BY, scroll_amount))
+                await asyncio.sleep(_rng.uniform(0.6, 1.2))
+
+            # 在页面中间停顿（模拟阅读）
+            await asyncio.sleep(_rng.uniform(1.0, 2.0))
+
+            # 向上滚动一点
+            scroll_back = _rng.randint(50, 200)
+            submit(page.evaluate(_SCROLL_BY, -scroll_back))
+            await asyncio.sleep(_rng.uniform(0.4, 0.8))
+
+            # 回到顶部
+            submit(page.evaluate(_SCROLL_TO_TOP))
+            await asyncio.sleep(_rng.uniform(0.5, 1.0))
 
         log.debug("页面交互模拟完成")
 
     except Exception as e:
-        log.debug(f"页面交互模拟失败（非致命）: {e}")
+        log.debug("页面交互模拟失败（非致命）: %s", e)
@@ -75,7 +75,9 @@ class SanitizingFilter(logging.Filter):
         return True
 
     def _sanitize_value(self, value):
-        """脱敏单个值"""
+        """脱敏单个值（异常对象先转为字符串，其消息中同样可能带有敏感信息）"""
+        if isinstance(value, BaseException):
+            value = str(value)
         if isinstance(value, str):
             for pattern, replacement in self.PATTERNS:
                 value = pattern.sub(replacement, value)
@@ -1,14 +1,71 @@
+import atexit
+import json
 import os
+import random
 import smtplib
 import logging
-from email.mime.text import MIMEText
-from typing import Literal
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from email.message import EmailMessage
+from email.utils import formataddr
+from functools import partial
+from typing import Callable, Dict, List, Literal, Optional, Tuple
 
 import httpx
 
+try:
+    # httpx[http2] 依赖 h2；已安装时共享客户端启用 HTTP/2，对同一主机的并发推送复用一条多路复用连接
+    import h2  # noqa: F401
+
+    HTTP2_AVAILABLE = True
+except ImportError:
+    HTTP2_AVAILABLE = False
+
 
 logger = logging.getLogger(__name__)
 
+# 单个 SMTP 连接最多发送的邮件数，超过后重新建立连接
+SMTP_MAX_MESSAGES_PER_CONNECTION = 100
+
+# SMTP 发送最多尝试次数；仅对断线、超时等临时网络错误重试，认证失败等错误直接抛出
+SMTP_SEND_ATTEMPTS = 3
+SMTP_TRANSIENT_ERRORS = (smtplib.SMTPServerDisconnected, TimeoutError, ConnectionError)
+
+# Webhook 请求体模板：固定结构预先写成 JSON，只需填入 json.dumps 转义后的标题/正文
+JSON_HEADERS = {'Content-Type': 'application/json'}
+TEXT_WEBHOOK_TEMPLATE = '{"msgtype":"text","text":{"content":%s}}'
+FEISHU_CARD_TEMPLATE = (
+    '{"msg_type":"interactive","card":{'
+    '"elements":[{"tag":"markdown","content":%s,"text_align":"left"}],'
+    '"header":{"template":"blue","title":{"content":%s,"tag":"plain_text"}}}}'
+)
+
+
+def _json_str(value: str) -> str:
+    """将字符串转义为 JSON 字符串字面量（保留中文，不转为 \\u 转义）"""
+    return json.dumps(value, ensure_ascii=False)
+
+
+# 常见邮箱服务商 SMTP 配置: 域名 -> (host, port, use_ssl)
+EMAIL_PROVIDERS: Dict[str, Tuple[str, int, bool]] = {
+    'qq.com': ('smtp.qq.com', 465, True),
+    'vip.qq.com': ('smtp.qq.com', 465, True),
+    'foxmail.com': ('smtp.qq.com', 465, True),
+    '163.com': ('smtp.163.com', 465, True),
+    '126.com': ('smtp.126.com', 465, True),
+    'yeah.net': ('smtp.yeah.net', 465, True),
+    'gmail.com': ('smtp.gmail.com', 587, False),
+    'outlook.com': ('smtp.office365.com', 587, False),
+    'hotmail.com': ('smtp.office365.com', 587, False),
+    'live.com': ('smtp.office365.com', 587, False),
+    'sina.com': ('smtp.sina.com', 465, True),
+    'sina.cn': ('smtp.sina.cn', 465, True),
+    'sohu.com': ('smtp.sohu.com', 465, True),
+    '139.com': ('smtp.139.com', 465, True),
+    '189.cn': ('smtp.189.cn', 465, True),
+}
+
 
 class NotificationKit:
     def __init__(self) -> None:
@@ -21,84 +78,126 @@ class NotificationKit:
         self.dingding_webhook = os.getenv('DINGDING_WEBHOOK')
         self.feishu_webhook = os.getenv('FEISHU_WEBHOOK')
         self.weixin_webhook = os.getenv('WEIXIN_WEBHOOK')
+        self._http: Optional[httpx.Client] = None
+        # push_message 并发推送时多个线程会同时首次获取客户端，加锁保证只创建一个
+        self._http_lock = threading.Lock()
+        self._smtp_target: Optional[Tuple[str, int, bool]] = None
+        self._smtp: Optional[smtplib.SMTP] = None
+        self._smtp_sent = 0
+        # 发件人头只依赖配置，预先编码一次（中文显示名按 RFC 2047 编码）
+        self._from_header = formataddr(('Router签到助手', self.email_user))
+
+    def _get_http(self) -> httpx.Client:
+        """获取共享的 HTTP 客户端（首次使用时创建，连接池 keep-alive 跨渠道、跨消息复用）"""
+        if self._http is None:
+            with self._http_lock:
+                if self._http is None:
+                    self._http = httpx.Client(http2=HTTP2_AVAILABLE, timeout=30.0)
+        return self._http
+
+    def close(self) -> None:
+        """关闭共享的 HTTP 客户端和 SMTP 连接"""
+        with self._http_lock:
+            if self._http is not None:
+                self._http.close()
+                self._http = None
+        self._close_smtp()
+
+    def _get_smtp_target(self) -> Tuple[str, int, bool]:
+        """解析 SMTP 服务器 (host, port, use_ssl)，结果缓存在实例上"""
+        if self._smtp_target is None:
+            if self.smtp_server and self.smtp_server.strip():
+                # 用户指定了自定义服务器
+                self._smtp_target = (self.smtp_server.strip(), 465, True)
+            else:
+                # 自动检测邮箱服务商
+                domain = self.email_user.split('@')[1].lower()
+
+                if domain in EMAIL_PROVIDERS:
+                    self._smtp_target = EMAIL_PROVIDERS[domain]
+                    logger.debug(f'检测到邮箱服务商: {domain} -> {self._smtp_target[0]}:{self._smtp_target[1]}')
+                else:
+                    # 默认使用标准格式
+                    self._smtp_target = (f'smtp.{domain}', 465, True)
+                    logger.debug(f'使用默认 SMTP 服务器: {self._smtp_target[0]}')
+        return self._smtp_target
+
+    def _connect_smtp(self, smtp_host: str, smtp_port: int, use_ssl: bool) -> smtplib.SMTP:
+        """建立并登录 SMTP 连接（SSL 失败时回退到 STARTTLS 587）"""
+        if use_ssl:
+            # 尝试 SSL (465)
+            try:
+                server = smtplib.SMTP_SSL(smtp_host, smtp_port, timeout=30)
+                server.login(self.email_user, self.email_pass)
+                logger.debug(f'SMTP 已连接 via SSL:{smtp_port}')
+                return server
+            except Exception as ssl_error:
+                # SSL 失败，尝试 STARTTLS (587)
+                logger.debug(f'SSL ({smtp_port}) 连接失败，尝试 STARTTLS (587): {ssl_error}')
+                smtp_port = 587
+
+        server = smtplib.SMTP(smtp_host, smtp_port, timeout=30)
+        server.starttls()
+        server.login(self.email_user, self.email_pass)
+        logger.debug(f'SMTP 已连接 via STARTTLS:{smtp_port}')
+        return server
+
+    def _get_smtp(self, smtp_host: str, smtp_port: int, use_ssl: bool) -> smtplib.SMTP:
+        """获取已登录的 SMTP 连接（复用现有连接，NOOP 检测失效或发送数达到上限时重建）"""
+        if self._smtp is not None:
+            if self._smtp_sent < SMTP_MAX_MESSAGES_PER_CONNECTION:
+                try:
+                    if self._smtp.noop()[0] == 250:
+                        return self._smtp
+                except (smtplib.SMTPException, OSError):
+                    pass
+            self._close_smtp()
+
+        self._smtp = self._connect_smtp(smtp_host, smtp_port, use_ssl)
+        self._smtp_sent = 0
+        return self._smtp
+
+    def _close_smtp(self) -> None:
+        """关闭 SMTP 连接（忽略已断开等错误）"""
+        if self._smtp is not None:
+            try:
+                self._smtp.quit()
+            except (smtplib.SMTPException, OSError):
+                pass
+            self._smtp = None
 
     def send_email(self, title: str, content: str, msg_type: Literal['text', 'html'] = 'text') -> None:
         if not self.email_user or not self.email_pass or not self.email_to:
             raise ValueError('Email configuration not set')
 
         try:
-            # 使用简单的 MIMEText 而不是 MIMEMultipart，避免被识别为二进制
-            if msg_type == 'html':
-                msg = MIMEText(content, 'html', 'utf-8')
-            else:
-                msg = MIMEText(content, 'plain', 'utf-8')
-
-            msg['From'] = f'Router签到助手 <{self.email_user}>'
+            # 使用单部分 EmailMessage 而不是 multipart，避免被识别为二进制
+            msg = EmailMessage()
+            msg['From'] = self._from_header
             msg['To'] = self.email_to
             msg['Subject'] = title
+            msg.set_content(content, subtype='html' if msg_type == 'html' else 'plain', charset='utf-8')
 
-            # 智能检测 SMTP 服务器
+            # 智能检测 SMTP 服务器（首次发送时解析一次，之后复用）
+            # 先赋默认值，解析失败时下方的错误信息仍可引用
             smtp_host = None
             smtp_port = 465
-            use_ssl = True
+            smtp_host, smtp_port, use_ssl = self._get_smtp_target()
 
-            if self.smtp_server and self.smtp_server.strip():
-                # 用户指定了自定义服务器
-                smtp_host = self.smtp_server.strip()
-            else:
-                # 自动检测邮箱服务商
-                domain = self.email_user.split('@')[1].lower()
-
-                # 常见邮箱服务商配置
-                email_providers = {
-                    'qq.com': ('smtp.qq.com', 465, True),
-                    'vip.qq.com': ('smtp.qq.com', 465, True),
-                    'foxmail.com': ('smtp.qq.com', 465, True),
-                    '163.com': ('smtp.163.com', 465, True),
-                    '126.com': ('smtp.126.com', 465, True),
-                    'yeah.net': ('smtp.yeah.net', 465, True),
-                    'gmail.com': ('smtp.gmail.com', 587, False),
-                    'outlook.com': ('smtp.office365.com', 587, False),
-                    'hotmail.com': ('smtp.office365.com', 587, False),
-                    'live.com': ('smtp.office365.com', 587, False),
-                    'sina.com': ('smtp.sina.com', 465, True),
-                    'sina.cn': ('smtp.sina.cn', 465, True),
-                    'sohu.com': ('smtp.sohu.com', 465, True),
-                    '139.com': ('smtp.139.com', 465, True),
-                    '189.cn': ('smtp.189.cn', 465, True),
-                }
-
-                if domain in email_providers:
-                    smtp_host, smtp_port, use_ssl = email_providers[domain]
-                    logger.debug(f'检测到邮箱服务商: {domain} -> {smtp_host}:{smtp_port}')
-                else:
-                    # 默认使用标准格式
-                    smtp_host = f'smtp.{domain}'
-                    logger.debug(f'使用默认 SMTP 服务器: {smtp_host}')
-
-            # 尝试连接并发送
-            if use_ssl:
-                # 尝试 SSL (465)
+            # 复用已登录的连接发送；遇到临时网络错误时重建连接并指数退避（带抖动）重试
+            for attempt in range(SMTP_SEND_ATTEMPTS):
                 try:
-                    with smtplib.SMTP_SSL(smtp_host, smtp_port, timeout=30) as server:
-                        server.login(self.email_user, self.email_pass)
-                        server.send_message(msg)
-                        logger.debug(f'邮件发送成功 via SSL:{smtp_port}')
-                except Exception as ssl_error:
-                    # SSL 失败，尝试 STARTTLS (587)
-                    logger.debug(f'SSL ({smtp_port}) 连接失败，尝试 STARTTLS (587): {ssl_error}')
-                    with smtplib.SMTP(smtp_host, 587, timeout=30) as server:
-                        server.starttls()
-                        server.login(self.email_user, self.email_pass)
-                        server.send_message(msg)
-                        logger.debug(f'邮件发送成功 via STARTTLS:587')
-            else:
-                # 使用 STARTTLS
-                with smtplib.SMTP(smtp_host, smtp_port, timeout=30) as server:
-                    server.starttls()
-                    server.login(self.email_user, self.email_pass)
-                    server.send_message(msg)
-                    logger.debug(f'邮件发送成功 via STARTTLS:{smtp_port}')
+                    self._get_smtp(smtp_host, smtp_port, use_ssl).send_message(msg)
+                    break
+                except SMTP_TRANSIENT_ERRORS as e:
+                    self._close_smtp()
+                    if attempt == SMTP_SEND_ATTEMPTS - 1:
+                        raise
+                    delay = 0.5 * 2 ** attempt + random.random() * 0.2
+                    logger.debug(f'SMTP 临时错误，{delay:.1f}s 后重试 ({attempt + 1}/{SMTP_SEND_ATTEMPTS - 1}): {e}')
+                    time.sleep(delay)
+            self._smtp_sent += 1
+            logger.debug('邮件发送成功')
 
         except Exception as e:
             # 提供更详细的错误信息
@@ -119,8 +218,7 @@ class NotificationKit:
             raise ValueError('PushPlus Token not configured')
 
         data = {'token': self.pushplus_token, 'title': title, 'content': content, 'template': 'html'}
-        with httpx.Client(timeout=30.0) as client:
-            client.post('http://www.pushplus.plus/send', json=data)
+        self._get_http().post('http://www.pushplus.plus/send', json=data)
 
     def send_serverPush(self, title: str, content: str) -> None:
         """发送 ServerChan 通知（支持多种版本）"""
@@ -130,76 +228,63 @@ class NotificationKit:
         url = f'https://sctapi.ftqq.com/{self.server_push_key}.send'
         data = {'title': title, 'desp': content}
 
-        with httpx.Client(timeout=30.0) as client:
-            # 尝试 1: JSON 格式（Server酱 Turbo 版）
+        client = self._get_http()
+        # 尝试 1: JSON 格式（Server酱 Turbo 版）
+        try:
+            response = client.post(url, json=data)
+            response.raise_for_status()
+            logger.debug('ServerChan 通知发送成功 (JSON格式)')
+            return
+        except Exception as json_error:
+            logger.debug(f'JSON格式发送失败: {json_error}，尝试 form-urlencoded 格式')
+
+            # 尝试 2: form-urlencoded 格式（旧版本 Server酱）
             try:
-                response = client.post(url, json=data)
+                response = client.post(url, data=data)
                 response.raise_for_status()
-                logger.debug('ServerChan 通知发送成功 (JSON格式)')
+                logger.debug('ServerChan 通知发送成功 (form-urlencoded格式)')
                 return
-            except Exception as json_error:
-                logger.debug(f'JSON格式发送失败: {json_error}，尝试 form-urlencoded 格式')
-
-                # 尝试 2: form-urlencoded 格式（旧版本 Server酱）
-                try:
-                    response = client.post(url, data=data)
-                    response.raise_for_status()
-                    logger.debug('ServerChan 通知发送成功 (form-urlencoded格式)')
-                    return
-                except Exception as form_error:
-                    # 两种方式都失败
-                    raise ValueError(f'ServerChan 发送失败 - JSON: {str(json_error)[:50]}, Form: {str(form_error)[:50]}')
+            except Exception as form_error:
+                # 两种方式都失败
+                raise ValueError(f'ServerChan 发送失败 - JSON: {str(json_error)[:50]}, Form: {str(form_error)[:50]}')
 
     def send_dingtalk(self, title: str, content: str) -> None:
         if not self.dingding_webhook:
             raise ValueError('DingTalk Webhook not configured')
 
-        data = {'msgtype': 'text', 'text': {'content': f'{title}\n{content}'}}
-        with httpx.Client(timeout=30.0) as client:
-            client.post(self.dingding_webhook, json=data)
+        body = TEXT_WEBHOOK_TEMPLATE % _json_str(f'{title}\n{content}')
+        self._get_http().post(self.dingding_webhook, content=body.encode('utf-8'), headers=JSON_HEADERS)
 
     def send_feishu(self, title: str, content: str) -> None:
         if not self.feishu_webhook:
             raise ValueError('Feishu Webhook not configured')
 
-        data = {
-            'msg_type': 'interactive',
-            'card': {
-                'elements': [{'tag': 'markdown', 'content': content, 'text_align': 'left'}],
-                'header': {'template': 'blue', 'title': {'content': title, 'tag': 'plain_text'}},
-            },
-        }
-        with httpx.Client(timeout=30.0) as client:
-            client.post(self.feishu_webhook, json=data)
+        body = FEISHU_CARD_TEMPLATE % (_json_str(content), _json_str(title))
+        self._get_http().post(self.feishu_webhook, content=body.encode('utf-8'), headers=JSON_HEADERS)
 
     def send_wecom(self, title: str, content: str) -> None:
         if not self.weixin_webhook:
             raise ValueError('WeChat Work Webhook not configured')
 
-        data = {'msgtype': 'text', 'text': {'content': f'{title}\n{content}'}}
-        with httpx.Client(timeout=30.0) as client:
-            client.post(self.weixin_webhook, json=data)
+        body = TEXT_WEBHOOK_TEMPLATE % _json_str(f'{title}\n{content}')
+        self._get_http().post(self.weixin_webhook, content=body.encode('utf-8'), headers=JSON_HEADERS)
 
     def push_message(self, title: str, content: str, msg_type: Literal['text', 'html'] = 'text') -> None:
         """发送通知消息（仅尝试已配置的渠道）"""
-        # 定义所有可用的通知渠道（名称、检查配置、发送函数）
-        all_notifications = [
-            ('Email', lambda: bool(self.email_user and self.email_pass and self.email_to),
-             lambda: self.send_email(title, content, msg_type)),
-            ('PushPlus', lambda: bool(self.pushplus_token),
-             lambda: self.send_pushplus(title, content)),
-            ('Server Push', lambda: bool(self.server_push_key),
-             lambda: self.send_serverPush(title, content)),
-            ('DingTalk', lambda: bool(self.dingding_webhook),
-             lambda: self.send_dingtalk(title, content)),
-            ('Feishu', lambda: bool(self.feishu_webhook),
-             lambda: self.send_feishu(title, content)),
-            ('WeChat Work', lambda: bool(self.weixin_webhook),
-             lambda: self.send_wecom(title, content)),
-        ]
-
-        # 筛选已配置的通知渠道
-        enabled_notifications = [(name, send_func) for name, check_func, send_func in all_notifications if check_func()]
+        # 只为已配置的渠道生成发送函数（名称、发送函数）
+        enabled_notifications: List[Tuple[str, Callable[[], None]]] = []
+        if self.email_user and self.email_pass and self.email_to:
+            enabled_notifications.append(('Email', partial(self.send_email, title, content, msg_type)))
+        if self.pushplus_token:
+            enabled_notifications.append(('PushPlus', partial(self.send_pushplus, title, content)))
+        if self.server_push_key:
+            enabled_notifications.append(('Server Push', partial(self.send_serverPush, title, content)))
+        if self.dingding_webhook:
+            enabled_notifications.append(('DingTalk', partial(self.send_dingtalk, title, content)))
+        if self.feishu_webhook:
+            enabled_notifications.append(('Feishu', partial(self.send_feishu, title, content)))
+        if self.weixin_webhook:
+            enabled_notifications.append(('WeChat Work', partial(self.send_wecom, title, content)))
 
         if not enabled_notifications:
             logger.warning('⚠️ 未配置任何通知渠道，无法发送通知')
@@ -210,15 +295,19 @@ class NotificationKit:
         success_count = 0
         failed_count = 0
 
-        for name, func in enabled_notifications:
-            try:
-                func()
-                logger.info(f'✅ [{name}]: 通知发送成功')
-                success_count += 1
-            except Exception as e:
-                error_msg = f'❌ [{name}]: 通知发送失败 - {str(e)}'
-                logger.error(error_msg)
-                failed_count += 1
+        # 各渠道相互独立且都在等待网络 I/O，并发发送，总耗时取决于最慢的渠道
+        with ThreadPoolExecutor(max_workers=len(enabled_notifications)) as executor:
+            futures = {executor.submit(func): name for name, func in enabled_notifications}
+            for future in as_completed(futures):
+                name = futures[future]
+                try:
+                    future.result()
+                    logger.info(f'✅ [{name}]: 通知发送成功')
+                    success_count += 1
+                except Exception as e:
+                    error_msg = f'❌ [{name}]: 通知发送失败 - {str(e)}'
+                    logger.error(error_msg)
+                    failed_count += 1
 
         # 记录总体通知结果
         if success_count == 0 and failed_count > 0:
@@ -231,3 +320,4 @@ class NotificationKit:
 
 
 notify = NotificationKit()
+atexit.register(notify.close)
@@ -17,6 +17,25 @@ SENSITIVE_KEYWORDS = [
 ]
 
 
+# 脱敏模式列表（模块加载时预编译，避免每次调用重复查找/编译正则）
+_SANITIZE_PATTERNS = [
+    # password=xxx, pwd=xxx (各种分隔符)
+    (re.compile(r'(password|passwd|pwd)\s*[=:]\s*["\']?([^"\'\s,;&]+)', re.IGNORECASE), r'\1=***'),
+
+    # token=xxx, api_key=xxx
+    (re.compile(r'(token|api_key|apikey|secret|key)\s*[=:]\s*["\']?([^"\'\s,;&]+)', re.IGNORECASE), r'\1=***'),
+
+    # cookie: name=value
+    (re.compile(r'(cookie[s]?)\s*[=:]\s*\{[^}]*\}', re.IGNORECASE), r'\1={sanitized}'),
+
+    # Authorization: Bearer xxx
+    (re.compile(r'(Authorization|Bearer)\s*[=:]\s*["\']?([^"\'\s,;&]+)', re.IGNORECASE), r'\1=***'),
+
+    # 环境变量格式 VAR=value
+    (re.compile(r'([A-Z_]+_(PASSWORD|TOKEN|SECRET|KEY))\s*=\s*["\']?([^"\'\s,;&]+)', re.IGNORECASE), r'\1=***'),
+]
+
+
 def sanitize_dict(data: dict, mask: str = "***") -> dict:
     """
     脱敏字典中的敏感信息
@@ -75,27 +94,9 @@ def sanitize_string(text: str, mask: str = "***") -> str:
     if not isinstance(text, str):
         return str(text)
 
-    # 脱敏模式列表
-    patterns = [
-        # password=xxx, pwd=xxx (各种分隔符)
-        (r'(password|passwd|pwd)\s*[=:]\s*["\']?([^"\'\s,;&]+)', r'\1=***'),
-
-        # token=xxx, api_key=xxx
-        (r'(token|api_key|apikey|secret|key)\s*[=:]\s*["\']?([^"\'\s,;&]+)', r'\1=***'),
-
-        # cookie: name=value
-        (r'(cookie[s]?)\s*[=:]\s*\{[^}]*\}', r'\1={sanitized}'),
-
-        # Authorization: Bearer xxx
-        (r'(Authorization|Bearer)\s*[=:]\s*["\']?([^"\'\s,;&]+)', r'\1=***'),
-
-        # 环境变量格式 VAR=value
-        (r'([A-Z_]+_(PASSWORD|TOKEN|SECRET|KEY))\s*=\s*["\']?([^"\'\s,;&]+)', r'\1=***'),
-    ]
-
     result = text
-    for pattern, replacement in patterns:
-        result = re.sub(pattern, replacement, result, flags=re.IGNORECASE)
+    for pattern, replacement in _SANITIZE_PATTERNS:
+        result = pattern.sub(replacement, result)
 
     return result
 
@@ -1,18 +1,142 @@
 """
 会话缓存模块 - 保存和恢复认证会话（支持加密）
+
+每个会话由两个文件组成：<provider>_<account>.json 保存明文元数据（过期时间、用户名等），
+同名 .bin 文件保存敏感数据的原始密文（无 base64 包装）。设置 SESSION_CACHE_KEY 后
+使用 AES-256-GCM 加密，读取时仍兼容旧版内嵌 encrypted_data 的 Fernet 与 XOR 格式。
 """
 
 import json
 import os
 import base64
+import hashlib
+import zlib
+from functools import lru_cache
 from pathlib import Path
-from typing import Dict, Optional, List, Any
+from typing import Dict, Optional, List, Any, Tuple
 from datetime import datetime, timedelta
 from cryptography.fernet import Fernet, InvalidToken
+from cryptography.hazmat.primitives.ciphers.aead import AESGCM
 from utils.logger import setup_logger
 
+try:
+    # orjson 为可选依赖（C 实现，序列化/解析更快，直接输出 UTF-8 字节），未安装时回退到标准库 json
+    import orjson
+
+    def _json_dumps(obj: Any, indent: bool = False) -> bytes:
+        """序列化为 UTF-8 字节（indent=True 时缩进 2 格，否则紧凑输出）"""
+        return orjson.dumps(obj, option=orjson.OPT_INDENT_2 if indent else 0)
+
+    _json_loads = orjson.loads
+except ImportError:
+
+    def _json_dumps(obj: Any, indent: bool = False) -> bytes:
+        """序列化为 UTF-8 字节（indent=True 时缩进 2 格，否则紧凑输出）"""
+        if indent:
+            return json.dumps(obj, ensure_ascii=False, indent=2).encode("utf-8")
+        return json.dumps(obj, ensure_ascii=False, separators=(",", ":")).encode("utf-8")
+
+    _json_loads = json.loads
+
+try:
+    # zstandard 为可选依赖：会话明文先压缩再加密（cookies 重复度高，压缩后加密和写盘的数据量都更小），
+    # 未安装时回退到标准库 zlib
+    import zstandard
+
+    _zstd_compressor = zstandard.ZstdCompressor(level=3)
+    _zstd_decompressor = zstandard.ZstdDecompressor()
+except ImportError:
+    zstandard = None
+
 logger = setup_logger(__name__)
 
+# 过期索引文件名：filename -> [expires_at, mtime_ns, size]，清理时无需逐个打开缓存文件
+INDEX_FILENAME = "_index.json"
+
+# 敏感数据密文文件后缀（与元数据 .json 同名）
+PAYLOAD_SUFFIX = ".bin"
+
+# 压缩格式标记（压缩数据的首字节；未压缩的 JSON 明文以 "{" 开头，不会冲突）
+PAYLOAD_ZLIB = b"\x01"
+PAYLOAD_ZSTD = b"\x02"
+
+# 旧版单文件格式中内嵌 AES-GCM 密文的前缀（仅用于读取；":" 不在 base64 字母表中，不会与 Fernet/XOR 旧格式混淆）
+AEAD_PREFIX = "v2:"
+AEAD_NONCE_SIZE = 12
+
+
+def _atomic_write(path: Path, data: bytes) -> None:
+    """原子写入文件：先写同目录临时文件再 os.replace 重命名
+
+    读者只会看到旧内容或完整的新内容；缓存可重建，因此不做 fsync。
+
+    Args:
+        path: 目标文件路径
+        data: 要写入的字节
+    """
+    tmp_path = path.with_name(f"{path.name}.{os.getpid()}.tmp")
+    try:
+        tmp_path.write_bytes(data)
+        os.replace(tmp_path, path)
+    except BaseException:
+        tmp_path.unlink(missing_ok=True)
+        raise
+
+
+def _compress_payload(data: bytes) -> bytes:
+    """压缩会话明文并加上格式标记（优先 zstd，否则 zlib）"""
+    if zstandard is not None:
+        return PAYLOAD_ZSTD + _zstd_compressor.compress(data)
+    return PAYLOAD_ZLIB + zlib.compress(data)
+
+
+def _decompress_payload(data: bytes) -> bytes:
+    """按格式标记解压会话明文（无标记时视为未压缩数据原样返回）"""
+    tag, body = data[:1], data[1:]
+    if tag == PAYLOAD_ZSTD:
+        if zstandard is None:
+            raise ValueError("会话数据使用 zstd 压缩，但未安装 zstandard")
+        return _zstd_decompressor.decompress(body)
+    if tag == PAYLOAD_ZLIB:
+        return zlib.decompress(body)
+    return data
+
+
+def _is_fernet_key(key: str) -> bool:
+    """是否已经是 Fernet 格式的密钥（44字符 base64 编码）"""
+    return len(key) == 44 and key.endswith("=")
+
+
+@lru_cache(maxsize=4)
+def _build_cipher(key: str) -> Fernet:
+    """按密钥构建 Fernet 实例（进程内按密钥缓存，多个 SessionCache 共享同一实例）
+
+    Args:
+        key: SESSION_CACHE_KEY 原始值
+
+    Returns:
+        Fernet 实例
+    """
+    if _is_fernet_key(key):
+        return Fernet(key.encode())
+    # 从旧的密钥生成 Fernet 密钥（向后兼容）：SHA256 哈希得到固定长度密钥后转为 Fernet 格式
+    key_hash = hashlib.sha256(key.encode()).digest()
+    return Fernet(base64.urlsafe_b64encode(key_hash))
+
+
+@lru_cache(maxsize=4)
+def _build_aead(key: str) -> AESGCM:
+    """按密钥构建 AES-256-GCM 实例（单次 AES-NI 加速的认证加密，无需额外的 HMAC 计算）
+
+    Args:
+        key: SESSION_CACHE_KEY 原始值
+
+    Returns:
+        AESGCM 实例
+    """
+    # 加上用途前缀再哈希，避免与旧 Fernet 派生出的密钥材料复用
+    return AESGCM(hashlib.sha256(b"session-cache-aesgcm:" + key.encode()).digest())
+
 
 class SessionCache:
     """会话缓存管理器（支持敏感数据加密）"""
@@ -25,10 +149,15 @@ class SessionCache:
         """
         self.cache_dir = Path(cache_dir)
         self.cache_dir.mkdir(parents=True, exist_ok=True)
+        self._index_path = self.cache_dir / INDEX_FILENAME
+        self._index: Dict[str, list] = self._load_index()
+        # 已解密会话的内存缓存：(account_name, provider) -> (元数据与密文文件签名, cache_data)
+        self._mem: Dict[Tuple[str, str], Tuple[tuple, Dict[str, Any]]] = {}
 
         # 尝试加载加密密钥
         self.encryption_key = os.getenv("SESSION_CACHE_KEY")
-        self.cipher = None
+        self.cipher = None  # Fernet，仅用于解密旧数据
+        self.aead = None
 
         if self.encryption_key:
             try:
@@ -46,56 +175,84 @@ class SessionCache:
                     )
 
                 # 确保密钥是有效的 Fernet 密钥（44字符 base64 编码）
-                if len(self.encryption_key) == 44 and self.encryption_key.endswith("="):
-                    # 已经是 Fernet 格式的密钥
-                    self.cipher = Fernet(self.encryption_key.encode())
-                    logger.info("✅ 会话缓存加密已启用（Fernet AES-128）")
+                if _is_fernet_key(self.encryption_key):
+                    self.cipher = _build_cipher(self.encryption_key)
+                    self.aead = _build_aead(self.encryption_key)
+                    logger.info("✅ 会话缓存加密已启用（AES-256-GCM）")
                 else:
-                    # 从旧的密钥生成 Fernet 密钥（向后兼容）
                     logger.warning("⚠️ 检测到旧格式密钥，正在转换为 Fernet 格式...")
-                    # 使用 SHA256 哈希生成固定长度的密钥，然后转为 Fernet 格式
-                    import hashlib
-
-                    key_hash = hashlib.sha256(self.encryption_key.encode()).digest()
-                    fernet_key = base64.urlsafe_b64encode(key_hash)
-                    self.cipher = Fernet(fernet_key)
-                    logger.info("✅ 会话缓存加密已启用（Fernet AES-128，已转换旧密钥）")
+                    self.cipher = _build_cipher(self.encryption_key)
+                    self.aead = _build_aead(self.encryption_key)
+                    logger.info("✅ 会话缓存加密已启用（AES-256-GCM，已转换旧密钥）")
             except Exception as e:
                 logger.error(f"❌ 初始化加密失败: {e}")
-                logger.warning("⚠️ 将使用 Base64 编码（不加密）")
+                logger.warning("⚠️ 会话数据将不加密存储")
                 self.cipher = None
+                self.aead = None
         else:
             logger.warning(
-                "⚠️ SESSION_CACHE_KEY 未设置，会话数据将使用Base64编码（建议设置环境变量启用加密）"
+                "⚠️ SESSION_CACHE_KEY 未设置，会话数据将不加密存储（建议设置环境变量启用加密）"
             )
             logger.info("💡 提示：运行以下命令生成 Fernet 密钥：")
             logger.info(
                 '   python -c "from cryptography.fernet import Fernet; print(Fernet.generate_key().decode())"'
             )
 
-    def _encrypt_data(self, data: str) -> str:
-        """加密敏感数据（使用 Fernet AES-128）
+    def _load_index(self) -> Dict[str, list]:
+        """读取过期索引（不存在或损坏时返回空字典，清理时会自动重建）"""
+        try:
+            with open(self._index_path, "rb") as f:
+                index = _json_loads(f.read())
+            return index if isinstance(index, dict) else {}
+        except FileNotFoundError:
+            return {}
+        except Exception as e:
+            logger.debug(f"⚠️ 读取缓存索引失败，将重建: {e}")
+            return {}
+
+    def _save_index(self) -> None:
+        """原子地重写过期索引（避免中途崩溃留下半个索引）"""
+        try:
+            _atomic_write(self._index_path, _json_dumps(self._index))
+        except Exception as e:
+            # 索引只是加速手段，写入失败不影响缓存本身
+            logger.debug(f"⚠️ 写入缓存索引失败: {e}")
+
+    def _seal(self, data: bytes) -> bytes:
+        """加密为原始字节（nonce + 密文 + 认证标签；未设置密钥时原样返回）
 
         Args:
-            data: 原始数据
+            data: 原始 UTF-8 字节
 
         Returns:
-            加密后的数据（Base64编码）
+            加密后的字节
         """
-        try:
-            if self.cipher:
-                # 使用 Fernet (AES-128) 加密
-                encrypted = self.cipher.encrypt(data.encode("utf-8"))
-                return encrypted.decode("utf-8")
-            else:
-                # 仅使用Base64编码（不是真正的加密，但至少不是明文）
-                return base64.b64encode(data.encode("utf-8")).decode("utf-8")
-        except Exception as e:
-            logger.error(f"❌ 数据加密失败: {e}")
-            raise
+        if self.aead:
+            nonce = os.urandom(AEAD_NONCE_SIZE)
+            return nonce + self.aead.encrypt(nonce, data, None)
+        # 未设置密钥：Base64 不提供任何保护，直接存储（数据已压缩，本身也不是可直接阅读的明文）
+        return data
+
+    def _unseal(self, blob: bytes) -> bytes:
+        """解密 _seal 生成的字节
+
+        Args:
+            blob: 加密后的字节
+
+        Returns:
+            原始 UTF-8 字节
+        """
+        if self.aead:
+            return self.aead.decrypt(
+                blob[:AEAD_NONCE_SIZE], blob[AEAD_NONCE_SIZE:], None
+            )
+        # 旧版本未设置密钥时写入的是 Base64；压缩标记和 JSON 的 "{" 都不在 base64 字母表中
+        if blob[:1] in (PAYLOAD_ZLIB, PAYLOAD_ZSTD, b"{"):
+            return blob
+        return base64.b64decode(blob)
 
     def _decrypt_data(self, encrypted_data: str) -> str:
-        """解密敏感数据（支持 Fernet 和旧 XOR 格式）
+        """解密旧版单文件格式内嵌的敏感数据（支持 v2: AES-GCM 以及旧 Fernet、XOR 格式）
 
         Args:
             encrypted_data: 加密的数据
@@ -103,20 +260,33 @@ class SessionCache:
         Returns:
             解密后的原始数据
         """
+        return self._decrypt_bytes(encrypted_data).decode("utf-8")
+
+    def _decrypt_bytes(self, encrypted_data: str) -> bytes:
+        """解密敏感数据并返回 UTF-8 字节（json.loads 可直接解析，省去一次解码）
+
+        Args:
+            encrypted_data: 加密的数据
+
+        Returns:
+            解密后的原始字节
+        """
         try:
-            if self.cipher:
+            if self.aead and encrypted_data.startswith(AEAD_PREFIX):
+                return self._unseal(
+                    base64.b64decode(encrypted_data[len(AEAD_PREFIX):])
+                )
+            elif self.cipher:
                 try:
-                    # 尝试使用 Fernet 解密
-                    decrypted = self.cipher.decrypt(encrypted_data.encode("utf-8"))
-                    return decrypted.decode("utf-8")
+                    # 尝试使用 Fernet 解密（密文为 ASCII，Fernet 可直接接受 str）
+                    return self.cipher.decrypt(encrypted_data)
                 except InvalidToken:
                     # Fernet 解密失败，尝试旧的 XOR 格式（向后兼容）
                     logger.debug("🔄 Fernet 解密失败，尝试 XOR 格式...")
-                    return self._decrypt_data_xor(encrypted_data)
+                    return self._decrypt_data_xor(encrypted_data).encode("utf-8")
             else:
                 # 仅Base64解码
-                decoded = base64.b64decode(encrypted_data.encode("utf-8"))
-                return decoded.decode("utf-8")
+                return base64.b64decode(encrypted_data)
         except Exception as e:
             logger.error(f"❌ 数据解密失败: {e}")
             raise
@@ -134,13 +304,15 @@ class SessionCache:
             if not self.encryption_key:
                 raise ValueError("No encryption key for XOR decryption")
 
-            decoded = base64.b64decode(encrypted_data.encode("utf-8"))
+            decoded = base64.b64decode(encrypted_data)
             key_bytes = self.encryption_key.encode("utf-8")
 
-            # XOR解密
-            decrypted = bytearray(len(decoded))
-            for i in range(len(decoded)):
-                decrypted[i] = decoded[i] ^ key_bytes[i % len(key_bytes)]
+            # XOR解密：把密钥平铺到数据长度后按大整数整体异或（在 C 层完成，不逐字节循环）
+            size = len(decoded)
+            key_stream = (key_bytes * (size // len(key_bytes) + 1))[:size]
+            decrypted = (
+                int.from_bytes(decoded, "big") ^ int.from_bytes(key_stream, "big")
+            ).to_bytes(size, "big")
 
             result = decrypted.decode("utf-8")
             logger.info(
@@ -164,6 +336,16 @@ class SessionCache:
         safe_filename = f"{provider}_{account_name}.json"
         return self.cache_dir / safe_filename
 
+    @staticmethod
+    def _get_payload_file_path(cache_file: Path) -> Path:
+        """获取元数据文件对应的密文文件路径"""
+        return cache_file.with_suffix(PAYLOAD_SUFFIX)
+
+    @staticmethod
+    def _file_sig(st: os.stat_result) -> Tuple[int, int, int]:
+        """文件签名：原子写入总是替换为新的 inode，同一 mtime 精度内的同尺寸改写也能识别"""
+        return st.st_mtime_ns, st.st_size, st.st_ino
+
     def save(
         self,
         account_name: str,
@@ -172,8 +354,9 @@ class SessionCache:
         user_id: Optional[str] = None,
         username: Optional[str] = None,
         expiry_hours: int = 24,
+        origins: Optional[List[Dict]] = None,
     ) -> bool:
-        """保存会话数据（敏感数据使用 Fernet AES-128 加密）
+        """保存会话数据（敏感数据使用 AES-256-GCM 加密）
 
         Args:
             account_name: 账号名称
@@ -182,23 +365,29 @@ class SessionCache:
             user_id: 用户ID
             username: 用户名
             expiry_hours: 过期时间（小时）
+            origins: Playwright storage_state 中的 localStorage 数据（可选）
 
         Returns:
             是否保存成功
         """
+        self._mem.pop((account_name, provider), None)
         try:
             cache_file = self._get_cache_file_path(account_name, provider)
 
             # 将敏感数据序列化并加密
             sensitive_data = {"cookies": cookies, "user_id": user_id}
-            encrypted_data = self._encrypt_data(
-                json.dumps(sensitive_data, ensure_ascii=False)
+            if origins:
+                sensitive_data["origins"] = origins
+            # 紧凑输出并压缩后再加密；密文以原始字节单独写入 .bin，省去 base64 编解码
+            # 先写密文再写元数据，元数据文件存在即表示该会话完整可用
+            _atomic_write(
+                self._get_payload_file_path(cache_file),
+                self._seal(_compress_payload(_json_dumps(sensitive_data))),
             )
 
             cache_data = {
                 "account_name": account_name,
                 "provider": provider,
-                "encrypted_data": encrypted_data,  # 加密的敏感数据
                 "username": username,  # 用户名可以不加密（用于日志显示）
                 "created_at": datetime.now().isoformat(),
                 "expires_at": (
@@ -206,12 +395,20 @@ class SessionCache:
                 ).isoformat(),
             }
 
-            with open(cache_file, "w", encoding="utf-8") as f:
-                json.dump(cache_data, f, indent=2, ensure_ascii=False)
+            _atomic_write(cache_file, _json_dumps(cache_data, indent=True))
 
-            encryption_method = "Fernet AES-128" if self.cipher else "Base64"
+            # 记录文件的 mtime/size，清理时据此判断索引项是否仍与文件一致
+            st = cache_file.stat()
+            self._index[cache_file.name] = [
+                cache_data["expires_at"],
+                st.st_mtime_ns,
+                st.st_size,
+            ]
+            self._save_index()
+
+            encryption_method = "AES-256-GCM 加密" if self.aead else "未加密"
             logger.info(
-                f"✅ 会话缓存已保存（{encryption_method} 加密）: {account_name} ({provider})"
+                f"✅ 会话缓存已保存（{encryption_method}）: {account_name} ({provider})"
             )
             return True
 
@@ -229,15 +426,35 @@ class SessionCache:
         Returns:
             会话数据字典，如果不存在或已过期则返回None
         """
+        key = (account_name, provider)
         try:
             cache_file = self._get_cache_file_path(account_name, provider)
 
-            if not cache_file.exists():
+            try:
+                st = cache_file.stat()
+            except FileNotFoundError:
+                self._mem.pop(key, None)
                 logger.info(f"ℹ️ 未找到会话缓存: {account_name} ({provider})")
                 return None
 
-            with open(cache_file, "r", encoding="utf-8") as f:
-                cache_data = json.load(f)
+            # 元数据和密文文件都未被改写（包括其他 SessionCache 实例）且未过期时直接返回内存中的解密结果，
+            # 只需两次 stat，省去读取、解析和解密
+            payload_file = self._get_payload_file_path(cache_file)
+            try:
+                payload_sig = self._file_sig(payload_file.stat())
+            except FileNotFoundError:
+                payload_sig = None
+            file_sig = (self._file_sig(st), payload_sig)
+            hit = self._mem.get(key)
+            if (
+                hit
+                and hit[0] == file_sig
+                and datetime.now() <= datetime.fromisoformat(hit[1]["expires_at"])
+            ):
+                return dict(hit[1])
+
+            with open(cache_file, "rb") as f:
+                cache_data = _json_loads(f.read())
 
             # 检查是否过期
             expires_at = datetime.fromisoformat(cache_data["expires_at"])
@@ -247,15 +464,20 @@ class SessionCache:
                 return None
 
             # 解密敏感数据
-            if "encrypted_data" in cache_data:
-                # 新格式：使用加密
-                encrypted_data = cache_data["encrypted_data"]
-                decrypted_json = self._decrypt_data(encrypted_data)
-                sensitive_data = json.loads(decrypted_json)
+            if "encrypted_data" in cache_data or payload_sig is not None:
+                if "encrypted_data" in cache_data:
+                    # 旧版单文件格式：密文以 base64 字符串内嵌在 JSON 中
+                    payload = self._decrypt_bytes(cache_data.pop("encrypted_data"))
+                else:
+                    payload = _decompress_payload(
+                        self._unseal(payload_file.read_bytes())
+                    )
+                sensitive_data = _json_loads(payload)
 
                 # 合并解密的数据
                 cache_data["cookies"] = sensitive_data.get("cookies", [])
                 cache_data["user_id"] = sensitive_data.get("user_id")
+                cache_data["origins"] = sensitive_data.get("origins", [])
                 logger.info(
                     f"✅ 会话缓存加载成功（已解密）: {account_name} ({provider})"
                 )
@@ -266,7 +488,8 @@ class SessionCache:
                 )
                 logger.info(f"💡 建议重新登录以使用加密缓存")
 
-            return cache_data
+            self._mem[key] = (file_sig, cache_data)
+            return dict(cache_data)
 
         except json.JSONDecodeError as e:
             logger.error(f"❌ 缓存文件JSON格式错误: {e}")
@@ -276,6 +499,29 @@ class SessionCache:
             logger.error(f"❌ 加载会话缓存失败: {e}")
             return None
 
+    def load_storage_state(
+        self, account_name: str, provider: str
+    ) -> Optional[Dict[str, Any]]:
+        """加载缓存会话并转换为 Playwright storage_state 格式
+
+        Args:
+            account_name: 账号名称
+            provider: 提供商名称
+
+        Returns:
+            {"cookies": [...], "origins": [...]}，无可用缓存时返回None
+        """
+        cache_data = self.load(account_name, provider)
+        if not cache_data:
+            return None
+
+        cookies = cache_data.get("cookies")
+        # 仅 Playwright 格式的 cookies 列表可直接用于 storage_state
+        if not isinstance(cookies, list) or not cookies:
+            return None
+
+        return {"cookies": cookies, "origins": cache_data.get("origins") or []}
+
     def delete(self, account_name: str, provider: str) -> bool:
         """删除会话缓存
 
@@ -286,9 +532,14 @@ class SessionCache:
         Returns:
             是否删除成功
         """
+        self._mem.pop((account_name, provider), None)
         try:
             cache_file = self._get_cache_file_path(account_name, provider)
 
+            if self._index.pop(cache_file.name, None) is not None:
+                self._save_index()
+            self._get_payload_file_path(cache_file).unlink(missing_ok=True)
+
             if cache_file.exists():
                 cache_file.unlink()
                 logger.info(f"🗑️ 会话缓存已删除: {account_name} ({provider})")
@@ -309,9 +560,19 @@ class SessionCache:
         try:
             count = 0
             for cache_file in self.cache_dir.glob("*.json"):
+                if cache_file.name == INDEX_FILENAME:
+                    continue
                 cache_file.unlink()
+                self._get_payload_file_path(cache_file).unlink(missing_ok=True)
                 count += 1
 
+            for payload_file in self.cache_dir.glob(f"*{PAYLOAD_SUFFIX}"):
+                payload_file.unlink()
+
+            self._index = {}
+            self._index_path.unlink(missing_ok=True)
+            self._mem.clear()
+
             logger.info(f"🗑️ 已清空所有缓存，共删除 {count} 个文件")
             return count
 
@@ -322,26 +583,45 @@ class SessionCache:
     def cleanup_expired(self) -> int:
         """清理已过期的缓存
 
+        过期时间优先从索引读取；仅当文件不在索引中（索引缺失、旧版本写入）
+        或 mtime/size 与索引记录不一致（被外部改写、其他实例写入）时才打开解析。
+
         Returns:
             删除的缓存文件数量
         """
         try:
             count = 0
-            for cache_file in self.cache_dir.glob("*.json"):
-                try:
-                    with open(cache_file, "r", encoding="utf-8") as f:
-                        cache_data = json.load(f)
-
-                    expires_at = datetime.fromisoformat(cache_data["expires_at"])
-                    if datetime.now() > expires_at:
-                        cache_file.unlink()
+            now = datetime.now()
+            index: Dict[str, list] = {}
+            with os.scandir(self.cache_dir) as entries:
+                for entry in entries:
+                    if not entry.name.endswith(".json") or entry.name == INDEX_FILENAME:
+                        continue
+                    try:
+                        st = entry.stat()
+                        cached = self._index.get(entry.name)
+                        if cached and cached[1:] == [st.st_mtime_ns, st.st_size]:
+                            expires_at = cached[0]
+                        else:
+                            with open(entry.path, "rb") as f:
+                                expires_at = _json_loads(f.read())["expires_at"]
+
+                        if now > datetime.fromisoformat(expires_at):
+                            self._remove_cache_files(entry.path)
+                            count += 1
+                            logger.info(f"🗑️ 已删除过期缓存: {entry.name}")
+                        else:
+                            index[entry.name] = [expires_at, st.st_mtime_ns, st.st_size]
+
+                    except Exception:
+                        # 如果读取失败，也删除该缓存文件
+                        self._remove_cache_files(entry.path)
                         count += 1
-                        logger.info(f"🗑️ 已删除过期缓存: {cache_file.name}")
 
-                except Exception:
-                    # 如果读取失败，也删除该缓存文件
-                    cache_file.unlink()
-                    count += 1
+            # 以本次扫描结果重建索引，顺带剔除已被外部删除的文件
+            if index != self._index:
+                self._index = index
+                self._save_index()
 
             if count > 0:
                 logger.info(f"🗑️ 已清理 {count} 个过期缓存")
@@ -352,6 +632,11 @@ class SessionCache:
             logger.error(f"❌ 清理过期缓存失败: {e}")
             return 0
 
+    def _remove_cache_files(self, cache_path: str) -> None:
+        """删除元数据文件及其密文文件"""
+        os.unlink(cache_path)
+        self._get_payload_file_path(Path(cache_path)).unlink(missing_ok=True)
+
     def check_cache_permissions(self) -> bool:
         """检查缓存目录和文件权限是否安全
 
@@ -380,8 +665,10 @@ class SessionCache:
                 )
                 return False
 
-            # 检查每个缓存文件的权限
-            for cache_file in self.cache_dir.glob("*.json"):
+            # 检查每个缓存文件（元数据、密文、索引）的权限
+            for cache_file in self.cache_dir.iterdir():
+                if not cache_file.is_file():
+                    continue
                 file_stat = cache_file.stat()
                 file_mode = file_stat.st_mode
                 if file_mode & stat.S_IROTH or file_mode & stat.S_IWOTH:
@@ -6,24 +6,73 @@
 
 import asyncio
 import base64
+import hashlib
+import heapq
 import json
+import os
 import random
 import time
+from collections import Counter
+from functools import lru_cache
 from typing import List, Dict, Optional, Any
-from urllib.parse import urlparse, parse_qs, unquote
+from urllib.parse import urlparse, parse_qs, quote, unquote
 import re
 
 import httpx
 import yaml
 
+try:
+    # libyaml 的 C 实现解析速度比纯 Python 解析器快一个数量级，PyYAML 未链接 libyaml 时回退
+    from yaml import CSafeLoader as _YamlSafeLoader
+except ImportError:
+    from yaml import SafeLoader as _YamlSafeLoader
+
+try:
+    # yarl 的 URL 解析由 C 扩展实现，大量 URI 的 Base64 订阅解析更快；未安装时回退到 urlparse
+    from yarl import URL as _YarlURL
+except ImportError:
+    _YarlURL = None
+
 from utils.logger import setup_logger
 
 logger = setup_logger(__name__)
 
+# Playwright 支持的代理类型
+_SUPPORTED_TYPES = frozenset({"http", "https", "socks5"})
+
+
+@lru_cache(maxsize=1024)
+def _split_proxy_uri(uri: str) -> tuple:
+    """
+    拆分代理 URI（结果已缓存，定期刷新订阅时大部分 URI 不变，无需重复解析）
+
+    Returns:
+        (scheme, host, port, username, password, fragment)，用户名、密码和 fragment 已解码
+    """
+    if _YarlURL is not None:
+        url = _YarlURL(uri)
+        return url.scheme, url.host, url.port, url.user, url.password, url.fragment
+
+    parsed = urlparse(uri)
+    return (
+        parsed.scheme,
+        parsed.hostname,
+        parsed.port,
+        unquote(parsed.username) if parsed.username else None,
+        unquote(parsed.password) if parsed.password else None,
+        unquote(parsed.fragment),
+    )
+
 
 class ProxyNode:
     """代理节点数据类"""
 
+    # 大型订阅可能包含上万个节点，使用 __slots__ 省去每个实例的 __dict__
+    __slots__ = (
+        "name", "type", "server", "port", "username", "password", "extra",
+        "proxy_url", "is_preferred", "latency", "last_test_time",
+    )
+
     def __init__(
         self,
         name: str,
@@ -41,6 +90,13 @@ class ProxyNode:
         self.username = username
         self.password = password
         self.extra = kwargs
+        # 带认证信息的代理 URL（供 httpx 测速使用），创建时构建一次；用户名密码需百分号编码
+        if username and password:
+            self.proxy_url = f"{self.type}://{quote(username, safe='')}:{quote(password, safe='')}@{server}:{port}"
+        else:
+            self.proxy_url = f"{self.type}://{server}:{port}"
+        # 是否属于港澳台优先地区（名称不变，创建时判断一次，选择节点时直接复用）
+        self.is_preferred = NodeSelector.is_preferred_region(name)
         self.latency = None  # 延迟（毫秒）
         self.last_test_time = None  # 最后测试时间
 
@@ -61,25 +117,52 @@ class ProxyNode:
         return f"<ProxyNode {self.name} [{self.type}] {self.server}:{self.port} {latency_str}>"
 
 
+class SubscriptionNotModified(Exception):
+    """订阅内容未变化（服务器返回 304）"""
+
+
 class SubscriptionParser:
     """订阅解析器 - 支持多种格式"""
 
+    # 支持的代理 URI 协议（HTTP/HTTPS/SOCKS5）
+    _SCHEME_RE = re.compile(r'(?:https?|socks5)://', re.IGNORECASE)
+
     def __init__(self):
         self.timeout = 10  # HTTP请求超时
+        # 每个订阅的缓存校验头（ETag / Last-Modified）与上次解析结果
+        self._validators: Dict[str, Dict[str, str]] = {}
+        self._parsed_nodes: Dict[str, List[ProxyNode]] = {}
 
     async def fetch_subscription(self, url: str) -> str:
-        """获取订阅内容"""
+        """
+        获取订阅内容（已有解析结果时发送条件请求）
+
+        Raises:
+            SubscriptionNotModified: 服务器返回 304，订阅内容未变化
+        """
         try:
             logger.info(f"📡 正在获取订阅: {url[:50]}...")
 
+            headers = self._validators.get(url, {}) if url in self._parsed_nodes else {}
             async with httpx.AsyncClient(timeout=self.timeout, follow_redirects=True) as client:
-                response = await client.get(url)
+                response = await client.get(url, headers=headers)
+                if response.status_code == 304:
+                    raise SubscriptionNotModified(url)
                 response.raise_for_status()
 
+            validators = {}
+            if response.headers.get("etag"):
+                validators["If-None-Match"] = response.headers["etag"]
+            if response.headers.get("last-modified"):
+                validators["If-Modified-Since"] = response.headers["last-modified"]
+            self._validators[url] = validators
+
             content = response.text
             logger.info(f"✅ 订阅获取成功，内容长度: {len(content)} 字符")
             return content
 
+        except SubscriptionNotModified:
+            raise
         except Exception as e:
             logger.error(f"❌ 获取订阅失败: {e}")
             raise
@@ -91,10 +174,19 @@ class SubscriptionParser:
         Returns:
             List[ProxyNode]: 解析出的代理节点列表（仅HTTP/SOCKS5）
         """
-        content = await self.fetch_subscription(subscription_url)
+        try:
+            content = await self.fetch_subscription(subscription_url)
+        except SubscriptionNotModified:
+            nodes = self._parsed_nodes[subscription_url]
+            # 只跳过重新解析；清空旧测速结果，延迟仍按 cache_duration 重新测量
+            for node in nodes:
+                node.latency = None
+                node.last_test_time = None
+            logger.info(f"✅ 订阅未变化，复用上次解析结果（{len(nodes)} 个节点）")
+            return nodes
 
         # 添加诊断日志：显示订阅内容前200字符
-        logger.debug(f"📄 订阅内容预览: {content[:200]}")
+        logger.debug("📄 订阅内容预览: %.200s", content)
 
         # 尝试不同的解析方法
         parsers = [
@@ -105,9 +197,11 @@ class SubscriptionParser:
 
         for parser_name, parser_func in parsers:
             try:
-                nodes = parser_func(content)
+                # 解析是 CPU 密集的同步操作，放到线程中执行，避免阻塞事件循环上的其他任务
+                nodes = await asyncio.to_thread(parser_func, content)
                 if nodes:
                     logger.info(f"✅ 使用 {parser_name} 格式解析成功，找到 {len(nodes)} 个可用节点")
+                    self._parsed_nodes[subscription_url] = nodes
                     return nodes
                 else:
                     logger.warning(f"⚠️ {parser_name} 解析成功但未找到HTTP/SOCKS5节点")
@@ -121,7 +215,7 @@ class SubscriptionParser:
     def _parse_clash(self, content: str) -> List[ProxyNode]:
         """解析 Clash YAML 格式"""
         try:
-            config = yaml.safe_load(content)
+            config = yaml.load(content, Loader=_YamlSafeLoader)
 
             if not config:
                 logger.warning("❌ YAML解析结果为空")
@@ -135,14 +229,12 @@ class SubscriptionParser:
             logger.info(f"📊 订阅解析成功，找到 {total_proxies} 个代理节点")
 
             nodes = []
-            type_counts = {}
-            for proxy in config["proxies"]:
-                # 统计节点类型
-                proxy_type = proxy.get("type", "").lower()
-                type_counts[proxy_type] = type_counts.get(proxy_type, 0) + 1
-
+            types = [proxy.get("type", "").lower() for proxy in config["proxies"]]
+            # 统计节点类型
+            type_counts = dict(Counter(types))
+            for proxy, proxy_type in zip(config["proxies"], types):
                 # 只提取 HTTP 和 SOCKS5 节点
-                if proxy_type in ["http", "https", "socks5"]:
+                if proxy_type in _SUPPORTED_TYPES:
                     node = ProxyNode(
                         name=proxy.get("name", "Unknown"),
                         type=proxy_type,
@@ -154,7 +246,7 @@ class SubscriptionParser:
                         skip_cert_verify=proxy.get("skip-cert-verify", False)
                     )
                     nodes.append(node)
-                    logger.debug(f"  ✅ 解析节点: {node.name} ({node.type})")
+                    logger.debug("  ✅ 解析节点: %s (%s)", node.name, node.type)
 
             # 显示节点类型统计（使用 WARNING 级别以便在日志中可见）
             logger.warning(f"📊 节点类型分布: {type_counts}")
@@ -178,33 +270,32 @@ class SubscriptionParser:
     def _parse_v2ray_base64(self, content: str) -> List[ProxyNode]:
         """解析 V2Ray Base64 格式（通用订阅）"""
         try:
-            # 尝试 Base64 解码
-            decoded = base64.b64decode(content).decode('utf-8')
-            lines = decoded.strip().split('\n')
+            # 尝试 Base64 解码；直接在字节层按行切分，逐行解码，不生成整段解码后的字符串
+            decoded = base64.b64decode(content)
 
             nodes = []
-            for line in lines:
+            for line in decoded.split(b'\n'):
                 line = line.strip()
                 if not line:
                     continue
 
                 # 尝试解析各种 URI 格式
-                node = self._parse_single_uri(line)
+                node = self._parse_single_uri(line.decode('utf-8'))
                 if node:
                     nodes.append(node)
 
             return nodes
 
         except Exception as e:
-            logger.debug(f"V2Ray Base64 解析失败: {e}")
+            logger.debug("V2Ray Base64 解析失败: %s", e)
             return []
 
     def _parse_sip002_uri(self, content: str) -> List[ProxyNode]:
         """解析 SIP002 URI 格式（单行或多行）"""
-        lines = content.strip().split('\n')
         nodes = []
 
-        for line in lines:
+        # splitlines 同时处理 CRLF/CR 换行，无需先对整段内容 strip
+        for line in content.splitlines():
             line = line.strip()
             if not line:
                 continue
@@ -225,28 +316,28 @@ class SubscriptionParser:
         """
         try:
             # 匹配 HTTP/HTTPS/SOCKS5 URI
-            if not any(uri.startswith(prefix) for prefix in ["http://", "https://", "socks5://"]):
+            if not self._SCHEME_RE.match(uri):
                 return None
 
-            parsed = urlparse(uri)
+            scheme, host, port, username, password, fragment = _split_proxy_uri(uri)
 
             # 提取节点名称（从 fragment 或生成默认名称）
-            name = unquote(parsed.fragment) if parsed.fragment else f"{parsed.hostname}:{parsed.port}"
+            name = fragment or f"{host}:{port}"
 
             node = ProxyNode(
                 name=name,
-                type=parsed.scheme,
-                server=parsed.hostname,
-                port=parsed.port,
-                username=unquote(parsed.username) if parsed.username else None,
-                password=unquote(parsed.password) if parsed.password else None,
+                type=scheme,
+                server=host,
+                port=port,
+                username=username or None,
+                password=password or None,
             )
 
-            logger.debug(f"  ✅ 解析 URI: {node.name}")
+            logger.debug("  ✅ 解析 URI: %s", node.name)
             return node
 
         except Exception as e:
-            logger.debug(f"URI 解析失败 ({uri[:50]}...): {e}")
+            logger.debug("URI 解析失败 (%.50s...): %s", uri, e)
             return None
 
 
@@ -262,48 +353,117 @@ class NodeSpeedTester:
         self.test_url = test_url
         self.timeout = timeout
 
-    async def test_node(self, node: ProxyNode) -> bool:
+    def _get_client(self, proxy_url: str, clients: Dict[str, httpx.AsyncClient]) -> httpx.AsyncClient:
+        """获取指定代理的共享客户端（同一代理的多个节点复用连接池）"""
+        client = clients.get(proxy_url)
+        if client is None:
+            client = httpx.AsyncClient(proxy=proxy_url, timeout=self.timeout, follow_redirects=True)
+            clients[proxy_url] = client
+        return client
+
+    @staticmethod
+    async def _close_clients(clients: Dict[str, httpx.AsyncClient]) -> None:
+        """关闭所有共享客户端"""
+        await asyncio.gather(*(client.aclose() for client in clients.values()), return_exceptions=True)
+        clients.clear()
+
+    async def test_node(self, node: ProxyNode, clients: Optional[Dict[str, httpx.AsyncClient]] = None) -> bool:
         """
         测试单个节点延迟
 
+        Args:
+            node: 待测试的节点
+            clients: 按代理 URL 共享的客户端（由 test_all_nodes 传入；为空时使用临时客户端）
+
         Returns:
             bool: 测试是否成功
         """
-        try:
-            proxy_config = node.to_playwright_proxy()
-            proxy_url = proxy_config["server"]
+        if clients is None:
+            clients = {}
+            try:
+                return await self.test_node(node, clients)
+            finally:
+                await self._close_clients(clients)
 
-            # 构建代理认证 URL
-            if node.username and node.password:
-                parsed = urlparse(proxy_url)
-                proxy_url = f"{parsed.scheme}://{node.username}:{node.password}@{parsed.netloc}"
+        try:
+            client = self._get_client(node.proxy_url, clients)
 
             start_time = time.time()
 
-            async with httpx.AsyncClient(
-                proxies={"http://": proxy_url, "https://": proxy_url},
-                timeout=self.timeout,
-                follow_redirects=True
-            ) as client:
-                response = await client.get(self.test_url)
-                response.raise_for_status()
+            response = await client.get(self.test_url)
+            response.raise_for_status()
 
             latency = int((time.time() - start_time) * 1000)  # 转换为毫秒
             node.latency = latency
             node.last_test_time = time.time()
 
-            logger.debug(f"  ✅ {node.name}: {latency}ms")
+            logger.debug("  ✅ %s: %sms", node.name, latency)
             return True
 
         except asyncio.TimeoutError:
-            logger.debug(f"  ⏱️ {node.name}: 超时")
+            logger.debug("  ⏱️ %s: 超时", node.name)
             node.latency = 9999  # 设置一个很大的值表示超时
             return False
         except Exception as e:
-            logger.debug(f"  ❌ {node.name}: {str(e)[:50]}")
+            logger.debug("  ❌ %s: %.50s", node.name, e)
             node.latency = 9999
             return False
 
+    async def test_node_tcp(self, node: ProxyNode) -> Optional[int]:
+        """
+        TCP 连接探测：只测量与代理服务器建立 TCP 连接的耗时（不经过代理发起 HTTP 请求）
+
+        Args:
+            node: 待探测的节点
+
+        Returns:
+            int: 连接耗时（毫秒）；无法连接或超时时返回 None
+        """
+        start_time = time.perf_counter()
+        try:
+            _, writer = await asyncio.wait_for(
+                asyncio.open_connection(node.server, node.port), timeout=self.timeout
+            )
+        except (OSError, asyncio.TimeoutError) as e:
+            logger.debug("  🔌 %s: TCP 连接失败 %.50s", node.name, e)
+            return None
+
+        latency = int((time.perf_counter() - start_time) * 1000)
+        writer.close()
+        try:
+            await writer.wait_closed()
+        except OSError:
+            pass
+        return latency
+
+    async def prescreen_tcp(self, nodes: List[ProxyNode], keep: int, max_concurrent: int = 20) -> List[ProxyNode]:
+        """
+        TCP 连接预筛：并发探测所有节点，只保留可连接且最快的 keep 个节点
+
+        TCP 探测无需 TLS 握手和代理隧道，开销远小于完整 HTTP 测速；
+        但端口可达不代表代理可用，预筛结果仍需经过 HTTP 测速确认
+
+        Args:
+            nodes: 待探测的节点列表
+            keep: 保留的候选节点数量
+            max_concurrent: 最大并发数
+
+        Returns:
+            List[ProxyNode]: 按 TCP 连接耗时排序的候选节点
+        """
+        semaphore = asyncio.Semaphore(max_concurrent)
+
+        async def probe_with_semaphore(node):
+            async with semaphore:
+                return await self.test_node_tcp(node)
+
+        latencies = await asyncio.gather(*[probe_with_semaphore(node) for node in nodes])
+        reachable = [(latency, i) for i, latency in enumerate(latencies) if latency is not None]
+        best = heapq.nsmallest(keep, reachable)
+
+        logger.info(f"🔌 TCP 预筛完成，可连接节点: {len(reachable)}/{len(nodes)}，选取 {len(best)} 个进行 HTTP 测速")
+        return [nodes[i] for _, i in best]
+
     async def test_all_nodes(self, nodes: List[ProxyNode], max_concurrent: int = 5) -> List[ProxyNode]:
         """
         并发测试所有节点
@@ -318,25 +478,88 @@ class NodeSpeedTester:
         logger.info(f"🔍 开始测速 {len(nodes)} 个节点（并发数: {max_concurrent}）...")
 
         semaphore = asyncio.Semaphore(max_concurrent)
+        # 同一代理 URL 的节点共用一个客户端，避免每个节点都新建连接池
+        clients: Dict[str, httpx.AsyncClient] = {}
 
         async def test_with_semaphore(node):
             async with semaphore:
-                return await self.test_node(node)
+                return await self.test_node(node, clients)
 
         # 并发测试
-        await asyncio.gather(*[test_with_semaphore(node) for node in nodes])
+        try:
+            await asyncio.gather(*[test_with_semaphore(node) for node in nodes])
+        finally:
+            await self._close_clients(clients)
+
+        return self._sort_and_report(nodes)
+
+    async def test_until(
+        self,
+        nodes: List[ProxyNode],
+        want: int,
+        latency_threshold: int = 500,
+        max_concurrent: int = 5,
+    ) -> List[ProxyNode]:
+        """
+        并发测速，找到足够多的快速节点后提前结束（取消其余测速）
+
+        Args:
+            nodes: 待测试的节点列表
+            want: 需要的快速节点数量
+            latency_threshold: 视为快速节点的延迟上限（毫秒）
+            max_concurrent: 最大并发数
 
+        Returns:
+            List[ProxyNode]: 节点列表（按延迟排序，未测速的节点排在最后）
+        """
+        logger.info(
+            f"🔍 开始测速 {len(nodes)} 个节点（并发数: {max_concurrent}，"
+            f"找到 {want} 个 {latency_threshold}ms 内的节点即停止）..."
+        )
+
+        semaphore = asyncio.Semaphore(max_concurrent)
+        clients: Dict[str, httpx.AsyncClient] = {}
+
+        async def test_with_semaphore(node):
+            async with semaphore:
+                return node if await self.test_node(node, clients) else None
+
+        tasks = [asyncio.ensure_future(test_with_semaphore(node)) for node in nodes]
+        fast_count = 0
+        try:
+            for next_done in asyncio.as_completed(tasks):
+                node = await next_done
+                if node and node.latency < latency_threshold:
+                    fast_count += 1
+                    if fast_count >= want:
+                        break
+        finally:
+            # 取消尚未完成的测速（被取消的节点保持未测速状态）
+            for task in tasks:
+                task.cancel()
+            await asyncio.gather(*tasks, return_exceptions=True)
+            await self._close_clients(clients)
+
+        if fast_count >= want:
+            tested = sum(1 for n in nodes if n.latency)
+            logger.info(f"⚡ 已找到 {fast_count} 个快速节点，提前结束测速（已测 {tested}/{len(nodes)}）")
+
+        return self._sort_and_report(nodes)
+
+    @staticmethod
+    def _sort_and_report(nodes: List[ProxyNode]) -> List[ProxyNode]:
+        """按延迟排序并输出测速统计"""
         # 按延迟排序（超时的节点排在最后）
         nodes.sort(key=lambda n: n.latency if n.latency else 9999)
 
-        # 统计可用节点
-        available_nodes = [n for n in nodes if n.latency and n.latency < 9999]
-        logger.info(f"✅ 测速完成，可用节点: {len(available_nodes)}/{len(nodes)}")
+        # 统计可用节点（已排序，可用节点都在列表前部）
+        available_count = sum(1 for n in nodes if n.latency and n.latency < 9999)
+        logger.info(f"✅ 测速完成，可用节点: {available_count}/{len(nodes)}")
 
         # 显示前5个最快节点
-        if available_nodes:
+        if available_count:
             logger.info("📊 最快的节点：")
-            for i, node in enumerate(available_nodes[:5], 1):
+            for i, node in enumerate(nodes[:min(5, available_count)], 1):
                 logger.info(f"   {i}. {node.name}: {node.latency}ms")
 
         return nodes
@@ -354,6 +577,8 @@ class NodeSelector:
         # 台湾
         r'台[湾灣]|taiwan|\btw\b'
     ]
+    # 合并为一个预编译的正则，一次扫描完成判断（IGNORECASE 代替逐次 lower()）
+    _PREFERRED_RE = re.compile('|'.join(PREFERRED_REGIONS), re.IGNORECASE)
 
     @staticmethod
     def is_preferred_region(node_name: str) -> bool:
@@ -366,11 +591,7 @@ class NodeSelector:
         Returns:
             bool: 是否属于港澳台地区
         """
-        node_name_lower = node_name.lower()
-        for pattern in NodeSelector.PREFERRED_REGIONS:
-            if re.search(pattern, node_name_lower):
-                return True
-        return False
+        return NodeSelector._PREFERRED_RE.search(node_name) is not None
 
     @staticmethod
     def select_fastest(nodes: List[ProxyNode], top_n: int = 1) -> Optional[ProxyNode]:
@@ -396,25 +617,19 @@ class NodeSelector:
 
         # 为港澳台节点计算优先级排序分数（延迟 - 50ms bonus）
         def get_sort_score(node: ProxyNode) -> int:
-            base_latency = node.latency or 9999
-            # 港澳台节点给予50ms的优先级bonus
-            if NodeSelector.is_preferred_region(node.name):
-                return max(0, base_latency - 50)
-            return base_latency
+            return max(0, node.latency - 50) if node.is_preferred else node.latency
 
-        # 按优先级分数排序
-        available_sorted = sorted(available, key=get_sort_score)
+        # 只需要分数最低的 top_n 个节点，用堆选出，无需整体排序
+        candidates = heapq.nsmallest(top_n, available, key=get_sort_score)
 
         # 统计港澳台节点数量
-        preferred_count = sum(1 for n in available_sorted[:top_n] if NodeSelector.is_preferred_region(n.name))
+        preferred_count = sum(1 for n in candidates if n.is_preferred)
         if preferred_count > 0:
             logger.info(f"🌏 前{top_n}个候选节点中包含 {preferred_count} 个港澳台节点")
 
-        # 从最快的 top_n 个节点中随机选择
-        candidates = available_sorted[:min(top_n, len(available_sorted))]
         selected = random.choice(candidates)
 
-        region_tag = "🌏 港澳台" if NodeSelector.is_preferred_region(selected.name) else ""
+        region_tag = "🌏 港澳台" if selected.is_preferred else ""
         logger.info(f"✅ 自动选择节点: {selected.name} ({selected.latency}ms) {region_tag}")
         return selected
 
@@ -473,24 +688,20 @@ class NodeSelector:
             logger.warning("⚠️ 节点列表为空")
             return None
 
-        # 计算每个节点的权重
-        weights = []
-        preferred_count = 0
-        for node in available:
-            if NodeSelector.is_preferred_region(node.name):
-                weights.append(2.0)  # 港澳台节点权重加倍
-                preferred_count += 1
-            else:
-                weights.append(1.0)  # 其他节点基础权重
+        preferred_indices = [i for i, node in enumerate(available) if node.is_preferred]
+        preferred_count = len(preferred_indices)
 
         # 统计信息
         if preferred_count > 0:
             logger.info(f"🌏 候选节点中包含 {preferred_count}/{len(available)} 个港澳台节点（权重2倍）")
 
-        # 使用 random.choices 进行加权随机选择
-        selected = random.choices(available, weights=weights, k=1)[0]
+        # 加权随机选择：权重只有 1 和 2，相当于每个节点一张签、港澳台节点再多一张，
+        # 抽一次整数签即可，无需构建累积权重表
+        ticket = random.randrange(len(available) + preferred_count)
+        index = ticket if ticket < len(available) else preferred_indices[ticket - len(available)]
+        selected = available[index]
 
-        region_tag = "🌏 港澳台" if NodeSelector.is_preferred_region(selected.name) else ""
+        region_tag = "🌏 港澳台" if selected.is_preferred else ""
         logger.info(f"✅ 随机选择节点: {selected.name} {region_tag}")
         return selected
 
@@ -498,6 +709,15 @@ class NodeSelector:
 class SubscriptionProxyManager:
     """订阅代理管理器 - 整合解析、测速、选择功能"""
 
+    # 自动模式下从最快的前 N 个节点中随机选择
+    AUTO_TOP_N = 3
+
+    # 自动模式下 TCP 预筛保留 AUTO_TOP_N 的多少倍候选节点进行 HTTP 测速
+    TCP_PRESCREEN_FACTOR = 3
+
+    # 测速结果持久化目录（只保存延迟，不保存节点认证信息）
+    LATENCY_CACHE_DIR = ".cache/subscriptions"
+
     def __init__(
         self,
         subscription_url: str,
@@ -505,6 +725,7 @@ class SubscriptionProxyManager:
         node_name_pattern: Optional[str] = None,
         test_speed: bool = True,
         cache_duration: int = 3600,  # 缓存时长（秒）
+        latency_cache_dir: Optional[str] = None,
     ):
         """
         Args:
@@ -513,6 +734,7 @@ class SubscriptionProxyManager:
             node_name_pattern: 手动模式下的节点名称匹配模式
             test_speed: 是否进行测速
             cache_duration: 节点缓存时长（秒）
+            latency_cache_dir: 测速结果持久化目录（默认 LATENCY_CACHE_DIR）
         """
         self.subscription_url = subscription_url
         self.selection_mode = selection_mode.lower()
@@ -524,6 +746,9 @@ class SubscriptionProxyManager:
         self.tester = NodeSpeedTester()
         self.selector = NodeSelector()
 
+        url_hash = hashlib.sha256(subscription_url.encode()).hexdigest()[:16]
+        self._latency_cache_file = os.path.join(latency_cache_dir or self.LATENCY_CACHE_DIR, f"{url_hash}.json")
+
         self._cached_nodes: List[ProxyNode] = []
         self._cache_time: Optional[float] = None
         self._selected_node: Optional[ProxyNode] = None
@@ -545,12 +770,30 @@ class SubscriptionProxyManager:
 
             # 2. 测速（如果启用且未测速）
             if self.test_speed and not any(n.latency for n in nodes):
-                nodes = await self.tester.test_all_nodes(nodes)
+                if self._apply_latency_cache(nodes):
+                    # 复用上次进程的测速结果，按延迟排序（未命中的节点排在最后）
+                    nodes.sort(key=lambda n: n.latency if n.latency else 9999)
+                else:
+                    if self.selection_mode == "auto":
+                        # 自动模式只需要前几个快速节点：先用 TCP 连接预筛，只对候选节点做 HTTP 测速，
+                        # 找到足够的快速节点即停止；候选节点都不可用时再测试其余节点
+                        candidates = await self.tester.prescreen_tcp(
+                            nodes, keep=self.AUTO_TOP_N * self.TCP_PRESCREEN_FACTOR
+                        )
+                        await self.tester.test_until(candidates or nodes, want=self.AUTO_TOP_N)
+                        if candidates and not any(n.latency and n.latency < 9999 for n in candidates):
+                            await self.tester.test_until(
+                                [n for n in nodes if n.latency is None], want=self.AUTO_TOP_N
+                            )
+                        nodes.sort(key=lambda n: n.latency if n.latency else 9999)
+                    else:
+                        nodes = await self.tester.test_all_nodes(nodes)
+                    self._save_latency_cache(nodes)
                 self._cached_nodes = nodes  # 更新缓存
 
             # 3. 根据选择模式选择节点
             if self.selection_mode == "auto":
-                self._selected_node = self.selector.select_fastest(nodes, top_n=3)
+                self._selected_node = self.selector.select_fastest(nodes, top_n=self.AUTO_TOP_N)
             elif self.selection_mode == "manual":
                 if not self.node_name_pattern:
                     logger.error("❌ 手动模式需要指定 node_name_pattern")
@@ -581,7 +824,7 @@ class SubscriptionProxyManager:
         # 检查缓存是否有效
         if self._cached_nodes and self._cache_time:
             if time.time() - self._cache_time < self.cache_duration:
-                logger.debug(f"✅ 使用缓存的节点列表（{len(self._cached_nodes)} 个节点）")
+                logger.debug("✅ 使用缓存的节点列表（%d 个节点）", len(self._cached_nodes))
                 return self._cached_nodes
 
         # 重新解析订阅
@@ -593,6 +836,54 @@ class SubscriptionProxyManager:
 
         return nodes
 
+    @staticmethod
+    def _latency_key(node: ProxyNode) -> str:
+        """测速结果的缓存键（同一订阅内按协议、地址、端口区分节点）"""
+        return f"{node.type}://{node.server}:{node.port}"
+
+    def _apply_latency_cache(self, nodes: List[ProxyNode]) -> bool:
+        """
+        从磁盘加载未过期的测速结果并应用到节点
+
+        Returns:
+            bool: 是否有可用节点命中缓存（只记录了失败节点时返回 False，重新测速）
+        """
+        try:
+            if time.time() - os.path.getmtime(self._latency_cache_file) >= self.cache_duration:
+                return False
+            with open(self._latency_cache_file, "rb") as f:
+                cached = json.loads(f.read())
+        except (OSError, ValueError):
+            return False
+
+        hits = 0
+        for node in nodes:
+            entry = cached.get(self._latency_key(node))
+            # 忽略旧版本写入的失败记录（9999），避免短暂断网后整个缓存周期都无节点可选
+            if entry and entry[0] < 9999:
+                node.latency, node.last_test_time = entry
+                hits += 1
+
+        if hits:
+            logger.info(f"✅ 使用缓存的测速结果（{hits}/{len(nodes)} 个节点）")
+        return hits > 0
+
+    def _save_latency_cache(self, nodes: List[ProxyNode]) -> None:
+        """将测速结果写入磁盘（写临时文件后原子替换），供下次进程启动复用；只保存测速成功的节点"""
+        cached = {
+            self._latency_key(node): [node.latency, node.last_test_time]
+            for node in nodes
+            if node.latency and node.latency < 9999
+        }
+        try:
+            os.makedirs(os.path.dirname(self._latency_cache_file), exist_ok=True)
+            tmp_file = f"{self._latency_cache_file}.{os.getpid()}.tmp"
+            with open(tmp_file, "w", encoding="utf-8") as f:
+                json.dump(cached, f)
+            os.replace(tmp_file, self._latency_cache_file)
+        except OSError as e:
+            logger.debug("⚠️ 保存测速缓存失败: %s", e)
+
     def get_selected_node_info(self) -> Optional[Dict[str, Any]]:
         """获取当前选中节点的信息"""
         if not self._selected_node: